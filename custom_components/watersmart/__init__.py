@@ -1,36 +1,146 @@
 """The WaterSmart integration."""
 
+import asyncio
+import datetime as dt
+from functools import partial
+import logging
+from pathlib import Path
+from typing import Any
+
+from homeassistant.config_entries import SOURCE_IMPORT
 from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_USERNAME, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CoreState, HomeAssistant, callback
+from homeassistant.data_entry_flow import FlowResultType
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import STORAGE_DIR
 from homeassistant.helpers.typing import ConfigType
+import voluptuous as vol
 
+from .budget import get_memory_budget
+from .cache import get_response_cache
 from .client import WaterSmartClient
-from .const import DOMAIN
+from .const import (
+    CONF_ACCOUNTS,
+    CONF_BILLING_DAY,
+    CONF_DAILY_RETENTION_MONTHS,
+    CONF_FIXED_CHARGE,
+    CONF_HOURLY_RETENTION_DAYS,
+    CONF_RATE_TIERS,
+    DEFAULT_BILLING_DAY,
+    DEFAULT_DAILY_RETENTION_MONTHS,
+    DEFAULT_FIXED_CHARGE,
+    DEFAULT_HOURLY_RETENTION_DAYS,
+    DOMAIN,
+    IMPORT_CONCURRENCY,
+    STARTUP_REFRESH_STAGGER,
+)
 from .coordinator import WaterSmartUpdateCoordinator
+from .handoff import async_take_client
+from .ratelimit import get_rate_limiter
+from .resilience import get_circuit_breaker
+from .retention import RetainedHistory, RetentionPolicy
 from .services import async_setup_services
 from .types import WaterSmartConfigEntry, WaterSmartData
+from .websocket import async_setup_websocket
+
+_LOGGER = logging.getLogger(__name__)
 
-PLATFORMS: list[Platform] = [Platform.SENSOR]
-CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+PLATFORMS: list[Platform] = [Platform.BINARY_SENSOR, Platform.SENSOR]
+CONFIG_SCHEMA = vol.Schema(
+    {
+        vol.Optional(DOMAIN): vol.Schema(
+            {
+                vol.Required(CONF_ACCOUNTS): vol.All(
+                    cv.ensure_list,
+                    vol.Length(min=1),
+                    [
+                        vol.Schema(
+                            {
+                                vol.Required(CONF_HOST): cv.string,
+                                vol.Required(CONF_USERNAME): cv.string,
+                                vol.Required(CONF_PASSWORD): cv.string,
+                            }
+                        )
+                    ],
+                ),
+            }
+        ),
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+ROLLUPS_SUFFIX = ".cold"
+SPILLED_HOURS_SUFFIX = ".hours"
 
 
 async def async_setup(  # noqa: RUF029
     hass: HomeAssistant,
-    config: ConfigType,  # noqa: ARG001
+    config: ConfigType,
 ) -> bool:
-    """Set up WaterSmart services.
+    """Set up WaterSmart services & websocket commands.
+
+    Accounts listed in YAML are imported in the background.
 
     Returns:
         If the setup was successful.
     """
 
     async_setup_services(hass)
+    async_setup_websocket(hass)
+
+    if DOMAIN in config:
+        hass.async_create_background_task(
+            _async_import_accounts(hass, config[DOMAIN][CONF_ACCOUNTS]),
+            f"{DOMAIN} import accounts",
+        )
 
     return True
 
 
+async def _async_import_accounts(
+    hass: HomeAssistant, accounts: list[dict[str, Any]]
+) -> None:
+    """Add a config entry for each account that does not have one yet.
+
+    Accounts are imported through the config flow, so passwords are only kept
+    in the entries, and each entry is set up with the client that logged in.
+    """
+
+    configured = {
+        (entry.data[CONF_HOST], entry.data[CONF_USERNAME])
+        for entry in hass.config_entries.async_entries(DOMAIN)
+    }
+    pending: dict[tuple[str, str], dict[str, Any]] = {}
+
+    for account in accounts:
+        key = (account[CONF_HOST], account[CONF_USERNAME])
+
+        if key in pending:
+            _LOGGER.warning("Skipping duplicate account %s on %s", key[1], key[0])
+        elif key not in configured:
+            pending[key] = account
+
+    semaphore = asyncio.Semaphore(IMPORT_CONCURRENCY)
+
+    async def _async_import(account: dict[str, Any]) -> None:
+        async with semaphore:
+            result = await hass.config_entries.flow.async_init(
+                DOMAIN, context={"source": SOURCE_IMPORT}, data=account
+            )
+
+        if result["type"] is not FlowResultType.CREATE_ENTRY:
+            _LOGGER.warning(
+                "Could not import account %s on %s: %s",
+                account[CONF_USERNAME],
+                account[CONF_HOST],
+                result["reason"],
+            )
+
+    await asyncio.gather(*(_async_import(account) for account in pending.values()))
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: WaterSmartConfigEntry) -> bool:
     """Set up WaterSmart from a config entry.
 
@@ -42,29 +152,131 @@ async def async_setup_entry(hass: HomeAssistant, entry: WaterSmartConfigEntry) -
     username: str = entry.data[CONF_USERNAME]
     password: str = entry.data[CONF_PASSWORD]
 
-    session = async_get_clientsession(hass)
-    watersmart = WaterSmartClient(hostname, username, password, session=session)
+    rate_tiers: str | None = entry.options.get(CONF_RATE_TIERS)
+    rate_schedule = None
+
+    if rate_tiers:
+        # cost estimation is only loaded for entries with rates configured
+        from .cost import RateSchedule, parse_rate_tiers  # noqa: PLC0415
+
+        rate_schedule = RateSchedule(
+            parse_rate_tiers(rate_tiers),
+            entry.options.get(CONF_FIXED_CHARGE, DEFAULT_FIXED_CHARGE),
+        )
+
+    # a client that just logged in during a config flow saves a second login
+    watersmart = async_take_client(
+        hass, hostname, username, password
+    ) or WaterSmartClient(
+        hostname,
+        username,
+        password,
+        session=async_get_clientsession(hass),
+        circuit_breaker=get_circuit_breaker(hass, hostname),
+        rate_limiter=get_rate_limiter(hass, hostname),
+    )
+
+    retained = await hass.async_add_executor_job(
+        RetainedHistory.load, _history_path(hass, entry, ROLLUPS_SUFFIX)
+    )
+    entry.async_on_unload(retained.close)
 
     coordinator = WaterSmartUpdateCoordinator(
         hass,
         watersmart,
         hostname,
         username,
+        billing_day=entry.options.get(CONF_BILLING_DAY, DEFAULT_BILLING_DAY),
+        rate_schedule=rate_schedule,
+        retention=RetentionPolicy(
+            entry.options.get(
+                CONF_HOURLY_RETENTION_DAYS, DEFAULT_HOURLY_RETENTION_DAYS
+            ),
+            entry.options.get(
+                CONF_DAILY_RETENTION_MONTHS, DEFAULT_DAILY_RETENTION_MONTHS
+            ),
+        ),
+        retained=retained,
+        spill_path=_history_path(hass, entry, SPILLED_HOURS_SUFFIX),
     )
 
-    await coordinator.async_config_entry_first_refresh()
+    budget = get_memory_budget(hass)
+    budget.register(coordinator)
+    entry.async_on_unload(partial(budget.unregister, coordinator))
+    # generations start over when the entry is set up again
+    entry.async_on_unload(partial(get_response_cache(hass).discard, entry.entry_id))
+
+    # while starting, entities are added right away & stay unavailable until
+    # the first refresh completes in the background
+    deferred = hass.state is not CoreState.running
+
+    if not deferred:
+        await coordinator.async_config_entry_first_refresh()
 
     entry.runtime_data = WaterSmartData(
         coordinator=coordinator,
+        options=dict(entry.options),
     )
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = entry.runtime_data
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    if deferred:
+        _async_schedule_first_refresh(hass, entry, coordinator)
+
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
     return True
 
 
+def _history_path(
+    hass: HomeAssistant, entry: WaterSmartConfigEntry, suffix: str
+) -> Path:
+    """Get the path of a file holding history for an entry.
+
+    Returns:
+        The path.
+    """
+
+    return Path(hass.config.path(STORAGE_DIR, DOMAIN, f"{entry.entry_id}{suffix}"))
+
+
+@callback
+def _async_schedule_first_refresh(
+    hass: HomeAssistant,
+    entry: WaterSmartConfigEntry,
+    coordinator: WaterSmartUpdateCoordinator,
+) -> None:
+    """Schedule the first refresh of an entry set up during startup.
+
+    Entries are staggered by their position so they do not all log in at once.
+    """
+
+    index = hass.config_entries.async_entries(DOMAIN).index(entry)
+
+    @callback
+    def _async_refresh(_now: dt.datetime) -> None:
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {entry.title}"
+        )
+
+    entry.async_on_unload(
+        async_call_later(hass, index * STARTUP_REFRESH_STAGGER, _async_refresh)
+    )
+
+
+async def _async_update_listener(
+    hass: HomeAssistant, entry: WaterSmartConfigEntry
+) -> None:
+    """Reload the entry when options change.
+
+    Flows that change the data reload the entry themselves.
+    """
+    if entry.options != entry.runtime_data.options:
+        await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: WaterSmartConfigEntry) -> bool:
     """Unload a config entry.
 
@@ -72,3 +284,11 @@ async def async_unload_entry(hass: HomeAssistant, entry: WaterSmartConfigEntry)
         If the unload was successful.
     """
     return bool(await hass.config_entries.async_unload_platforms(entry, PLATFORMS))
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: WaterSmartConfigEntry) -> None:
+    """Remove the compacted & spilled history of a removed entry."""
+    for suffix in (ROLLUPS_SUFFIX, SPILLED_HOURS_SUFFIX):
+        await hass.async_add_executor_job(
+            partial(_history_path(hass, entry, suffix).unlink, missing_ok=True)
+        )
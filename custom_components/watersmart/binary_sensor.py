@@ -0,0 +1,202 @@
+"""Support for WaterSmart binary sensors."""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, Self, cast
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+    BinarySensorEntityDescription,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.restore_state import ExtraStoredData, RestoreEntity
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from . import WaterSmartConfigEntry
+from .const import ATTRIBUTION, BinarySensorKey
+from .coordinator import CoordinatorData, WaterSmartUpdateCoordinator
+from .types import SensorData
+
+
+@dataclass(frozen=True, kw_only=True)
+class WaterSmartBinarySensorDescription(BinarySensorEntityDescription):
+    """Class describing WaterSmart binary sensor entities."""
+
+    value_fn: Callable[[Any], bool | None]
+    attr_fn: Callable[[dict[str, Any]], dict[str, Any]] = lambda attrs: attrs
+
+
+@dataclass
+class WaterSmartBinarySensorExtraStoredData(ExtraStoredData):
+    """Binary sensor data with a compact summary of the attributes to restore."""
+
+    is_on: bool | None
+    attributes: dict[str, Any]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dict representation of the binary sensor data.
+
+        Returns:
+            The binary sensor data.
+        """
+        return {"is_on": self.is_on, "attributes": self.attributes}
+
+    @classmethod
+    def from_dict(cls, restored: dict[str, Any]) -> Self | None:
+        """Initialize stored binary sensor data from a dict.
+
+        Returns:
+            The binary sensor data, if it could be restored.
+        """
+        is_on = restored.get("is_on")
+        attributes = restored.get("attributes")
+
+        if not isinstance(is_on, bool | None) or not isinstance(attributes, dict):
+            return None
+
+        return cls(is_on, attributes)
+
+
+BINARY_SENSOR_TYPES: tuple[WaterSmartBinarySensorDescription, ...] = (
+    WaterSmartBinarySensorDescription(
+        key=BinarySensorKey.CONTINUOUS_FLOW,
+        value_fn=lambda data: cast("bool", data),
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        translation_key="continuous_flow",
+    ),
+    WaterSmartBinarySensorDescription(
+        key=BinarySensorKey.UNUSUAL_USAGE,
+        value_fn=lambda data: cast("bool | None", data),
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        translation_key="unusual_usage",
+    ),
+)
+
+
+async def async_setup_entry(  # noqa: RUF029
+    hass: HomeAssistant,  # noqa: ARG001
+    entry: WaterSmartConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up WaterSmart binary sensor entities based on a config entry."""
+    data = entry.runtime_data
+    coordinator = data.coordinator
+
+    entities: list[WaterSmartBinarySensor] = [
+        WaterSmartBinarySensor(coordinator, description)
+        for description in BINARY_SENSOR_TYPES
+    ]
+
+    async_add_entities(entities)
+
+
+class WaterSmartBinarySensor(
+    CoordinatorEntity[WaterSmartUpdateCoordinator], BinarySensorEntity, RestoreEntity
+):
+    """Class for a WaterSmart binary sensor.
+
+    The last state is restored at startup so binary sensors have a state before
+    the first refresh completes. It is replaced once fresh data arrives.
+    """
+
+    _attr_attribution = ATTRIBUTION
+    _attr_has_entity_name = True
+    entity_description: WaterSmartBinarySensorDescription
+
+    def __init__(
+        self,
+        coordinator: WaterSmartUpdateCoordinator,
+        description: WaterSmartBinarySensorDescription,
+    ) -> None:
+        """Initialize the binary sensor."""
+        super().__init__(coordinator)
+
+        self.entity_description = description
+        self._sensor_data = self._get_sensor_data(coordinator.data, description.key)
+        self._restored: WaterSmartBinarySensorExtraStoredData | None = None
+        self._attr_unique_id = (
+            f"{coordinator.hostname}-{coordinator.username}-{description.key}".lower()
+        )
+        self._attr_device_info = coordinator.device_info
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last state if no data has been fetched yet."""
+        await super().async_added_to_hass()
+
+        if self.entity_description.key in self.coordinator.data:
+            return
+
+        if (extra := await self.async_get_last_extra_data()) is not None:
+            self._restored = WaterSmartBinarySensorExtraStoredData.from_dict(
+                extra.as_dict()
+            )
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return the state."""
+        if self._restored is not None:
+            return self._restored.is_on
+
+        return self.entity_description.value_fn(self._sensor_data["state"])
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the state attributes."""
+        if self._restored is not None:
+            return self._restored.attributes
+
+        return self.entity_description.attr_fn(self._sensor_data.get("attrs", {}))
+
+    @property
+    def extra_restore_state_data(self) -> WaterSmartBinarySensorExtraStoredData:
+        """Return the data to restore, leaving out lists & mappings to keep it small.
+
+        Returns:
+            The binary sensor data.
+        """
+        return WaterSmartBinarySensorExtraStoredData(
+            self.is_on,
+            {
+                key: value
+                for key, value in self.extra_state_attributes.items()
+                if not isinstance(value, (list, dict))
+            },
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return if the entity is available."""
+        if self._restored is not None:
+            return True
+
+        return (
+            super().available and self.entity_description.key in self.coordinator.data
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle data update."""
+        self._sensor_data = self._get_sensor_data(
+            self.coordinator.data, self.entity_description.key
+        )
+
+        # the restored state only stands in until the first update attempt
+        self._restored = None
+
+        super()._handle_coordinator_update()
+
+    @staticmethod
+    def _get_sensor_data(
+        coordinator_data: CoordinatorData,
+        kind: str,
+    ) -> SensorData:
+        """Get sensor data.
+
+        Returns:
+            The actual sensor data.
+        """
+        return cast("dict[str, SensorData]", coordinator_data).get(
+            kind, {"state": None, "attrs": {}}
+        )
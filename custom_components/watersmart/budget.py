@@ -0,0 +1,183 @@
+"""Memory budget shared by all WaterSmart entries.
+
+Each entry accounts for the memory held by its hourly history, sensor
+attributes & cached service responses. When the entries together exceed the
+budget, cached responses are dropped first. Then the hourly records that
+sensors no longer need are spilled to disk, starting with the entry that was
+least recently queried. Spilled records are loaded again when a query or a
+merge needs them.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Sequence
+import logging
+import math
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util.hass_dict import HassKey
+
+from .cache import get_response_cache
+from .client import UsageRecord
+from .coldstore import ColumnFile, TableLayout
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from .coordinator import WaterSmartUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+MEMORY_BUDGET = 32 * 1024 * 1024
+
+DATA_BUDGET: HassKey[MemoryBudget] = HassKey(f"{DOMAIN}_budget")
+
+HOURS_LAYOUT: TableLayout = (
+    ("read_datetime", "q"),
+    # missing values store NaN
+    ("gallons", "d"),
+    ("leak_gallons", "d"),
+    # running total before each record
+    ("cumulative", "d"),
+)
+
+
+class MemoryBudget:
+    """Memory accounting across entries, in least recently queried order."""
+
+    def __init__(self, hass: HomeAssistant, limit: int = MEMORY_BUDGET) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.limit = limit
+        self._coordinators: OrderedDict[WaterSmartUpdateCoordinator, None] = (
+            OrderedDict()
+        )
+        self._enforcing = False
+
+    @callback
+    def register(self, coordinator: WaterSmartUpdateCoordinator) -> None:
+        self._coordinators[coordinator] = None
+
+    @callback
+    def unregister(self, coordinator: WaterSmartUpdateCoordinator) -> None:
+        self._coordinators.pop(coordinator, None)
+
+    @callback
+    def touch(self, coordinator: WaterSmartUpdateCoordinator) -> None:
+        """Mark an entry as the most recently queried."""
+
+        if coordinator in self._coordinators:
+            self._coordinators.move_to_end(coordinator)
+
+    def total(self) -> int:
+        """Get the bytes accounted for all entries.
+
+        Returns:
+            The total bytes.
+        """
+
+        return sum(
+            sum(coordinator.memory_usage().values())
+            for coordinator in self._coordinators
+        )
+
+    @callback
+    def async_schedule_enforce(self) -> None:
+        """Spill history in the background if entries are over the budget."""
+
+        if self._enforcing or self.total() <= self.limit:
+            return
+
+        self._enforcing = True
+        self.hass.async_create_background_task(
+            self._async_enforce(), f"{DOMAIN} memory budget"
+        )
+
+    async def _async_enforce(self) -> None:
+        try:
+            total = self.total() - get_response_cache(self.hass).clear()
+
+            for coordinator in list(self._coordinators):
+                if total <= self.limit:
+                    break
+
+                total -= await coordinator.async_spill_history()
+        finally:
+            self._enforcing = False
+
+        if total > self.limit:
+            _LOGGER.debug("Memory use of %s bytes remains over the budget", total)
+
+
+@callback
+def get_memory_budget(hass: HomeAssistant) -> MemoryBudget:
+    """Get the memory budget shared by all entries.
+
+    Returns:
+        The memory budget.
+    """
+
+    budget: MemoryBudget | None = hass.data.get(DATA_BUDGET)
+
+    if budget is None:
+        budget = hass.data[DATA_BUDGET] = MemoryBudget(hass)
+
+    return budget
+
+
+def write_hours(
+    path: Path, records: Sequence[UsageRecord], cumulative: Sequence[float]
+) -> None:
+    """Write spilled hourly records. This does blocking I/O."""
+
+    ColumnFile.write(
+        path,
+        (HOURS_LAYOUT,),
+        [
+            {
+                "read_datetime": [record["read_datetime"] for record in records],
+                "gallons": [_or_nan(record["gallons"]) for record in records],
+                "leak_gallons": [_or_nan(record["leak_gallons"]) for record in records],
+                "cumulative": cumulative,
+            }
+        ],
+    ).close()
+
+
+def read_hours(path: Path) -> tuple[list[UsageRecord], list[float]]:
+    """Read spilled hourly records. This does blocking I/O.
+
+    Returns:
+        The records & the running total before each of them.
+    """
+
+    store = ColumnFile.open(path, (HOURS_LAYOUT,))
+
+    try:
+        table = store.tables[0]
+        rows = table.rows(0, len(table))
+    finally:
+        store.close()
+
+    return (
+        [
+            {
+                "read_datetime": int(read_datetime),
+                "gallons": _or_none(gallons),
+                "leak_gallons": _or_none(leak_gallons),  # type: ignore[typeddict-item]
+                "flags": None,
+            }
+            for read_datetime, gallons, leak_gallons, _ in rows
+        ],
+        [cumulative for *_, cumulative in rows],
+    )
+
+
+def _or_nan(value: float | None) -> float:
+    return value if value is not None else math.nan
+
+
+def _or_none(value: float) -> float | None:
+    return None if math.isnan(value) else value
@@ -0,0 +1,132 @@
+"""Cache of service responses for the current data of each entry."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Hashable
+
+from homeassistant.core import HomeAssistant, ServiceResponse, callback
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+# Responses kept across all entries. Dashboards repeat a handful of queries,
+# so this comfortably holds them for a few entries.
+RESPONSE_CACHE_SIZE = 64
+
+DATA_RESPONSES: HassKey[ResponseCache] = HassKey(f"{DOMAIN}_responses")
+
+
+class ResponseCache:
+    """Service responses, least recently used first.
+
+    Responses are cached for the generation of an entry's data they were built
+    from. A response for a newer generation replaces those of older ones, as
+    they can no longer be returned.
+    """
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE) -> None:
+        """Initialize."""
+        self.maxsize = maxsize
+        self._responses: OrderedDict[
+            tuple[str, int, Hashable], tuple[ServiceResponse, int]
+        ] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Get the number of cached responses.
+
+        Returns:
+            The number of responses.
+        """
+        return len(self._responses)
+
+    @callback
+    def get(
+        self, entry_id: str, generation: int, query: Hashable
+    ) -> ServiceResponse | None:
+        """Get the response to a query of an entry's data.
+
+        Returns:
+            The response, if one is cached for the generation.
+        """
+
+        key = (entry_id, generation, query)
+
+        if (item := self._responses.get(key)) is None:
+            return None
+
+        self._responses.move_to_end(key)
+
+        return item[0]
+
+    @callback
+    def put(
+        self,
+        entry_id: str,
+        generation: int,
+        query: Hashable,
+        response: ServiceResponse,
+        nbytes: int,
+    ) -> None:
+        """Cache the response to a query, along with its approximate size."""
+
+        for key in [
+            key
+            for key in self._responses
+            if key[0] == entry_id and key[1] != generation
+        ]:
+            del self._responses[key]
+
+        self._responses[entry_id, generation, query] = (response, nbytes)
+
+        while len(self._responses) > self.maxsize:
+            self._responses.popitem(last=False)
+
+    @callback
+    def discard(self, entry_id: str) -> None:
+        """Drop the responses of an entry."""
+
+        for key in [key for key in self._responses if key[0] == entry_id]:
+            del self._responses[key]
+
+    @callback
+    def clear(self) -> int:
+        """Drop all responses.
+
+        Returns:
+            The approximate bytes freed.
+        """
+
+        nbytes = sum(nbytes for _, nbytes in self._responses.values())
+        self._responses.clear()
+
+        return nbytes
+
+    def nbytes(self, entry_id: str) -> int:
+        """Get the approximate bytes held for an entry's responses.
+
+        Returns:
+            The bytes held.
+        """
+
+        return sum(
+            nbytes
+            for (key_entry_id, *_), (_, nbytes) in self._responses.items()
+            if key_entry_id == entry_id
+        )
+
+
+@callback
+def get_response_cache(hass: HomeAssistant) -> ResponseCache:
+    """Get the response cache shared by all entries.
+
+    Returns:
+        The response cache.
+    """
+
+    cache: ResponseCache | None = hass.data.get(DATA_RESPONSES)
+
+    if cache is None:
+        cache = hass.data[DATA_RESPONSES] = ResponseCache()
+
+    return cache
@@ -0,0 +1,72 @@
+"""Log of hours inserted or corrected by history merges."""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+import uuid
+
+from .client import UsageRecord
+from .history import HistoryMerge
+
+# Changed hours kept for consumers to catch up on. A day's readings arriving
+# after a long outage stays well within this.
+CHANGE_LOG_SIZE = 2000
+
+
+class ChangeLog:
+    """Hours changed by each merge, in the order they were merged.
+
+    Each merge that changes the history gets the next version. Consumers ask
+    for the changes after the last version they have seen. Once the oldest
+    changes are dropped, consumers that have not seen them must resync from
+    the full history.
+
+    The log is kept in memory, so each log has its own id & versions from a
+    previous log (such as before a restart) cannot be caught up on.
+    """
+
+    def __init__(self, maxlen: int = CHANGE_LOG_SIZE) -> None:
+        """Initialize."""
+        self.id = uuid.uuid4().hex
+        self.maxlen = maxlen
+        self.version = 0
+        # versions before this may have had changes dropped
+        self.oldest_version = 0
+        self._versions: list[int] = []
+        self._records: list[UsageRecord] = []
+
+    def append(self, merge: HistoryMerge) -> None:
+        """Log the hours changed by a merge."""
+
+        if not merge.changed:
+            return
+
+        self.version += 1
+        records = [*merge.new, *merge.revised]
+        self._versions.extend([self.version] * len(records))
+        self._records.extend(records)
+
+        if (excess := len(self._records) - self.maxlen) > 0:
+            self.oldest_version = self._versions[excess - 1]
+            del self._versions[:excess]
+            del self._records[:excess]
+
+    def changes_since(self, version: int) -> list[UsageRecord] | None:
+        """Get the hours changed after a version.
+
+        Hours changed more than once are only included as they are now.
+
+        Returns:
+            The changed hours sorted by `read_datetime`, or `None` when the
+            changes since the version are no longer all kept.
+        """
+
+        if not self.oldest_version <= version <= self.version:
+            return None
+
+        latest = {
+            record["read_datetime"]: record
+            for record in self._records[bisect_right(self._versions, version) :]
+        }
+
+        return [latest[timestamp] for timestamp in sorted(latest)]
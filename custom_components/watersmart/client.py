@@ -2,19 +2,36 @@
 
 from __future__ import annotations
 
+import asyncio
 from collections.abc import Callable
 import datetime as dt
 import functools
+import hashlib
+from http import HTTPStatus
+import json
 import re
-from typing import Any, TypedDict, cast
+from typing import TYPE_CHECKING, Any, TypedDict, cast
 
 import aiohttp
-from bs4 import BeautifulSoup, PageElement
+
+from .ratelimit import HostRateLimiter, Priority, TokenBucket, parse_retry_after
+from .resilience import RETRY_ATTEMPTS, CircuitBreaker, async_call_with_breaker
+
+if TYPE_CHECKING:
+    from bs4 import PageElement
 
 # Account number format will vary between municipality, so
 # match on a string of non-whitespace characters.
 ACCOUNT_NUMBER_RE = re.compile(r"^\S+$")
 
+# Timeouts in seconds for establishing a connection, for the whole login
+# exchange & for each attempt at fetching usage data.
+CONNECT_TIMEOUT = 5
+LOGIN_TIMEOUT = 10
+DATA_TIMEOUT = 10
+
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(sock_connect=CONNECT_TIMEOUT)
+
 
 def _authenticated[F: Callable[..., Any], ReturnT](func: F) -> F:
     @functools.wraps(func)
@@ -75,14 +92,26 @@ class WaterSmartClient:
         username: str,
         password: str,
         session: aiohttp.ClientSession = None,
+        *,
+        base_url: str | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        rate_limiter: HostRateLimiter | None = None,
     ) -> None:
         """Initialize."""
         self._hostname = hostname
+        self._base_url = base_url or f"https://{hostname}.watersmart.com"
         self._username = username
         self._password = password
         self._session = session or aiohttp.ClientSession()
+        # clients for the same host should share these, so they are given by
+        # the integration; a client without them only limits its own requests
+        self._circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.rate_limiter = rate_limiter or HostRateLimiter()
         self._account_number: str | None = None
         self._authenticated_at: dt.datetime | None = None
+        self._hourly_data: list[UsageRecord] | None = None
+        self._hourly_data_digest: bytes | None = None
+        self._hourly_data_validators: dict[str, str] = {}
 
     @_authenticated
     async def async_get_account_number(self) -> str | None:
@@ -95,40 +124,109 @@ class WaterSmartClient:
         return self._account_number
 
     @_authenticated
-    async def async_get_hourly_data(self) -> list[UsageRecord]:
+    async def async_get_hourly_data(
+        self, priority: Priority = Priority.SCHEDULED
+    ) -> list[UsageRecord]:
         """Get hourly water usage data.
 
+        Validators from the previous response are sent so the server can reply
+        that nothing has changed. Servers that do not support conditional
+        requests are handled by comparing a digest of the raw body. Either way,
+        when the data is unchanged the previously decoded list is returned
+        as-is, so callers can skip processing with an identity check.
+
+        Requests wait for the host's data budget, where requests with a higher
+        priority are served first.
+
         Returns:
             The objects in the response data.
         """
 
-        session = self._session
-        hostname = self._hostname
-        response = await session.get(
-            f"https://{hostname}.watersmart.com/index.php/rest/v1/Chart/RealTimeChart"
+        response, body = await async_call_with_breaker(
+            self._circuit_breaker,
+            functools.partial(self._async_fetch_hourly_data, priority),
+            attempts=RETRY_ATTEMPTS,
         )
-        response_json: UsageHistoryPayload = await response.json()
 
-        return response_json["data"]["series"]
+        if response.status == HTTPStatus.NOT_MODIFIED and self._hourly_data is not None:
+            return self._hourly_data
+
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+
+        if digest == self._hourly_data_digest and self._hourly_data is not None:
+            return self._hourly_data
+
+        response_json: UsageHistoryPayload = await response.json(loads=_json_loads())
+        validators = {
+            request_header: response.headers[response_header]
+            for request_header, response_header in (
+                ("If-None-Match", "ETag"),
+                ("If-Modified-Since", "Last-Modified"),
+            )
+            if response_header in response.headers
+        }
+
+        self._hourly_data = response_json["data"]["series"]
+        self._hourly_data_digest = digest
+        self._hourly_data_validators = validators
+
+        return self._hourly_data
+
+    async def _async_fetch_hourly_data(
+        self, priority: Priority
+    ) -> tuple[aiohttp.ClientResponse, bytes]:
+        bucket = self.rate_limiter.data
+        await bucket.acquire(priority)
+
+        async with asyncio.timeout(DATA_TIMEOUT):
+            response = await self._session.get(
+                f"{self._base_url}/index.php/rest/v1/Chart/RealTimeChart",
+                headers=self._hourly_data_validators,
+                timeout=REQUEST_TIMEOUT,
+            )
+            _check_throttled(response, bucket)
+            response.raise_for_status()
+            bucket.record_success()
+
+            if response.status == HTTPStatus.NOT_MODIFIED:
+                return response, b""
+
+            return response, await response.read()
 
     async def _authenticate_if_needed(self) -> None:
         if not self._authenticated_at or self._authenticated_at < dt.datetime.now(
             tz=dt.UTC
         ) - dt.timedelta(minutes=10):
-            await self._authenticate()
+            await async_call_with_breaker(
+                self._circuit_breaker, self._authenticate_with_timeout
+            )
         self._authenticated_at = dt.datetime.now(tz=dt.UTC)
 
+    async def _authenticate_with_timeout(self) -> None:
+        bucket = self.rate_limiter.login
+        await bucket.acquire()
+
+        async with asyncio.timeout(LOGIN_TIMEOUT):
+            await self._authenticate()
+
+        bucket.record_success()
+
     async def _authenticate(self) -> None:
+        # parsing is only needed at login, so the parser is loaded on first use
+        from bs4 import BeautifulSoup  # noqa: PLC0415
+
         session = self._session
-        hostname = self._hostname
+        login_url = f"{self._base_url}/index.php/welcome/login?forceEmail=1"
         login_response = await session.post(
-            f"https://{hostname}.watersmart.com/index.php/welcome/login?forceEmail=1",
+            login_url,
             data={
                 "token": "",
                 "email": self._username,
                 "password": self._password,
             },
+            timeout=REQUEST_TIMEOUT,
         )
+        _check_throttled(login_response, self.rate_limiter.login)
         login_response_text = await login_response.text()
         soup = BeautifulSoup(login_response_text, "html.parser")
 
@@ -141,14 +239,16 @@ class WaterSmartClient:
 
         if login_refresh_token:
             login_response = await session.post(
-                f"https://{hostname}.watersmart.com/index.php/welcome/login?forceEmail=1",
+                login_url,
                 data={
                     "token": "",
                     "loginRefreshToken": login_refresh_token,
                     "email": self._username,
                     "password": self._password,
                 },
+                timeout=REQUEST_TIMEOUT,
             )
+            _check_throttled(login_response, self.rate_limiter.login)
             login_response_text = await login_response.text()
             soup = BeautifulSoup(login_response_text, "html.parser")
 
@@ -177,6 +277,28 @@ class WaterSmartClient:
         self._account_number = account_number
 
 
+@functools.cache
+def _json_loads() -> Callable[[str], Any]:
+    """Get the fastest available JSON decoder, loaded on first use.
+
+    Returns:
+        The decoder.
+    """
+
+    try:
+        import orjson  # noqa: PLC0415
+    except ImportError:  # pragma no cover
+        return json.loads
+
+    return cast("Callable[[str], Any]", orjson.loads)
+
+
+def _check_throttled(response: aiohttp.ClientResponse, bucket: TokenBucket) -> None:
+    if response.status == HTTPStatus.TOO_MANY_REQUESTS:
+        bucket.throttle(parse_retry_after(response.headers.get("Retry-After")))
+        response.raise_for_status()
+
+
 def _assert_node(node: PageElement, message: str) -> PageElement:
     if not node:
         raise ScrapeError(message)
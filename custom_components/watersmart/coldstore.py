@@ -0,0 +1,222 @@
+"""Fixed-width column files read through memory maps.
+
+A file holds one or more tables of 8 byte columns in native byte order, each
+column stored contiguously after a header with the number of rows in each
+table. Files are local to the machine that wrote them. Columns are
+read as memoryviews into the mapping, so looking up a range only touches the
+pages it needs & nothing is copied until values are read.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence
+import logging
+import mmap
+from pathlib import Path
+import struct
+from typing import Literal
+
+_LOGGER = logging.getLogger(__name__)
+
+MAGIC = b"WSCOLD01"
+COLUMN_SIZE = 8
+
+# 8 byte integers & floats
+type ColumnFormat = Literal["q", "d"]
+
+type Column = memoryview[int] | memoryview[float]
+
+# (name, struct format) for each column of a table. The first column holds
+# sorted timestamps that rows are looked up by.
+type TableLayout = Sequence[tuple[str, ColumnFormat]]
+
+
+class Table:
+    """Columns of one table."""
+
+    def __init__(self, layout: TableLayout, columns: Sequence[Column]) -> None:
+        """Initialize."""
+        self.layout = layout
+        self.columns = dict(zip((name for name, _ in layout), columns, strict=True))
+        self.key = columns[0]
+
+    def __len__(self) -> int:
+        """Get the number of rows.
+
+        Returns:
+            The number of rows.
+        """
+        return len(self.key)
+
+    def index(self, timestamp: int | None, default: int) -> int:
+        """Find the first row with a key of at least a timestamp.
+
+        Returns:
+            The row index, or the default when no timestamp is given.
+        """
+
+        return bisect_left(self.key, timestamp) if timestamp is not None else default
+
+    def rows(self, first: int, last: int) -> list[tuple[int | float, ...]]:
+        """Read the rows from `first` up to `last`.
+
+        Returns:
+            The values of each row.
+        """
+
+        return list(
+            zip(
+                *(column[first:last].tolist() for column in self.columns.values()),
+                strict=True,
+            )
+        )
+
+    def release(self) -> None:
+        for column in self.columns.values():
+            column.release()
+
+
+class ColumnFile:
+    """Tables mapped from a file, or held in memory when there is no file."""
+
+    def __init__(
+        self,
+        layouts: Sequence[TableLayout],
+        buffer: bytes | mmap.mmap | None = None,
+    ) -> None:
+        """Initialize."""
+        self._buffer = buffer
+        self._view = memoryview(buffer if buffer is not None else b"")
+        header = _header(layouts)
+        counts: Sequence[int] = [0] * len(layouts)
+
+        if buffer is not None:
+            counts = header.unpack_from(buffer)[1:]
+
+        offset = header.size
+        self.tables: list[Table] = []
+
+        for layout, count in zip(layouts, counts, strict=True):
+            columns = []
+
+            for _, fmt in layout:
+                end = offset + count * COLUMN_SIZE
+                columns.append(self._view[offset:end].cast(fmt))
+                offset = end
+
+            self.tables.append(Table(layout, columns))
+
+    @classmethod
+    def open(cls, path: Path, layouts: Sequence[TableLayout]) -> ColumnFile:
+        """Map a file, which is treated as empty if it is missing or invalid.
+
+        This does blocking I/O.
+
+        Returns:
+            The mapped tables.
+        """
+
+        try:
+            with path.open("rb") as file:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            # empty files cannot be mapped
+            return cls(layouts)
+
+        if not _is_valid(buffer, layouts):
+            _LOGGER.warning("Ignoring invalid history file %s", path)
+            buffer.close()
+            return cls(layouts)
+
+        return cls(layouts, buffer)
+
+    @classmethod
+    def write(
+        cls,
+        path: Path | None,
+        layouts: Sequence[TableLayout],
+        tables: Sequence[Mapping[str, Sequence[int | float]]],
+    ) -> ColumnFile:
+        """Write tables & map the new file, replacing any existing file.
+
+        Without a path, the tables are only held in memory. This does blocking
+        I/O.
+
+        Returns:
+            The tables that were written.
+        """
+
+        buffer = encode(layouts, tables)
+
+        if path is None:
+            return cls(layouts, buffer)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # an entry's files differ only by suffix & may be written at once
+        temp_path = path.with_name(f"{path.name}.tmp")
+        temp_path.write_bytes(buffer)
+        temp_path.replace(path)
+
+        return cls.open(path, layouts)
+
+    def close(self) -> None:
+        """Release the tables & unmap the file."""
+
+        for table in self.tables:
+            table.release()
+
+        self._view.release()
+
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the mapped file or held tables in bytes."""
+        return self._view.nbytes
+
+
+def encode(
+    layouts: Sequence[TableLayout],
+    tables: Sequence[Mapping[str, Sequence[int | float]]],
+) -> bytes:
+    """Encode tables in the file format.
+
+    Returns:
+        The file contents.
+    """
+
+    counts = [
+        len(table[layout[0][0]]) for layout, table in zip(layouts, tables, strict=True)
+    ]
+    parts = [_header(layouts).pack(MAGIC, *counts)]
+
+    for layout, table, count in zip(layouts, tables, counts, strict=True):
+        for name, fmt in layout:
+            parts.append(struct.pack(f"={count}{fmt}", *table[name]))
+
+    return b"".join(parts)
+
+
+def _header(layouts: Sequence[TableLayout]) -> struct.Struct:
+    return struct.Struct(f"=8s{len(layouts)}Q")
+
+
+def _is_valid(buffer: mmap.mmap, layouts: Sequence[TableLayout]) -> bool:
+    header = _header(layouts)
+
+    if len(buffer) < header.size:
+        return False
+
+    magic, *counts = header.unpack_from(buffer)
+
+    if magic != MAGIC:
+        return False
+
+    size: int = header.size + sum(
+        count * len(layout) * COLUMN_SIZE
+        for layout, count in zip(layouts, counts, strict=True)
+    )
+
+    return len(buffer) == size
@@ -0,0 +1,129 @@
+"""Bulk computations over history columns.
+
+Each computation has a pure Python implementation & one vectorized with NumPy.
+NumPy is used when it is installed & the input is long enough to make up for
+converting it to arrays. Both produce the same results.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+import functools
+import importlib
+from types import ModuleType
+from typing import cast
+
+# Record timestamps encode local wall-clock time, so local days start at
+# multiples of this.
+DAY_SECONDS = 24 * 3600
+
+# Inputs shorter than this are not worth converting to arrays.
+VECTORIZE_MIN_LENGTH = 512
+
+
+@functools.cache
+def _numpy() -> ModuleType | None:
+    """Get NumPy, loaded on first use.
+
+    Returns:
+        The module, if it is installed.
+    """
+
+    try:
+        return importlib.import_module("numpy")
+    except ImportError:  # pragma no cover
+        return None
+
+
+def _vectorized(length: int) -> ModuleType | None:
+    return _numpy() if length >= VECTORIZE_MIN_LENGTH else None
+
+
+def prefix_sums(gallons: Sequence[float | None], initial: float) -> list[float]:
+    """Get running totals of gallons, counting missing values as zero.
+
+    Returns:
+        The running total after each value.
+    """
+
+    if np := _vectorized(len(gallons)):
+        return _prefix_sums_numpy(np, gallons, initial)
+
+    return _prefix_sums_python(gallons, initial)
+
+
+def daily_totals(
+    timestamps: Sequence[int], cumulative: Sequence[float]
+) -> list[tuple[int, float]]:
+    """Get total gallons for each local day.
+
+    Timestamps must be sorted & `cumulative` must hold the running total before
+    the first record followed by the running total after each record, as kept
+    by the history.
+
+    Returns:
+        The start of each day that has records & its total gallons.
+    """
+
+    if np := _vectorized(len(timestamps)):
+        return _daily_totals_numpy(np, timestamps, cumulative)
+
+    return _daily_totals_python(timestamps, cumulative)
+
+
+def _prefix_sums_python(gallons: Sequence[float | None], initial: float) -> list[float]:
+    total = initial
+    result = []
+
+    for value in gallons:
+        total += value or 0
+        result.append(total)
+
+    return result
+
+
+def _prefix_sums_numpy(
+    np: ModuleType, gallons: Sequence[float | None], initial: float
+) -> list[float]:
+    values = np.fromiter(
+        (value or 0 for value in gallons), dtype=np.float64, count=len(gallons)
+    )
+    values[0] += initial
+
+    # cumulative sums are accumulated in order, so they match the Python sums
+    return cast("list[float]", np.cumsum(values).tolist())
+
+
+def _daily_totals_python(
+    timestamps: Sequence[int], cumulative: Sequence[float]
+) -> list[tuple[int, float]]:
+    days: list[int] = []
+    starts: list[int] = []
+
+    for index, timestamp in enumerate(timestamps):
+        day = timestamp - timestamp % DAY_SECONDS
+
+        if not days or day != days[-1]:
+            days.append(day)
+            starts.append(index)
+
+    starts.append(len(timestamps))
+
+    return [
+        (day, cumulative[end] - cumulative[start])
+        for day, start, end in zip(days, starts, starts[1:], strict=False)
+    ]
+
+
+def _daily_totals_numpy(
+    np: ModuleType, timestamps: Sequence[int], cumulative: Sequence[float]
+) -> list[tuple[int, float]]:
+    stamps = np.asarray(timestamps, dtype=np.int64)
+    sums = np.asarray(cumulative, dtype=np.float64)
+    days = stamps - stamps % DAY_SECONDS
+    starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+    ends = np.r_[starts[1:], len(stamps)]
+
+    return list(
+        zip(days[starts].tolist(), (sums[ends] - sums[starts]).tolist(), strict=True)
+    )
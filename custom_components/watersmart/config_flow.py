@@ -1,20 +1,41 @@
 """Config flow for WaterSmart integration."""
 
 from asyncio import timeout
+from collections.abc import Mapping
 import logging
 from typing import Any
 
 from aiohttp import ClientError
 from aiohttp.client_exceptions import ClientConnectorError
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
 from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_USERNAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 import voluptuous as vol
 
 from .client import AuthenticationError, WaterSmartClient
-from .const import DOMAIN
+from .const import (
+    CONF_BILLING_DAY,
+    CONF_DAILY_RETENTION_MONTHS,
+    CONF_FIXED_CHARGE,
+    CONF_HOURLY_RETENTION_DAYS,
+    CONF_RATE_TIERS,
+    DEFAULT_BILLING_DAY,
+    DEFAULT_DAILY_RETENTION_MONTHS,
+    DEFAULT_FIXED_CHARGE,
+    DEFAULT_HOURLY_RETENTION_DAYS,
+    DOMAIN,
+    MIN_HOURLY_RETENTION_DAYS,
+)
+from .handoff import async_offer_client
+from .ratelimit import get_rate_limiter
+from .resilience import get_circuit_breaker
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,11 +47,18 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     }
 )
 
+STEP_REAUTH_DATA_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_PASSWORD): str,
+    }
+)
+
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the user input allows us to connect.
 
     Data has the keys from STEP_USER_DATA_SCHEMA with values provided by the user.
+    The logged in client is offered to the setup of the entry that follows.
 
     Returns:
         The details for creating a new config entry.
@@ -40,9 +68,14 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
         InvalidAuth: For authentication errors.
     """
 
-    session = async_get_clientsession(hass)
+    host: str = data[CONF_HOST]
     client = WaterSmartClient(
-        data[CONF_HOST], data[CONF_USERNAME], data[CONF_PASSWORD], session=session
+        host,
+        data[CONF_USERNAME],
+        data[CONF_PASSWORD],
+        session=async_get_clientsession(hass),
+        circuit_breaker=get_circuit_breaker(hass, host),
+        rate_limiter=get_rate_limiter(hass, host),
     )
 
     try:
@@ -56,6 +89,10 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     if not account_number:
         raise InvalidAuth
 
+    async_offer_client(
+        hass, client, data[CONF_HOST], data[CONF_USERNAME], data[CONF_PASSWORD]
+    )
+
     return {"title": f"{data[CONF_HOST]} ({data[CONF_USERNAME]})"}
 
 
@@ -74,16 +111,9 @@ class WaterSmartConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call-arg]
         """
         errors: dict[str, str] = {}
         if user_input is not None:
-            try:
-                info = await validate_input(self.hass, user_input)
-            except CannotConnect:
-                errors["base"] = "cannot_connect"
-            except InvalidAuth:
-                errors["base"] = "invalid_auth"
-            except Exception:
-                _LOGGER.exception("Unexpected exception")
-                errors["base"] = "unknown"
-            else:
+            info, errors = await self._async_validate(user_input)
+
+            if info:
                 return self.async_create_entry(title=info["title"], data=user_input)
 
         return self.async_show_form(
@@ -96,6 +126,194 @@ class WaterSmartConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call-arg]
             },
         )
 
+    async def async_step_import(self, import_data: dict[str, Any]) -> ConfigFlowResult:
+        """Add an account from a bulk import.
+
+        Returns:
+            The config flow result.
+        """
+        data = {
+            key: import_data[key] for key in (CONF_HOST, CONF_USERNAME, CONF_PASSWORD)
+        }
+        self._async_abort_entries_match(
+            {CONF_HOST: data[CONF_HOST], CONF_USERNAME: data[CONF_USERNAME]}
+        )
+        info, errors = await self._async_validate(data)
+
+        if not info:
+            return self.async_abort(reason=errors["base"])
+
+        return self.async_create_entry(title=info["title"], data=data)
+
+    async def async_step_reauth(
+        self,
+        entry_data: Mapping[str, Any],  # noqa: ARG002
+    ) -> ConfigFlowResult:
+        """Handle re-authentication after the credentials are rejected.
+
+        Returns:
+            The config flow result.
+        """
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Ask for a new password.
+
+        Returns:
+            The config flow result.
+        """
+        errors: dict[str, str] = {}
+        entry = self._get_reauth_entry()
+
+        if user_input is not None:
+            data = {**entry.data, **user_input}
+            info, errors = await self._async_validate(data)
+
+            if info:
+                return self.async_update_reload_and_abort(entry, data=data)
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=STEP_REAUTH_DATA_SCHEMA,
+            errors=errors,
+            description_placeholders={
+                "host": entry.data[CONF_HOST],
+                "username": entry.data[CONF_USERNAME],
+            },
+        )
+
+    async def async_step_reconfigure(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Change the host or credentials of an entry.
+
+        Returns:
+            The config flow result.
+        """
+        errors: dict[str, str] = {}
+        entry = self._get_reconfigure_entry()
+
+        if user_input is not None:
+            info, errors = await self._async_validate(user_input)
+
+            if info:
+                return self.async_update_reload_and_abort(
+                    entry, title=info["title"], data=user_input
+                )
+
+        return self.async_show_form(
+            step_id="reconfigure",
+            data_schema=self.add_suggested_values_to_schema(
+                STEP_USER_DATA_SCHEMA,
+                {
+                    CONF_HOST: entry.data[CONF_HOST],
+                    CONF_USERNAME: entry.data[CONF_USERNAME],
+                },
+            ),
+            errors=errors,
+        )
+
+    async def _async_validate(
+        self, data: dict[str, Any]
+    ) -> tuple[dict[str, Any] | None, dict[str, str]]:
+        """Validate input, mapping failures to form errors.
+
+        Returns:
+            The entry details if the input is valid & the errors otherwise.
+        """
+        try:
+            info = await validate_input(self.hass, data)
+        except CannotConnect:
+            return None, {"base": "cannot_connect"}
+        except InvalidAuth:
+            return None, {"base": "invalid_auth"}
+        except Exception:
+            _LOGGER.exception("Unexpected exception")
+            return None, {"base": "unknown"}
+
+        return info, {}
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: ConfigEntry,  # noqa: ARG004
+    ) -> OptionsFlow:
+        """Get the options flow for this handler.
+
+        Returns:
+            The options flow.
+        """
+        return WaterSmartOptionsFlow()
+
+
+class WaterSmartOptionsFlow(OptionsFlow):
+    """Handle WaterSmart options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the options.
+
+        Returns:
+            The options flow result.
+        """
+        errors: dict[str, str] = {}
+        options: Mapping[str, Any] = self.config_entry.options
+
+        if user_input is not None:
+            # cost estimation is only loaded once rate tiers are configured
+            from .cost import (  # noqa: PLC0415
+                InvalidRateScheduleError,
+                parse_rate_tiers,
+            )
+
+            try:
+                if rate_tiers := user_input.get(CONF_RATE_TIERS):
+                    parse_rate_tiers(rate_tiers)
+            except InvalidRateScheduleError:
+                errors[CONF_RATE_TIERS] = "invalid_rate_tiers"
+            else:
+                return self.async_create_entry(data=user_input)
+
+            options = user_input
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_BILLING_DAY,
+                        default=options.get(CONF_BILLING_DAY, DEFAULT_BILLING_DAY),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=28)),
+                    vol.Optional(
+                        CONF_RATE_TIERS,
+                        description={"suggested_value": options.get(CONF_RATE_TIERS)},
+                    ): str,
+                    vol.Required(
+                        CONF_FIXED_CHARGE,
+                        default=options.get(CONF_FIXED_CHARGE, DEFAULT_FIXED_CHARGE),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                    vol.Required(
+                        CONF_HOURLY_RETENTION_DAYS,
+                        default=options.get(
+                            CONF_HOURLY_RETENTION_DAYS, DEFAULT_HOURLY_RETENTION_DAYS
+                        ),
+                    ): vol.All(
+                        vol.Coerce(int), vol.Range(min=MIN_HOURLY_RETENTION_DAYS)
+                    ),
+                    vol.Required(
+                        CONF_DAILY_RETENTION_MONTHS,
+                        default=options.get(
+                            CONF_DAILY_RETENTION_MONTHS, DEFAULT_DAILY_RETENTION_MONTHS
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                }
+            ),
+            errors=errors,
+        )
+
 
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
@@ -9,9 +9,52 @@ DOMAIN: Final = "watersmart"
 MANUFACTURER: Final = "WaterSmart by VertexOne"
 DEFAULT_SCAN_INTERVAL = timedelta(hours=1)
 
+# Fired with the hours each refresh adds to an entry's history.
+EVENT_NEW_READINGS: Final = "watersmart_new_readings"
+
+# Delay between the first refreshes of entries set up while Home Assistant
+# is starting.
+STARTUP_REFRESH_STAGGER = timedelta(seconds=5)
+
+# Accounts listed in YAML are imported as config entries.
+CONF_ACCOUNTS: Final = "accounts"
+
+# Accounts an import validates & sets up at the same time. Logins to each host
+# are further limited by its rate limiter.
+IMPORT_CONCURRENCY: Final = 4
+
+CONF_BILLING_DAY: Final = "billing_day"
+DEFAULT_BILLING_DAY: Final = 1
+CONF_RATE_TIERS: Final = "rate_tiers"
+CONF_FIXED_CHARGE: Final = "fixed_charge"
+DEFAULT_FIXED_CHARGE: Final = 0.0
+
+# History is kept hourly for a number of days, then as daily rollups for a
+# number of months & as monthly totals after that. Hourly history must cover
+# the longest usage window & billing cycle.
+CONF_HOURLY_RETENTION_DAYS: Final = "hourly_retention_days"
+DEFAULT_HOURLY_RETENTION_DAYS: Final = 90
+MIN_HOURLY_RETENTION_DAYS: Final = 35
+CONF_DAILY_RETENTION_MONTHS: Final = "daily_retention_months"
+DEFAULT_DAILY_RETENTION_MONTHS: Final = 24
+
 
 class SensorKey(StrEnum):
     """Converter key enumeration class."""
 
     GALLONS_FOR_MOST_RECENT_HOUR = auto()
     GALLONS_FOR_MOST_RECENT_FULL_DAY_KEY = auto()
+    GALLONS_FOR_LAST_7_DAYS = auto()
+    GALLONS_FOR_LAST_30_DAYS = auto()
+    GALLONS_MONTH_TO_DATE = auto()
+    GALLONS_BILLING_CYCLE_TO_DATE = auto()
+    AVERAGE_GALLONS_PER_HOUR = auto()
+    COST_BILLING_CYCLE_TO_DATE = auto()
+    COST_FOR_MOST_RECENT_FULL_DAY = auto()
+
+
+class BinarySensorKey(StrEnum):
+    """Binary sensor key enumeration class."""
+
+    CONTINUOUS_FLOW = auto()
+    UNUSUAL_USAGE = auto()
@@ -1,32 +1,90 @@
 """The WaterSmart coordinator."""
 
-from asyncio import timeout
+from __future__ import annotations
+
+from asyncio import Lock, timeout
+from bisect import bisect_left
 from collections.abc import Callable
 import datetime as dt
 import functools
 import logging
-from typing import Any, Protocol, TypedDict, cast
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any, Protocol, TypedDict, cast
 
 from aiohttp.client_exceptions import ClientConnectorError
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import issue_registry as ir
 from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from homeassistant.util.dt import as_local, get_default_time_zone, start_of_local_day
+from homeassistant.util.dt import as_local, get_default_time_zone
 
+from .budget import get_memory_budget, read_hours, write_hours
+from .cache import get_response_cache
+from .changes import ChangeLog
 from .client import AuthenticationError, UsageRecord, WaterSmartClient
-from .const import DEFAULT_SCAN_INTERVAL, DOMAIN, MANUFACTURER, SensorKey
+from .const import (
+    DEFAULT_BILLING_DAY,
+    DEFAULT_DAILY_RETENTION_MONTHS,
+    DEFAULT_HOURLY_RETENTION_DAYS,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    EVENT_NEW_READINGS,
+    MANUFACTURER,
+    MIN_HOURLY_RETENTION_DAYS,
+    SensorKey,
+)
+from .history import (
+    DAY_SECONDS,
+    GALLONS_PRECISION,
+    HOUR_SECONDS,
+    RECORD_BYTES,
+    HourlyHistory,
+    hour_of_day,
+    start_of_billing_cycle,
+    start_of_day,
+)
+from .leak import ContinuousFlowDetector
+from .localtime import TransitionTable, get_transition_table
+from .profile import UsageProfile
+from .ratelimit import Priority
+from .resilience import CircuitOpenError
+from .retention import RetainedHistory, RetentionPolicy, write_compaction
 from .types import SensorData
 
-EXCEPTIONS = (AuthenticationError, ClientConnectorError)
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from homeassistant.config_entries import ConfigEntry
+
+    from .cost import CostTracker, RateSchedule
+
+EXCEPTIONS = (AuthenticationError, CircuitOpenError, ClientConnectorError)
 
 _LOGGER = logging.getLogger(__name__)
 
+COST_PRECISION = 2
+
+_read_datetime = itemgetter("read_datetime")
+
+# Approximate bytes held for each item of a list in sensor attributes or
+# service responses.
+ATTRIBUTE_ITEM_BYTES = 280
+
 
 class CoordinatorData(TypedDict, total=False):
     """Shape of coordinator data."""
 
     gallons_for_most_recent_hour: SensorData
     gallons_for_most_recent_full_day: SensorData
+    gallons_for_last_7_days: SensorData
+    gallons_for_last_30_days: SensorData
+    gallons_month_to_date: SensorData
+    gallons_billing_cycle_to_date: SensorData
+    average_gallons_per_hour: SensorData
+    cost_billing_cycle_to_date: SensorData
+    cost_for_most_recent_full_day: SensorData
+    continuous_flow: SensorData
+    unusual_usage: SensorData
     hourly: list[UsageRecord]
 
 
@@ -47,6 +105,12 @@ class WaterSmartUpdateCoordinator(DataUpdateCoordinator[CoordinatorData]):
         watersmart: WaterSmartClient,
         hostname: str,
         username: str,
+        *,
+        billing_day: int = DEFAULT_BILLING_DAY,
+        rate_schedule: RateSchedule | None = None,
+        retention: RetentionPolicy | None = None,
+        retained: RetainedHistory | None = None,
+        spill_path: Path | None = None,
     ) -> None:
         """Initialize."""
 
@@ -60,16 +124,66 @@ class WaterSmartUpdateCoordinator(DataUpdateCoordinator[CoordinatorData]):
         self.watersmart = watersmart
         self.hostname = hostname
         self.username = username
+        self.billing_day = billing_day
         self.device_info = _get_device_info(hostname, username)
+        self._invalid_auth_issue_id = f"invalid_auth_{hostname}_{username}"
         self.data: CoordinatorData = {}
+        self.history = HourlyHistory()
+        self.retained = retained or RetainedHistory()
+        self.retention = retention or RetentionPolicy(
+            DEFAULT_HOURLY_RETENTION_DAYS, DEFAULT_DAILY_RETENTION_MONTHS
+        )
+        self._compacting = False
+        # bumped whenever queries of the history could return something new
+        self.generation = 0
+        self.spill_path = spill_path
+        self._restore_lock = Lock()
+
+        # fetched hours that were compacted before a restart are not merged
+        if (retained_end := self.retained.end) is not None:
+            self.history.retire_before(retained_end)
+        self._hourly_data: list[UsageRecord] | None = None
+        self.continuous_flow = ContinuousFlowDetector()
+        self.profile = UsageProfile()
+        self.changes = ChangeLog()
+        self.costs: CostTracker | None = None
+
+        if rate_schedule:
+            from .cost import CostTracker  # noqa: PLC0415
+
+            self.costs = CostTracker(rate_schedule, billing_day)
+
         self.data_converters = (
             _sensor_data_for_most_recent_hour,
             _sensor_data_for_most_recent_full_day,
         )
 
+    async def async_background_refresh(self) -> None:
+        """Refresh data at background priority.
+
+        On demand refreshes wait behind scheduled refreshes for any entry on
+        the same host when its request budget is exhausted. The result is
+        handed to listeners just like that of a scheduled refresh.
+        """
+
+        try:
+            data = await self._async_fetch_data(Priority.BACKGROUND)
+        except UpdateFailed as error:
+            self.async_set_update_error(error)
+        else:
+            self.async_set_updated_data(data)
+
     async def _async_update_data(self) -> CoordinatorData:
         """Update data via library.
 
+        Returns:
+            The updated data.
+        """
+        return await self._async_fetch_data(Priority.SCHEDULED)
+
+    async def _async_fetch_data(self, priority: Priority) -> CoordinatorData:
+        """Fetch & merge hourly data, queued behind requests of higher priority.
+
         Returns:
             The updated data.
 
@@ -77,22 +191,278 @@ class WaterSmartUpdateCoordinator(DataUpdateCoordinator[CoordinatorData]):
             UpdateFailed: If there is an error that could typically occur.
         """
         try:
-            async with timeout(30):
-                result: CoordinatorData = {
-                    "hourly": await self.watersmart.async_get_hourly_data(),
-                }
+            # leaves room for the client's login & data retries, which have
+            # their own per-phase timeouts
+            async with timeout(60):
+                hourly = await self.watersmart.async_get_hourly_data(priority)
         except EXCEPTIONS as error:
+            if isinstance(error, AuthenticationError):
+                ir.async_create_issue(
+                    self.hass,
+                    DOMAIN,
+                    self._invalid_auth_issue_id,
+                    is_fixable=False,
+                    severity=ir.IssueSeverity.ERROR,
+                    translation_key="invalid_auth",
+                    translation_placeholders={
+                        "host": self.hostname,
+                        "username": self.username,
+                    },
+                )
+
+                # polling continues, so a password that was only rejected
+                # briefly recovers without re-authenticating
+                cast("ConfigEntry", self.config_entry).async_start_reauth(self.hass)
             raise UpdateFailed(error) from error
 
+        ir.async_delete_issue(self.hass, DOMAIN, self._invalid_auth_issue_id)
+
+        # the client hands back the same list when the response is unchanged
+        if hourly is self._hourly_data:
+            _LOGGER.debug("Hourly data unchanged")
+            return self.data
+
+        self._hourly_data = hourly
+
+        if self.history.spilled_before is not None:
+            await self._async_restore_revised(hourly)
+
+        initial = not self.history.timestamps
+        merge = self.history.merge(hourly)
+        self.profile.update(merge)
+
+        self.changes.append(merge)
+
+        if merge.changed:
+            self.generation += 1
+
+        for record in merge.new:
+            self.continuous_flow.update(record, hour_of_day(record["read_datetime"]))
+
+        history = self.history
+        last_read = history.timestamps[-1]
+        end = last_read + HOUR_SECONDS
+
+        result: CoordinatorData = {
+            "hourly": history.records,
+            "gallons_for_last_7_days": _sensor_data_for_window(
+                history, end - 7 * DAY_SECONDS, end
+            ),
+            "gallons_for_last_30_days": _sensor_data_for_window(
+                history, end - 30 * DAY_SECONDS, end
+            ),
+            "gallons_month_to_date": _sensor_data_for_window(
+                history, start_of_billing_cycle(last_read, 1), end
+            ),
+            "gallons_billing_cycle_to_date": _sensor_data_for_window(
+                history, start_of_billing_cycle(last_read, self.billing_day), end
+            ),
+            "average_gallons_per_hour": _sensor_data_for_hour_of_day_average(history),
+            "continuous_flow": _sensor_data_for_continuous_flow(self.continuous_flow),
+            "unusual_usage": _sensor_data_for_unusual_usage(history, self.profile),
+        }
+
+        if self.costs:
+            self.costs.update(history, merge)
+            result["cost_billing_cycle_to_date"] = (
+                _sensor_data_for_cost_billing_cycle_to_date(self.costs)
+            )
+            result["cost_for_most_recent_full_day"] = (
+                _sensor_data_for_cost_most_recent_full_day(self.costs)
+            )
+
         for converter in self.data_converters:
             cast("dict[str, SensorData]", result)[converter.converter_key] = converter(
                 result
             )
 
+        # the hours loaded when the entry is set up have not newly arrived
+        if merge.new and not initial:
+            self.hass.bus.async_fire(
+                EVENT_NEW_READINGS,
+                {
+                    "config_entry": cast("ConfigEntry", self.config_entry).entry_id,
+                    "readings": _serialize_records(merge.new),
+                },
+            )
+
+        self._async_schedule_compaction(last_read)
+        get_memory_budget(self.hass).async_schedule_enforce()
+
         _LOGGER.debug("Async update complete")
 
         return result
 
+    def _async_schedule_compaction(self, last_read: int) -> None:
+        """Compact hours that have aged out of hourly retention in the background.
+
+        Cutoffs fall on day boundaries, so this happens about once a day.
+        """
+
+        cutoff = self.retention.hourly_cutoff(last_read)
+
+        if self._compacting or self.history.first_timestamp >= cutoff:
+            return
+
+        self._compacting = True
+        cast("ConfigEntry", self.config_entry).async_create_background_task(
+            self.hass, self._async_compact(cutoff), f"{self.name} compaction"
+        )
+
+    async def _async_compact(self, cutoff: int) -> None:
+        """Roll hours before a cutoff up into days & old days into months.
+
+        The rollups are computed & written in the executor. Hours being
+        compacted stay queryable until the rollups replace them & are no longer
+        merged.
+        """
+
+        history = self.history
+        retained = self.retained
+
+        try:
+            await self.async_restore_history()
+            records = history.retire_before(cutoff)
+            # the rollups are read here so the executor never reads the mapping
+            # while it could be replaced or closed
+            store = await self.hass.async_add_executor_job(
+                write_compaction,
+                retained.path,
+                retained.monthly,
+                retained.daily,
+                records,
+                self.retention.daily_cutoff(cutoff),
+            )
+            retained.replace(store)
+            history.drop_before(cutoff)
+            self.generation += 1
+        finally:
+            self._compacting = False
+
+        _LOGGER.debug("Compacted %s hours before %s", len(records), cutoff)
+
+    def memory_usage(self) -> dict[str, int]:
+        """Get the approximate memory held for the entry's data.
+
+        Returns:
+            The bytes held for each kind of data.
+        """
+
+        return {
+            "hourly_history": self.history.nbytes,
+            "attributes": ATTRIBUTE_ITEM_BYTES
+            * sum(
+                len(value)
+                for data in self.data.values()
+                if isinstance(data, dict)
+                for value in data["attrs"].values()
+                if isinstance(value, list)
+            ),
+            "responses": get_response_cache(self.hass).nbytes(
+                cast("ConfigEntry", self.config_entry).entry_id
+            ),
+        }
+
+    async def async_spill_history(self) -> int:
+        """Move hours that sensors no longer need to disk.
+
+        Hours within the minimum hourly retention always stay in memory.
+
+        Returns:
+            The approximate bytes freed.
+        """
+
+        history = self.history
+
+        if (
+            self.spill_path is None
+            or self._compacting
+            or history.spilled_before is not None
+            or not history.timestamps
+        ):
+            return 0
+
+        before = (
+            start_of_day(history.timestamps[-1])
+            - (MIN_HOURLY_RETENTION_DAYS - 1) * DAY_SECONDS
+        )
+        records = history.records_between(None, before)
+
+        if not records:
+            return 0
+
+        await self.hass.async_add_executor_job(
+            write_hours,
+            self.spill_path,
+            records,
+            history.cumulative[: len(records)],
+        )
+
+        # hours merged, compacted or spilled while writing are not in the file
+        if (
+            self._compacting
+            or history.spilled_before is not None
+            or history.records_between(None, before) != records
+        ):
+            return 0
+
+        history.detach_before(before)
+        _LOGGER.debug("Spilled %s hours before %s", len(records), before)
+
+        return len(records) * RECORD_BYTES
+
+    async def async_restore_history(self) -> None:
+        """Load spilled hours back into memory."""
+
+        async with self._restore_lock:
+            if self.history.spilled_before is None or self.spill_path is None:
+                return
+
+            records, cumulative = await self.hass.async_add_executor_job(
+                read_hours, self.spill_path
+            )
+            self.history.attach(records, cumulative)
+
+        _LOGGER.debug("Restored %s spilled hours", len(records))
+
+    async def async_load_history(self, start: int | None) -> None:
+        """Prepare the hourly history for a query from `start` on.
+
+        The entry becomes the most recently queried & spilled hours are loaded
+        back when the query reaches them.
+        """
+
+        get_memory_budget(self.hass).touch(self)
+        spilled_before = self.history.spilled_before
+
+        if spilled_before is not None and (start is None or start < spilled_before):
+            await self.async_restore_history()
+
+    async def _async_restore_revised(self, hourly: list[UsageRecord]) -> None:
+        """Load spilled hours back when fetched records revise them.
+
+        Fetched records that match the spilled hours are ignored by the merge,
+        so a refresh only loads them when something changed.
+        """
+
+        history = self.history
+        first = bisect_left(hourly, history.start or 0, key=_read_datetime)
+        last = bisect_left(
+            hourly, cast("int", history.spilled_before), key=_read_datetime
+        )
+
+        if first == last or self.spill_path is None:
+            return
+
+        records, _ = await self.hass.async_add_executor_job(read_hours, self.spill_path)
+        spilled = {record["read_datetime"]: record for record in records}
+
+        if any(
+            spilled.get(record["read_datetime"]) != record
+            for record in hourly[first:last]
+        ):
+            await self.async_restore_history()
+
 
 def _get_device_info(hostname: str, username: str) -> DeviceInfo:
     """Get device info.
@@ -108,10 +478,16 @@ def _get_device_info(hostname: str, username: str) -> DeviceInfo:
     )
 
 
-def _from_timestamp(timestamp: int) -> dt.datetime:
-    return dt.datetime.fromtimestamp(timestamp, tz=dt.UTC).replace(
-        tzinfo=get_default_time_zone()
-    )
+def _local_times() -> TransitionTable:
+    return get_transition_table(get_default_time_zone())
+
+
+def _isoformat(timestamp: int) -> str:
+    return _local_times().isoformat(timestamp)
+
+
+def _to_timestamp(value: dt.datetime) -> int:
+    return int(as_local(value).replace(tzinfo=dt.UTC).timestamp())
 
 
 class _DataConverter:
@@ -156,12 +532,11 @@ def _sensor_data_for_most_recent_hour(data: CoordinatorData) -> SensorData:
 
     records = data["hourly"][-24:]
     record = records[-1]
-    record_date = as_local(_from_timestamp(record["read_datetime"]))
 
     return {
         "state": _record_gallons(record),
         "attrs": {
-            "start": record_date.isoformat(),
+            "start": _isoformat(record["read_datetime"]),
             "related": _serialize_records(records),
         },
     }
@@ -186,6 +561,146 @@ def _sensor_data_for_most_recent_full_day(data: CoordinatorData) -> SensorData:
     }
 
 
+def _sensor_data_for_cost_billing_cycle_to_date(costs: CostTracker) -> SensorData:
+    """Extract cost for the current billing cycle including fixed charges.
+
+    Returns:
+        The cost & cycle details.
+    """
+
+    cycle = costs.cycles[-1]
+
+    return {
+        "state": round(cycle.cost + costs.schedule.fixed_charge, COST_PRECISION),
+        "attrs": {
+            "start": _isoformat(cycle.start),
+            "gallons": round(cycle.gallons, GALLONS_PRECISION),
+            "usage_cost": round(cycle.cost, COST_PRECISION),
+            "fixed_charge": costs.schedule.fixed_charge,
+        },
+    }
+
+
+def _sensor_data_for_cost_most_recent_full_day(costs: CostTracker) -> SensorData:
+    """Extract cost of usage for the most recent full day.
+
+    Returns:
+        The cost & day details.
+    """
+
+    day = next((day for day in reversed(costs.days) if day.hours >= 24), None)
+
+    if not day:
+        return {"state": None, "attrs": {}}
+
+    return {
+        "state": round(day.cost, COST_PRECISION),
+        "attrs": {
+            "start": _isoformat(day.start),
+            "gallons": round(day.gallons, GALLONS_PRECISION),
+        },
+    }
+
+
+def _sensor_data_for_continuous_flow(detector: ContinuousFlowDetector) -> SensorData:
+    """Extract data for continuous flow detection.
+
+    Returns:
+        The detector state & attributes.
+    """
+
+    last_read = detector.last_read_datetime
+
+    return {
+        "state": detector.is_on,
+        "attrs": {
+            "start": (_isoformat(last_read) if last_read is not None else None),
+            "consecutive_flow_hours": detector.consecutive_flow_hours,
+            "min_overnight_gallons": detector.min_overnight_gallons,
+            "baseline_gallons": detector.baseline_gallons,
+            "leak_gallons": detector.leak_gallons,
+        },
+    }
+
+
+def _sensor_data_for_unusual_usage(
+    history: HourlyHistory, profile: UsageProfile
+) -> SensorData:
+    """Extract data comparing the most recent hour to its weekday & hour.
+
+    Returns:
+        Whether usage is unusual & the statistics it was compared with.
+    """
+
+    record = history.records[-1]
+    baseline = profile.baseline(record)
+    stddev = baseline.stddev
+
+    return {
+        "state": profile.is_unusual(record),
+        "attrs": {
+            "start": _isoformat(record["read_datetime"]),
+            "gallons": record["gallons"],
+            "expected_gallons": (
+                round(baseline.mean, GALLONS_PRECISION) if baseline.count else None
+            ),
+            "stddev_gallons": (
+                round(stddev, GALLONS_PRECISION) if stddev is not None else None
+            ),
+            "samples": baseline.count,
+        },
+    }
+
+
+def _sensor_data_for_window(history: HourlyHistory, start: int, end: int) -> SensorData:
+    """Extract data for a window of usage using the history's cumulative sums.
+
+    Returns:
+        The total gallons & window details.
+    """
+
+    return {
+        "state": history.gallons_between(start, end),
+        "attrs": {
+            "start": _isoformat(start),
+            "hours": history.count_between(start, end),
+        },
+    }
+
+
+def _sensor_data_for_hour_of_day_average(history: HourlyHistory) -> SensorData:
+    """Extract average hourly usage overall & for each hour of the day.
+
+    Returns:
+        The average gallons per hour & per hour of day averages.
+    """
+
+    gallons = history.hour_of_day_gallons
+    counts = history.hour_of_day_counts
+    total_count = sum(counts)
+
+    return {
+        "state": (
+            round(sum(gallons) / total_count, GALLONS_PRECISION)
+            if total_count
+            else None
+        ),
+        "attrs": {
+            "hours_of_day": [
+                {
+                    "hour": hour,
+                    "gallons": (
+                        round(gallons[hour] / counts[hour], GALLONS_PRECISION)
+                        if counts[hour]
+                        else None
+                    ),
+                }
+                for hour in range(24)
+            ],
+        },
+    }
+
+
 def _records_from_first_full_day(data: CoordinatorData) -> list[UsageRecord]:
     """Extract records for first full day.
 
@@ -194,23 +709,22 @@ def _records_from_first_full_day(data: CoordinatorData) -> list[UsageRecord]:
     """
 
     full_day_records = []
-    last_full_day = None
+    last_full_day: int | None = None
 
+    # local days & hours come from the wall-clock timestamps, so days on
+    # which clocks change are bucketed by the hours shown on the clock
     for record in reversed(data["hourly"]):
-        record_date = as_local(_from_timestamp(record["read_datetime"]))
-        start_of_day = start_of_local_day(record_date)
+        timestamp = record["read_datetime"]
+        day = start_of_day(timestamp)
 
-        if last_full_day and start_of_day < last_full_day:
+        if last_full_day is not None and day < last_full_day:
             break
 
-        if last_full_day and start_of_day == last_full_day:
+        if last_full_day is not None and day == last_full_day:
             full_day_records.append(record)
-        elif (
-            not last_full_day
-            and (record_date - start_of_day).total_seconds() // 3600 >= 23
-        ):
+        elif last_full_day is None and hour_of_day(timestamp) >= 23:
             full_day_records.append(record)
-            last_full_day = start_of_day
+            last_full_day = day
 
     return list(reversed(full_day_records))
 
@@ -235,9 +749,11 @@ def _serialize_records(records: list[UsageRecord]) -> list[dict[str, Any]]:
         The serialized records.
     """
 
+    local_times = _local_times()
+
     return [
         {
-            "start": as_local(_from_timestamp(record["read_datetime"])).isoformat(),
+            "start": local_times.isoformat(record["read_datetime"]),
             "gallons": _record_gallons(record),
         }
         for record in records
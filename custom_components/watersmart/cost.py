@@ -0,0 +1,199 @@
+"""WaterSmart cost estimation from tiered rates."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from dataclasses import dataclass, field
+import math
+
+from .client import UsageRecord
+from .history import HistoryMerge, HourlyHistory, start_of_billing_cycle, start_of_day
+
+
+class InvalidRateScheduleError(ValueError):
+    """Invalid rate schedule Error."""
+
+
+@dataclass(frozen=True)
+class RateTier:
+    """A price per gallon that applies once cycle usage reaches a threshold."""
+
+    start_gallons: float
+    price: float
+
+
+@dataclass(frozen=True)
+class RateSchedule:
+    """Tiered rates & fixed charges applied to each billing cycle."""
+
+    tiers: tuple[RateTier, ...]
+    fixed_charge: float = 0
+
+    def add_usage(self, cycle: CycleTotal, gallons: float) -> float:
+        """Add usage to a cycle, splitting it across tier boundaries.
+
+        The cycle tracks its running gallons & current tier so that only the
+        boundaries crossed by this usage need to be considered.
+
+        Returns:
+            The cost of the added usage.
+        """
+
+        tiers = self.tiers
+        cost = 0.0
+        remaining = gallons
+
+        while remaining > 0:
+            index = cycle.tier_index
+            tier_end = (
+                tiers[index + 1].start_gallons if index + 1 < len(tiers) else math.inf
+            )
+            amount = min(remaining, tier_end - cycle.gallons)
+            cost += amount * tiers[index].price
+            cycle.gallons += amount
+            remaining -= amount
+
+            if cycle.gallons >= tier_end:
+                cycle.tier_index += 1
+
+        cycle.cost += cost
+
+        return cost
+
+
+def parse_rate_tiers(value: str) -> tuple[RateTier, ...]:
+    """Parse rate tiers.
+
+    Tiers are comma separated prices per gallon. Each price after the first is
+    prefixed by the cycle usage in gallons at which it starts, i.e.
+    `0.004, 6000:0.006, 12000:0.009`.
+
+    Returns:
+        The rate tiers.
+
+    Raises:
+        InvalidRateScheduleError: When the tiers cannot be parsed.
+    """
+
+    tiers: list[RateTier] = []
+
+    for index, part in enumerate(value.split(",")):
+        start, _, price = part.strip().rpartition(":")
+
+        try:
+            tier = RateTier(float(start) if start else 0, float(price))
+        except ValueError as error:
+            raise InvalidRateScheduleError(part) from error
+
+        if (index == 0 and tier.start_gallons != 0) or (
+            index > 0 and (not start or tier.start_gallons <= tiers[-1].start_gallons)
+        ):
+            raise InvalidRateScheduleError(part)
+
+        tiers.append(tier)
+
+    return tuple(tiers)
+
+
+@dataclass
+class CycleTotal:
+    """Running totals for a billing cycle."""
+
+    start: int
+    gallons: float = 0
+    cost: float = 0
+    tier_index: int = 0
+
+
+@dataclass
+class DayTotal:
+    """Totals for a day."""
+
+    start: int
+    gallons: float = 0
+    cost: float = 0
+    hours: int = 0
+
+
+@dataclass
+class CostTracker:
+    """Per cycle & per day cost totals maintained as history is merged."""
+
+    schedule: RateSchedule
+    billing_day: int
+    cycles: list[CycleTotal] = field(default_factory=list)
+    days: list[DayTotal] = field(default_factory=list)
+    day_starts: list[int] = field(default_factory=list)
+
+    def update(self, history: HourlyHistory, merge: HistoryMerge) -> None:
+        """Update totals from a merge into the history.
+
+        New records are added to the running totals. Revised records change
+        where tier boundaries fall for the rest of the cycle, so the totals are
+        replayed from the start of the earliest affected day. The cycle's
+        earlier days are replayed from their totals, as their hours may have
+        been spilled or compacted since.
+        """
+
+        if not merge.revised:
+            for record in merge.new:
+                self._add(record)
+            return
+
+        earliest = start_of_day(
+            min(record["read_datetime"] for record in merge.revised)
+        )
+        cycle_start = start_of_billing_cycle(earliest, self.billing_day)
+
+        while self.cycles and self.cycles[-1].start >= cycle_start:
+            self.cycles.pop()
+
+        first = bisect_left(self.day_starts, cycle_start)
+        index = bisect_left(self.day_starts, earliest)
+        del self.days[index:]
+        del self.day_starts[index:]
+
+        if first < index:
+            cycle = CycleTotal(cycle_start)
+            self.cycles.append(cycle)
+
+            # a day's cost only depends on the cycle's usage before it
+            for day in self.days[first:]:
+                self.schedule.add_usage(cycle, day.gallons)
+
+        for record in history.records[bisect_left(history.timestamps, earliest) :]:
+            self._add(record)
+
+    def days_between(self, start: int | None, end: int | None) -> list[DayTotal]:
+        """Get totals for days starting within `start <= day < end`.
+
+        Either bound may be omitted to leave the range open.
+
+        Returns:
+            The day totals.
+        """
+
+        day_starts = self.day_starts
+        first = bisect_left(day_starts, start) if start is not None else 0
+        last = bisect_left(day_starts, end) if end is not None else len(day_starts)
+
+        return self.days[first:last]
+
+    def _add(self, record: UsageRecord) -> None:
+        timestamp = record["read_datetime"]
+        day_start = start_of_day(timestamp)
+
+        if not self.days or self.days[-1].start != day_start:
+            cycle_start = start_of_billing_cycle(timestamp, self.billing_day)
+
+            if not self.cycles or self.cycles[-1].start != cycle_start:
+                self.cycles.append(CycleTotal(cycle_start))
+
+            self.days.append(DayTotal(day_start))
+            self.day_starts.append(day_start)
+
+        day = self.days[-1]
+        gallons = record["gallons"] or 0
+        day.gallons += gallons
+        day.cost += self.schedule.add_usage(self.cycles[-1], gallons)
+        day.hours += 1
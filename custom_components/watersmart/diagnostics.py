@@ -7,6 +7,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
 from homeassistant.core import HomeAssistant
 
+from .budget import get_memory_budget
 from .coordinator import WaterSmartUpdateCoordinator
 
 TO_REDACT = {
@@ -16,11 +17,13 @@ TO_REDACT = {
 
 
 async def async_get_config_entry_diagnostics(  # noqa: RUF029
-    hass: HomeAssistant,  # noqa: ARG001
+    hass: HomeAssistant,
     entry: ConfigEntry,
 ) -> dict[str, Any]:
     """Return diagnostics for a config entry."""
     coordinator: WaterSmartUpdateCoordinator = entry.runtime_data.coordinator
+    budget = get_memory_budget(hass)
+    usage = coordinator.memory_usage()
 
     return cast(
         "dict[str, Any]",
@@ -28,6 +31,13 @@ async def async_get_config_entry_diagnostics(  # noqa: RUF029
             {
                 "entry": entry.as_dict(),
                 "data": coordinator.data,
+                "memory": {
+                    **usage,
+                    "total": sum(usage.values()),
+                    "rollups_mapped": coordinator.retained.nbytes,
+                    "spilled_hours_before": coordinator.history.spilled_before,
+                    "budget": {"limit": budget.limit, "total": budget.total()},
+                },
             },
             TO_REDACT,
         ),
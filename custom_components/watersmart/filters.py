@@ -0,0 +1,65 @@
+"""Filters for hourly history queries."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from .client import UsageRecord
+from .history import hour_of_day, weekday
+
+
+@dataclass(frozen=True)
+class RecordFilter:
+    """Conditions an hourly record must meet, which all apply when given.
+
+    Filters are hashable, so they can be part of cache keys.
+    """
+
+    min_gallons: float | None = None
+    max_gallons: float | None = None
+    leak_only: bool = False
+    null_only: bool = False
+    hours: frozenset[int] | None = None
+    weekdays: frozenset[int] | None = None
+
+    def __bool__(self) -> bool:
+        """Whether the filter excludes anything.
+
+        Returns:
+            If any condition is given.
+        """
+        return self != _NO_FILTER
+
+    def __call__(self, record: UsageRecord) -> bool:
+        """Check a record.
+
+        Conditions on the timestamp are checked before those on the values.
+
+        Returns:
+            If the record meets all conditions.
+        """
+
+        timestamp = record["read_datetime"]
+
+        if self.hours is not None and hour_of_day(timestamp) not in self.hours:
+            return False
+
+        if self.weekdays is not None and weekday(timestamp) not in self.weekdays:
+            return False
+
+        if self.leak_only and not record["leak_gallons"]:
+            return False
+
+        gallons = record["gallons"]
+
+        if gallons is None:
+            return self.min_gallons is None and self.max_gallons is None
+
+        return (
+            not self.null_only
+            and (self.min_gallons is None or gallons >= self.min_gallons)
+            and (self.max_gallons is None or gallons <= self.max_gallons)
+        )
+
+
+_NO_FILTER = RecordFilter()
@@ -0,0 +1,72 @@
+"""Hand clients validated by config flows to entry setup."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util.hass_dict import HassKey
+
+from .client import WaterSmartClient
+from .const import DOMAIN
+
+# Seconds a validated client waits to be picked up. Entries are set up right
+# after their flow finishes, so this only needs to cover that gap & is well
+# within the time after which the client logs in again.
+HANDOFF_TIMEOUT = 60
+
+DATA_HANDOFF: HassKey[dict[tuple[str, str], _Handoff]] = HassKey(f"{DOMAIN}_handoff")
+
+
+@dataclass
+class _Handoff:
+    client: WaterSmartClient
+    password: str
+    expires_at: float
+
+
+@callback
+def async_offer_client(
+    hass: HomeAssistant,
+    client: WaterSmartClient,
+    hostname: str,
+    username: str,
+    password: str,
+) -> None:
+    """Offer a logged in client to the entry setup that follows a flow."""
+
+    handoffs = hass.data.setdefault(DATA_HANDOFF, {})
+    now = time.monotonic()
+
+    for key in [key for key, item in handoffs.items() if item.expires_at <= now]:
+        del handoffs[key]
+
+    handoffs[hostname, username] = _Handoff(client, password, now + HANDOFF_TIMEOUT)
+
+
+@callback
+def async_take_client(
+    hass: HomeAssistant, hostname: str, username: str, password: str
+) -> WaterSmartClient | None:
+    """Take the client offered for an account, if it is still fresh.
+
+    The client keeps its session, cookies & account number, so the entry does
+    not need to log in again.
+
+    Returns:
+        The client, if one was offered for the same credentials.
+    """
+
+    handoff: _Handoff | None = hass.data.get(DATA_HANDOFF, {}).pop(
+        (hostname, username), None
+    )
+
+    if (
+        handoff is None
+        or handoff.password != password
+        or handoff.expires_at <= time.monotonic()
+    ):
+        return None
+
+    return handoff.client
@@ -0,0 +1,326 @@
+"""WaterSmart hourly history merging."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Callable
+from dataclasses import dataclass, field
+import datetime as dt
+from itertools import islice
+
+from .client import UsageRecord
+from .columns import prefix_sums
+
+HOUR_SECONDS = 3600
+DAY_SECONDS = 24 * HOUR_SECONDS
+
+# Window sums are differences of running totals, so round away the
+# floating point noise that accumulates in them.
+GALLONS_PRECISION = 6
+
+# Approximate bytes held for each record: the record dict & its values, plus
+# its slot in each list & its running total.
+RECORD_BYTES = 288
+
+
+@dataclass
+class HistoryMerge:
+    """Outcome of merging fetched records into the history."""
+
+    new: list[UsageRecord] = field(default_factory=list)
+    revised: list[UsageRecord] = field(default_factory=list)
+    replaced: list[UsageRecord] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        """Whether the merge changed the history."""
+        return bool(self.new or self.revised)
+
+
+class HourlyHistory:
+    """Hourly usage records accumulated across refreshes.
+
+    Records are kept sorted by `read_datetime`. Fetched records that are newer
+    than anything seen so far are appended & reported as new. Records that land
+    within the existing span replace (or fill a gap in) what is stored & are
+    reported as revised, along with the records they replaced.
+
+    A cumulative sum of gallons is maintained alongside the records so that the
+    usage for any range is a subtraction of two entries. It is extended as new
+    records are appended & only rebuilt from the earliest revised record.
+    Per hour of day totals are maintained the same way.
+
+    Records before `start` have been compacted away. Fetched records before it
+    are ignored, so they are not counted twice. Records before `spilled_before`
+    have been detached to be kept on disk & fetched records before it are
+    ignored until they are attached again.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.start: int | None = None
+        self.spilled_from: int | None = None
+        self.spilled_before: int | None = None
+        self.records: list[UsageRecord] = []
+        self.timestamps: list[int] = []
+        self.cumulative: list[float] = [0]
+        self.hour_of_day_gallons: list[float] = [0] * 24
+        self.hour_of_day_counts: list[int] = [0] * 24
+
+    def merge(self, incoming: list[UsageRecord]) -> HistoryMerge:
+        """Merge fetched records, which must be sorted by `read_datetime`.
+
+        Returns:
+            The new & revised records.
+        """
+
+        result = HistoryMerge()
+        records = self.records
+        timestamps = self.timestamps
+        rebuild_from = len(records)
+
+        for record in incoming:
+            timestamp = record["read_datetime"]
+
+            if self.start is not None and timestamp < self.start:
+                continue
+
+            if self.spilled_before is not None and timestamp < self.spilled_before:
+                continue
+
+            if not timestamps or timestamp > timestamps[-1]:
+                records.append(record)
+                timestamps.append(timestamp)
+                result.new.append(record)
+                self._count_hour_of_day(record, 1)
+                continue
+
+            index = bisect_left(timestamps, timestamp)
+
+            if timestamps[index] != timestamp:
+                records.insert(index, record)
+                timestamps.insert(index, timestamp)
+                result.revised.append(record)
+                self._count_hour_of_day(record, 1)
+                rebuild_from = min(rebuild_from, index)
+            elif records[index] != record:
+                self._count_hour_of_day(records[index], -1)
+                self._count_hour_of_day(record, 1)
+                result.replaced.append(records[index])
+                records[index] = record
+                result.revised.append(record)
+                rebuild_from = min(rebuild_from, index)
+
+        cumulative = self.cumulative
+        del cumulative[rebuild_from + 1 :]
+        cumulative.extend(
+            prefix_sums(
+                [record["gallons"] for record in records[rebuild_from:]],
+                cumulative[-1],
+            )
+        )
+
+        return result
+
+    def retire_before(self, timestamp: int) -> list[UsageRecord]:
+        """Stop accepting records before a timestamp, ahead of dropping them.
+
+        Returns:
+            The records that will be dropped.
+        """
+
+        if self.start is None or timestamp > self.start:
+            self.start = timestamp
+
+        return self.records_between(None, self.start)
+
+    def drop_before(self, timestamp: int) -> None:
+        """Drop records before a timestamp.
+
+        Running totals continue from the total before the first kept record &
+        per hour of day totals are left as they are.
+        """
+
+        index = bisect_left(self.timestamps, timestamp)
+        del self.records[:index]
+        del self.timestamps[:index]
+        del self.cumulative[:index]
+
+    def detach_before(self, timestamp: int) -> tuple[list[UsageRecord], list[float]]:
+        """Detach records before a timestamp so they can be kept on disk.
+
+        Returns:
+            The detached records & the running total before each of them.
+        """
+
+        index = bisect_left(self.timestamps, timestamp)
+        records = self.records[:index]
+        cumulative = self.cumulative[:index]
+        self.drop_before(timestamp)
+        self.spilled_from = records[0]["read_datetime"] if records else None
+        self.spilled_before = timestamp
+
+        return records, cumulative
+
+    def attach(self, records: list[UsageRecord], cumulative: list[float]) -> None:
+        """Attach the records detached by `detach_before` again."""
+
+        self.records[:0] = records
+        self.timestamps[:0] = [record["read_datetime"] for record in records]
+        self.cumulative[:0] = cumulative
+        self.spilled_from = self.spilled_before = None
+
+    @property
+    def first_timestamp(self) -> int:
+        """Timestamp of the first record, including detached records."""
+        return (
+            self.spilled_from if self.spilled_from is not None else self.timestamps[0]
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held for the records in bytes."""
+        return len(self.records) * RECORD_BYTES
+
+    def gallons_between(self, start: int, end: int) -> float:
+        """Get total gallons for records with `start <= read_datetime < end`.
+
+        Returns:
+            The total gallons.
+        """
+
+        timestamps = self.timestamps
+        cumulative = self.cumulative
+
+        return round(
+            cumulative[bisect_left(timestamps, end)]
+            - cumulative[bisect_left(timestamps, start)],
+            GALLONS_PRECISION,
+        )
+
+    def records_between(
+        self,
+        start: int | None,
+        end: int | None,
+        limit: int | None = None,
+        where: Callable[[UsageRecord], bool] | None = None,
+    ) -> list[UsageRecord]:
+        """Get records with `start <= read_datetime < end`.
+
+        Either bound may be omitted to leave the range open. When a limit is
+        given, only that many records from the start of the range are copied.
+        When a condition is given, only records in the range are checked & the
+        limit applies to those that meet it.
+
+        Returns:
+            The records.
+        """
+
+        first, last = self._index_range(start, end)
+
+        if where is not None:
+            records = self.records
+            matches = (
+                records[index] for index in range(first, last) if where(records[index])
+            )
+
+            return list(islice(matches, limit))
+
+        if limit is not None:
+            last = min(last, first + limit)
+
+        return self.records[first:last]
+
+    def columns_between(
+        self, start: int | None, end: int | None
+    ) -> tuple[list[int], list[float]]:
+        """Get columns for records with `start <= read_datetime < end`.
+
+        Either bound may be omitted to leave the range open.
+
+        Returns:
+            The timestamps & the running totals of gallons, starting with the
+            total before the first record.
+        """
+
+        first, last = self._index_range(start, end)
+
+        return self.timestamps[first:last], self.cumulative[first : last + 1]
+
+    def count_between(self, start: int, end: int) -> int:
+        """Get the number of records with `start <= read_datetime < end`.
+
+        Returns:
+            The number of records.
+        """
+
+        timestamps = self.timestamps
+
+        return bisect_left(timestamps, end) - bisect_left(timestamps, start)
+
+    def _index_range(self, start: int | None, end: int | None) -> tuple[int, int]:
+        timestamps = self.timestamps
+
+        return (
+            bisect_left(timestamps, start) if start is not None else 0,
+            bisect_left(timestamps, end) if end is not None else len(timestamps),
+        )
+
+    def _count_hour_of_day(self, record: UsageRecord, sign: int) -> None:
+        gallons = record["gallons"]
+
+        if gallons is None:
+            return
+
+        hour = hour_of_day(record["read_datetime"])
+        self.hour_of_day_gallons[hour] += sign * gallons
+        self.hour_of_day_counts[hour] += sign
+
+
+# WaterSmart timestamps encode local wall-clock time as if it were UTC, so
+# calendar positions can be read directly from the timestamp.
+def hour_of_day(timestamp: int) -> int:
+    """Get the local hour of day for a record timestamp.
+
+    Returns:
+        The hour of day.
+    """
+
+    return (timestamp % DAY_SECONDS) // HOUR_SECONDS
+
+
+def weekday(timestamp: int) -> int:
+    """Get the local day of the week for a record timestamp.
+
+    Returns:
+        The day of the week, where Monday is 0.
+    """
+
+    # the epoch fell on a Thursday
+    return (timestamp // DAY_SECONDS + 3) % 7
+
+
+def start_of_day(timestamp: int) -> int:
+    """Get the timestamp for the start of the local day.
+
+    Returns:
+        The start of the day.
+    """
+
+    return timestamp - timestamp % DAY_SECONDS
+
+
+def start_of_billing_cycle(timestamp: int, billing_day: int) -> int:
+    """Get the timestamp for the start of the billing cycle.
+
+    Returns:
+        The start of the most recent billing day at or before the timestamp.
+    """
+
+    value = dt.datetime.fromtimestamp(timestamp, tz=dt.UTC)
+    year, month = value.year, value.month
+
+    if value.day < billing_day:
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+
+    return int(dt.datetime(year, month, billing_day, tzinfo=dt.UTC).timestamp())
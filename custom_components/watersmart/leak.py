@@ -0,0 +1,103 @@
+"""Continuous flow (leak) detection for WaterSmart usage."""
+
+from __future__ import annotations
+
+from .client import UsageRecord
+from .history import HOUR_SECONDS
+
+# Hours of uninterrupted flow after which usage is considered continuous.
+CONTINUOUS_FLOW_HOURS = 24
+
+# Local hours (1am through 4am) used to track the minimum overnight flow.
+OVERNIGHT_HOURS = range(1, 5)
+
+# Smoothing factor for the hourly baseline, roughly a one week window.
+BASELINE_ALPHA = 2 / (24 * 7 + 1)
+
+# Share of the hourly baseline that flow must stay at or above through the
+# night to be considered continuous before a full day of flow.
+OVERNIGHT_BASELINE_RATIO = 0.25
+
+
+class ContinuousFlowDetector:
+    """Streaming detector for continuous water flow.
+
+    Records are fed in one at a time as they are merged into the history & all
+    state is updated in constant time, so there is no need to re-scan the full
+    history on each refresh. Revisions to hours that have already been seen are
+    not replayed.
+
+    Flow is continuous once it has not stopped for a full day. Flow that stays
+    high relative to the household's baseline through the night is also
+    continuous, as long as it has not stopped since.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.consecutive_flow_hours = 0
+        self.min_overnight_gallons: float | None = None
+        self.baseline_gallons: float | None = None
+        self.leak_gallons: float = 0
+        self.last_read_datetime: int | None = None
+        self._overnight_min: float | None = None
+        # flow stayed high through the last night & has not stopped since
+        self._overnight_flow = False
+
+    @property
+    def is_on(self) -> bool:
+        """Whether continuous flow or a utility reported leak was detected."""
+        return (
+            self.consecutive_flow_hours >= CONTINUOUS_FLOW_HOURS
+            or self._overnight_flow
+            or self.leak_gallons > 0
+        )
+
+    def update(self, record: UsageRecord, local_hour: int) -> None:
+        """Update detector state with the next hourly record."""
+
+        timestamp = record["read_datetime"]
+        gallons = record["gallons"]
+
+        if (
+            self.last_read_datetime is not None
+            and timestamp - self.last_read_datetime > HOUR_SECONDS
+        ):
+            self._stop_flow()
+
+        self.last_read_datetime = timestamp
+        self.leak_gallons = record["leak_gallons"] or 0
+
+        if gallons is None:
+            self._stop_flow()
+            return
+
+        if gallons > 0:
+            self.consecutive_flow_hours += 1
+        else:
+            self._stop_flow()
+
+        baseline = self.baseline_gallons = (
+            gallons
+            if self.baseline_gallons is None
+            else self.baseline_gallons
+            + BASELINE_ALPHA * (gallons - self.baseline_gallons)
+        )
+
+        if local_hour in OVERNIGHT_HOURS:
+            self._overnight_min = (
+                gallons
+                if self._overnight_min is None
+                else min(self._overnight_min, gallons)
+            )
+        elif self._overnight_min is not None:
+            self.min_overnight_gallons = self._overnight_min
+            self._overnight_min = None
+            # the flow counted includes every overnight hour
+            self._overnight_flow = (
+                self.consecutive_flow_hours > len(OVERNIGHT_HOURS)
+                and self.min_overnight_gallons >= OVERNIGHT_BASELINE_RATIO * baseline
+            )
+
+    def _stop_flow(self) -> None:
+        self.consecutive_flow_hours = 0
+        self._overnight_flow = False
@@ -0,0 +1,296 @@
+"""UTC offset transition tables for WaterSmart record timestamps.
+
+Record timestamps encode local wall-clock time as if it were UTC. Local days &
+hours are therefore plain integer arithmetic on the timestamp, but finding the
+actual moment a record refers to, or labeling it with its UTC offset, needs the
+offset in effect at that wall-clock time. Rather than building several
+datetimes per record, the offsets are looked up in a table of the time zone's
+transitions.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections.abc import Sequence
+from dataclasses import dataclass
+import datetime as dt
+from threading import Lock
+
+DAY_SECONDS = 24 * 3600
+
+# Transitions are found a span of this many seconds at a time, extending the
+# table as needed to cover the timestamps it is asked about.
+SPAN_SECONDS = 366 * DAY_SECONDS
+
+_EPOCH_DATE = dt.date(1970, 1, 1)
+
+
+class TransitionTable:
+    """UTC offsets for a time zone, covering the spans it has been asked about.
+
+    Ambiguous & skipped wall-clock times resolve like `fold=0` datetimes: they
+    use the offset from before the transition.
+    """
+
+    def __init__(self, zone: dt.tzinfo) -> None:
+        """Initialize."""
+        self.zone = zone
+        self._coverage: _Coverage | None = None
+        self._lock = Lock()
+        # labels for each local day, empty for days with a transition
+        self._days: dict[int, tuple[str, str] | tuple[()]] = {}
+
+    def utc_offset(self, timestamp: int) -> int:
+        """Get the UTC offset in effect at a record timestamp.
+
+        Returns:
+            The offset in seconds.
+        """
+
+        coverage = self._cover(timestamp, timestamp)
+
+        return coverage.offsets[bisect_right(coverage.wall_boundaries, timestamp)]
+
+    def to_epoch(self, timestamp: int) -> int:
+        """Get the POSIX timestamp for a record timestamp.
+
+        Returns:
+            The seconds since the epoch.
+        """
+
+        return timestamp - self.utc_offset(timestamp)
+
+    def isoformat(self, timestamp: int) -> str:
+        """Format a record timestamp in local time with its UTC offset.
+
+        Returns:
+            The ISO 8601 representation.
+        """
+
+        day, seconds = divmod(timestamp, DAY_SECONDS)
+        labels = self._days.get(day)
+
+        if labels is None:
+            labels = self._days[day] = self._day_labels(day)
+
+        if not labels:
+            return self._isoformat_near_transition(timestamp)
+
+        date, suffix = labels
+        hours, seconds = divmod(seconds, 3600)
+        minutes, seconds = divmod(seconds, 60)
+
+        return f"{date}T{hours:02}:{minutes:02}:{seconds:02}{suffix}"
+
+    def _day_labels(self, day: int) -> tuple[str, str] | tuple[()]:
+        """Get the date & UTC offset labels for a local day.
+
+        Returns:
+            The labels, or nothing if the offset changes during the day.
+        """
+
+        start = day * DAY_SECONDS
+        end = start + DAY_SECONDS
+        coverage = self._cover(start, end)
+        index = bisect_right(coverage.wall_boundaries, start - DAY_SECONDS)
+
+        for moment, before, after in coverage.transitions[index:]:
+            if moment + min(before, after) >= end:
+                break
+
+            if moment + max(before, after) > start:
+                return ()
+
+        return (
+            (_EPOCH_DATE + dt.timedelta(days=day)).isoformat(),
+            _offset_suffix(
+                coverage.offsets[bisect_right(coverage.wall_boundaries, start)]
+            ),
+        )
+
+    def _isoformat_near_transition(self, timestamp: int) -> str:
+        coverage = self._cover(timestamp, timestamp)
+        epoch = (
+            timestamp
+            - coverage.offsets[bisect_right(coverage.wall_boundaries, timestamp)]
+        )
+        offset = coverage.offsets[bisect_right(coverage.utc_boundaries, epoch)]
+        # differs from the timestamp only for wall-clock times that were skipped
+        local = epoch + offset
+        day, seconds = divmod(local, DAY_SECONDS)
+        hours, seconds = divmod(seconds, 3600)
+        minutes, seconds = divmod(seconds, 60)
+        date = (_EPOCH_DATE + dt.timedelta(days=day)).isoformat()
+
+        return f"{date}T{hours:02}:{minutes:02}:{seconds:02}{_offset_suffix(offset)}"
+
+    def _offset_at(self, epoch: int) -> int:
+        value = dt.datetime.fromtimestamp(epoch, self.zone).utcoffset()
+
+        return int(value.total_seconds()) if value is not None else 0
+
+    def _cover(self, start: int, end: int) -> _Coverage:
+        """Extend the table to cover the spans from `start` through `end`.
+
+        Records are formatted both on the event loop & in the executor, so the
+        table is extended by one thread at a time & each extension is published
+        whole. Readers use the coverage returned here throughout a lookup.
+
+        Returns:
+            Coverage that includes the timestamps.
+        """
+
+        # a day either side leaves room for any UTC offset
+        first = (start - DAY_SECONDS) // SPAN_SECONDS
+        last = (end + DAY_SECONDS) // SPAN_SECONDS
+        coverage = self._coverage
+
+        if coverage is not None and coverage.includes(first, last):
+            return coverage
+
+        with self._lock:
+            coverage = self._coverage
+
+            if coverage is None:
+                coverage = _Coverage.build(
+                    first,
+                    last,
+                    self._offset_at(first * SPAN_SECONDS),
+                    self._find_transitions(first, last),
+                )
+            else:
+                # nothing is found if another thread covered the spans meanwhile
+                initial_offset = coverage.initial_offset
+                transitions = list(coverage.transitions)
+
+                if first < coverage.first_span:
+                    initial_offset = self._offset_at(first * SPAN_SECONDS)
+                    transitions[:0] = self._find_transitions(
+                        first, coverage.first_span - 1
+                    )
+
+                if last > coverage.last_span:
+                    transitions.extend(
+                        self._find_transitions(coverage.last_span + 1, last)
+                    )
+
+                coverage = _Coverage.build(
+                    min(first, coverage.first_span),
+                    max(last, coverage.last_span),
+                    initial_offset,
+                    transitions,
+                )
+
+            self._coverage = coverage
+
+        return coverage
+
+    def _find_transitions(self, first: int, last: int) -> list[tuple[int, int, int]]:
+        """Find transitions after the start of one span through the end of another.
+
+        Offsets are sampled daily, so zones are assumed to change offset no
+        more than once a day. The moment of each change is then found to the
+        second by bisection.
+
+        Returns:
+            The transitions in order.
+        """
+
+        transitions = []
+        moment = first * SPAN_SECONDS
+        offset = self._offset_at(moment)
+
+        while moment < (last + 1) * SPAN_SECONDS:
+            next_moment = moment + DAY_SECONDS
+            next_offset = self._offset_at(next_moment)
+
+            if next_offset != offset:
+                low, high = moment, next_moment
+
+                while high - low > 1:
+                    middle = (low + high) // 2
+
+                    if self._offset_at(middle) == offset:
+                        low = middle
+                    else:
+                        high = middle
+
+                transitions.append((high, offset, next_offset))
+
+            moment, offset = next_moment, next_offset
+
+        return transitions
+
+
+@dataclass(frozen=True, slots=True)
+class _Coverage:
+    """Transitions found for a range of spans, which is never changed."""
+
+    first_span: int
+    last_span: int
+    initial_offset: int
+    # (moment in UTC, offset before, offset after)
+    transitions: tuple[tuple[int, int, int], ...]
+    utc_boundaries: tuple[int, ...]
+    wall_boundaries: tuple[int, ...]
+    offsets: tuple[int, ...]
+
+    @classmethod
+    def build(
+        cls,
+        first_span: int,
+        last_span: int,
+        initial_offset: int,
+        transitions: Sequence[tuple[int, int, int]],
+    ) -> _Coverage:
+        """Index transitions by moment & by wall-clock time.
+
+        Returns:
+            The coverage.
+        """
+
+        return cls(
+            first_span,
+            last_span,
+            initial_offset,
+            tuple(transitions),
+            tuple(moment for moment, _, _ in transitions),
+            tuple(moment + max(before, after) for moment, before, after in transitions),
+            (initial_offset, *(after for _, _, after in transitions)),
+        )
+
+    def includes(self, first_span: int, last_span: int) -> bool:
+        """Check if spans are covered.
+
+        Returns:
+            If all spans from `first_span` through `last_span` are covered.
+        """
+
+        return self.first_span <= first_span and last_span <= self.last_span
+
+
+def _offset_suffix(offset: int) -> str:
+    sign = "-" if offset < 0 else "+"
+    hours, seconds = divmod(abs(offset), 3600)
+    minutes, seconds = divmod(seconds, 60)
+    suffix = f"{sign}{hours:02}:{minutes:02}"
+
+    return f"{suffix}:{seconds:02}" if seconds else suffix
+
+
+_TABLES: dict[dt.tzinfo, TransitionTable] = {}
+
+
+def get_transition_table(zone: dt.tzinfo) -> TransitionTable:
+    """Get the shared transition table for a time zone.
+
+    Returns:
+        The transition table.
+    """
+
+    table = _TABLES.get(zone)
+
+    if table is None:
+        table = _TABLES[zone] = TransitionTable(zone)
+
+    return table
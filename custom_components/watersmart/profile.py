@@ -0,0 +1,142 @@
+"""Weekday & hour of day usage profile for WaterSmart usage."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+import math
+
+from .client import UsageRecord
+from .history import HistoryMerge, hour_of_day, weekday
+
+# Usage is unusual when it is this many standard deviations above the mean for
+# its weekday & hour, and at least this many gallons above it.
+UNUSUAL_STDDEVS = 3
+UNUSUAL_MIN_EXCESS_GALLONS = 5
+
+# Hours needed for a weekday & hour before usage is compared against it.
+MIN_SAMPLES = 4
+
+
+@dataclass
+class ProfileCell:
+    """Running statistics for one weekday & hour of day.
+
+    Uses Welford's online algorithm so that records can be added & removed in
+    constant time without numerical trouble from large sums of squares.
+    """
+
+    count: int = 0
+    mean: float = 0
+    m2: float = 0
+
+    @property
+    def variance(self) -> float | None:
+        """Sample variance, if there are at least two values."""
+        return self.m2 / (self.count - 1) if self.count > 1 else None
+
+    @property
+    def stddev(self) -> float | None:
+        """Sample standard deviation, if there are at least two values."""
+        variance = self.variance
+        return math.sqrt(variance) if variance is not None else None
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def remove(self, value: float) -> None:
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0, 0
+            return
+
+        mean = self.mean
+        self.count -= 1
+        self.mean = (mean * (self.count + 1) - value) / self.count
+        # rounding can leave a tiny negative remainder
+        self.m2 = max(0, self.m2 - (value - self.mean) * (value - mean))
+
+    def without(self, value: float) -> ProfileCell:
+        """Get the statistics with one value taken out.
+
+        Returns:
+            A copy of the cell without the value.
+        """
+
+        cell = replace(self)
+        cell.remove(value)
+
+        return cell
+
+
+class UsageProfile:
+    """Usage statistics for each weekday & local hour of day.
+
+    Weekdays are numbered from Monday as 0. Records without gallons are not
+    counted.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.cells = [[ProfileCell() for _ in range(24)] for _ in range(7)]
+
+    def cell(self, timestamp: int) -> ProfileCell:
+        """Get the statistics for the weekday & hour of a record timestamp.
+
+        Returns:
+            The cell.
+        """
+
+        return self.cells[weekday(timestamp)][hour_of_day(timestamp)]
+
+    def update(self, merge: HistoryMerge) -> None:
+        """Update statistics with the records from a history merge."""
+
+        for record in merge.replaced:
+            self.remove(record)
+
+        for record in (*merge.new, *merge.revised):
+            self.add(record)
+
+    def add(self, record: UsageRecord) -> None:
+        if (gallons := record["gallons"]) is not None:
+            self.cell(record["read_datetime"]).add(gallons)
+
+    def remove(self, record: UsageRecord) -> None:
+        if (gallons := record["gallons"]) is not None:
+            self.cell(record["read_datetime"]).remove(gallons)
+
+    def baseline(self, record: UsageRecord) -> ProfileCell:
+        """Get the statistics to compare a record, already in the profile, with.
+
+        These are the statistics for the other hours in the record's cell, so
+        a single spike cannot hide itself by raising the mean.
+
+        Returns:
+            The statistics without the record.
+        """
+
+        cell = self.cell(record["read_datetime"])
+        gallons = record["gallons"]
+
+        return cell.without(gallons) if gallons is not None else replace(cell)
+
+    def is_unusual(self, record: UsageRecord) -> bool | None:
+        """Check if a record's usage is unusually high for its weekday & hour.
+
+        Returns:
+            Whether the usage is unusual, or None if there is too little data.
+        """
+
+        gallons = record["gallons"]
+        baseline = self.baseline(record)
+
+        if gallons is None or baseline.count < MIN_SAMPLES:
+            return None
+
+        excess = gallons - baseline.mean
+
+        return excess >= UNUSUAL_MIN_EXCESS_GALLONS and excess > UNUSUAL_STDDEVS * (
+            baseline.stddev or 0
+        )
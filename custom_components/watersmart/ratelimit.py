@@ -0,0 +1,220 @@
+"""Rate limiting for requests to WaterSmart hosts."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from heapq import heapify, heappop, heappush
+import itertools
+import time
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+# Logins are rare, so allow a small burst (several accounts on one host
+# starting together) but keep the sustained rate low.
+LOGIN_RATE = 0.2
+LOGIN_BURST = 5
+
+DATA_RATE = 1.0
+DATA_BURST = 5
+
+# Seconds to pause when a 429 response has no usable `Retry-After`.
+THROTTLE_PAUSE = 30
+
+# Throttled buckets halve their rate down to this fraction of the configured
+# rate & recover by this fraction of it after each request that succeeds.
+MIN_RATE_FRACTION = 1 / 16
+RECOVERY_FRACTION = 0.1
+
+
+class Priority(IntEnum):
+    """Priority classes for requests, served lowest value first."""
+
+    SCHEDULED = 0
+    BACKGROUND = 1
+
+
+@dataclass
+class RateLimiterStats:
+    """Measurements for a token bucket."""
+
+    acquired: int = 0
+    delayed: int = 0
+    total_wait: float = 0
+    max_wait: float = 0
+    queue_length: int = 0
+    max_queue_length: int = 0
+    throttled: int = 0
+
+
+class TokenBucket:
+    """Token bucket with prioritized waiters.
+
+    Tokens accrue at `rate` per second up to `burst`. Waiters are served one at
+    a time in priority order, then in the order they arrived. A throttled
+    bucket stops handing out tokens for the requested time & slows down,
+    recovering gradually as requests succeed.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize."""
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.stats = RateLimiterStats()
+        self._clock = clock
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._waiters: list[tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._changed = asyncio.Event()
+
+    async def acquire(self, priority: Priority = Priority.SCHEDULED) -> float:
+        """Wait for a token.
+
+        Returns:
+            The number of seconds spent waiting.
+        """
+
+        stats = self.stats
+        started = self._clock()
+        entry = (priority, next(self._sequence))
+        heappush(self._waiters, entry)
+        stats.queue_length = len(self._waiters)
+        stats.max_queue_length = max(stats.max_queue_length, stats.queue_length)
+        delayed = False
+
+        try:
+            while True:
+                if self._waiters[0] != entry:
+                    delayed = True
+                    await self._changed.wait()
+                    continue
+
+                if (delay := self._delay()) > 0:
+                    delayed = True
+                    await asyncio.sleep(delay)
+                    continue
+
+                heappop(self._waiters)
+                self.tokens -= 1
+                break
+        finally:
+            if entry in self._waiters:
+                self._waiters.remove(entry)
+                heapify(self._waiters)
+
+            stats.queue_length = len(self._waiters)
+            self._notify()
+
+        waited = self._clock() - started if delayed else 0
+        stats.acquired += 1
+        stats.delayed += delayed
+        stats.total_wait += waited
+        stats.max_wait = max(stats.max_wait, waited)
+
+        return waited
+
+    def throttle(self, retry_after: float | None) -> None:
+        """Slow down after the server responded that requests are too frequent."""
+
+        now = self._clock()
+        self._refill(now)
+        self._paused_until = max(
+            self._paused_until,
+            now + (retry_after if retry_after is not None else THROTTLE_PAUSE),
+        )
+        self.rate = max(self.base_rate * MIN_RATE_FRACTION, self.rate / 2)
+        self.tokens = min(self.tokens, 0)
+        # tokens only start accruing again once the pause is over
+        self._updated = self._paused_until
+        self.stats.throttled += 1
+
+    def record_success(self) -> None:
+        if self.rate < self.base_rate:
+            self._refill(self._clock())
+            self.rate = min(
+                self.base_rate, self.rate + self.base_rate * RECOVERY_FRACTION
+            )
+
+    def _delay(self) -> float:
+        now = self._clock()
+        self._refill(now)
+
+        return max(self._paused_until - now, (1 - self.tokens) / self.rate, 0)
+
+    def _refill(self, now: float) -> None:
+        if now > self._updated:
+            self.tokens = min(
+                self.burst, self.tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+
+class HostRateLimiter:
+    """Rate limits for a single host, with separate login & data budgets."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.login = TokenBucket(LOGIN_RATE, LOGIN_BURST)
+        self.data = TokenBucket(DATA_RATE, DATA_BURST)
+
+
+DATA_RATE_LIMITERS: HassKey[dict[str, HostRateLimiter]] = HassKey(
+    f"{DOMAIN}_rate_limiters"
+)
+
+
+def get_rate_limiter(hass: HomeAssistant, hostname: str) -> HostRateLimiter:
+    """Get the rate limiter shared by all clients for a host.
+
+    Returns:
+        The rate limiter.
+    """
+
+    limiters: dict[str, HostRateLimiter] = hass.data.setdefault(DATA_RATE_LIMITERS, {})
+    limiter = limiters.get(hostname)
+
+    if limiter is None:
+        limiter = limiters[hostname] = HostRateLimiter()
+
+    return limiter
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a `Retry-After` header, given in seconds or as an HTTP date.
+
+    Returns:
+        The number of seconds to wait, if the header could be parsed.
+    """
+
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max(0.0, retry_at.timestamp() - time.time())
@@ -0,0 +1,180 @@
+"""Retry & circuit breaking for requests to WaterSmart hosts."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from http import HTTPStatus
+import random
+import time
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+# Consecutive failed operations after which a host is considered down.
+FAILURE_THRESHOLD = 5
+
+# Seconds a tripped breaker rejects requests before allowing a trial request.
+RESET_TIMEOUT = 60
+
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 4
+
+
+class CircuitOpenError(Exception):
+    """Circuit open Error."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        super().__init__("too many consecutive failures")
+
+
+class CircuitBreaker:
+    """Circuit breaker for a single host.
+
+    After `failure_threshold` consecutive failures the breaker opens &
+    rejects requests without touching the network. Once `reset_timeout` has
+    passed, a single trial request is let through; its outcome either closes
+    the breaker or opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        reset_timeout: float = RESET_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._clock = clock
+        self._trial_pending = False
+
+    @property
+    def is_open(self) -> bool:
+        """Whether requests are currently being rejected."""
+        return self.opened_at is not None and (
+            self._trial_pending or self._clock() - self.opened_at < self.reset_timeout
+        )
+
+    def before_request(self) -> None:
+        """Check that a request may be made.
+
+        Raises:
+            CircuitOpenError: When the breaker is open.
+        """
+
+        if self.is_open:
+            raise CircuitOpenError
+
+        if self.opened_at is not None:
+            self._trial_pending = True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_pending = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_pending = False
+
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = self._clock()
+
+    def release_trial(self) -> None:
+        """Let another trial request through after one ended without an outcome."""
+        self._trial_pending = False
+
+
+DATA_CIRCUIT_BREAKERS: HassKey[dict[str, CircuitBreaker]] = HassKey(
+    f"{DOMAIN}_circuit_breakers"
+)
+
+
+def get_circuit_breaker(hass: HomeAssistant, hostname: str) -> CircuitBreaker:
+    """Get the circuit breaker shared by all clients for a host.
+
+    Returns:
+        The circuit breaker.
+    """
+
+    breakers: dict[str, CircuitBreaker] = hass.data.setdefault(
+        DATA_CIRCUIT_BREAKERS, {}
+    )
+    breaker = breakers.get(hostname)
+
+    if breaker is None:
+        breaker = breakers[hostname] = CircuitBreaker()
+
+    return breaker
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Check if an error is likely to succeed when retried.
+
+    Returns:
+        If the error is a timeout, connection error, throttling, or server error.
+    """
+
+    if isinstance(error, aiohttp.ClientResponseError):
+        status: int = error.status
+        return status >= 500 or status == HTTPStatus.TOO_MANY_REQUESTS
+
+    return isinstance(error, (TimeoutError, aiohttp.ClientConnectionError))
+
+
+async def async_call_with_breaker[T](
+    breaker: CircuitBreaker,
+    func: Callable[[], Awaitable[T]],
+    *,
+    attempts: int = 1,
+) -> T:
+    """Call through a circuit breaker, retrying transient errors.
+
+    Retries use exponential back-off with full jitter so clients that failed
+    together do not retry together. The breaker is checked before every
+    attempt & records one outcome for the whole call. Retrying stops early if
+    the breaker opens in the meantime. A cancelled call records no outcome.
+
+    Returns:
+        The result of the call.
+    """
+
+    attempt = 0
+
+    while True:
+        breaker.before_request()
+
+        try:
+            result = await func()
+        except Exception as error:
+            # any other error means the host responded, so it is reachable
+            if not is_transient_error(error):
+                breaker.record_success()
+                raise
+
+            attempt += 1
+
+            if attempt == attempts or breaker.opened_at is not None:
+                breaker.record_failure()
+                raise
+
+            await asyncio.sleep(
+                random.uniform(  # noqa: S311
+                    0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1))
+                )
+            )
+        except BaseException:
+            # cancelled, so the host may never have been reached
+            breaker.release_trial()
+            raise
+        else:
+            breaker.record_success()
+            return result
@@ -0,0 +1,365 @@
+"""Tiered retention of WaterSmart usage history.
+
+Recent history is kept hourly in memory. Older hours are compacted into daily
+rollups & older days into monthly totals. Rollups are kept in a memory mapped
+column file, so they persist across restarts & only the rows a query reads are
+loaded.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Sequence
+from dataclasses import dataclass
+import datetime as dt
+import math
+from operator import attrgetter
+from pathlib import Path
+from typing import ClassVar
+
+from .client import UsageRecord
+from .coldstore import ColumnFile, TableLayout
+from .history import DAY_SECONDS, start_of_day
+
+_start = attrgetter("start")
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """How long each resolution of history is kept."""
+
+    hourly_days: int
+    daily_months: int
+
+    def hourly_cutoff(self, last_read: int) -> int:
+        """Get the start of the oldest day kept at hourly resolution.
+
+        Returns:
+            The record timestamp from which hours are kept.
+        """
+
+        return start_of_day(last_read) - (self.hourly_days - 1) * DAY_SECONDS
+
+    def daily_cutoff(self, hourly_cutoff: int) -> int:
+        """Get the start of the oldest month kept at daily resolution.
+
+        Returns:
+            The record timestamp from which days are kept.
+        """
+
+        return months_before(hourly_cutoff, self.daily_months)
+
+
+@dataclass(frozen=True)
+class DailyRollup:
+    """Usage for one local day."""
+
+    resolution: ClassVar[str] = "daily"
+
+    start: int
+    gallons: float
+    max_gallons: float | None
+    leak_gallons: float
+    null_hours: int
+
+
+@dataclass(frozen=True)
+class MonthlyTotal:
+    """Usage for one local month."""
+
+    resolution: ClassVar[str] = "monthly"
+
+    start: int
+    gallons: float
+    leak_gallons: float
+    null_hours: int
+
+
+MONTHLY_LAYOUT: TableLayout = (
+    ("start", "q"),
+    ("gallons", "d"),
+    ("leak_gallons", "d"),
+    ("null_hours", "q"),
+)
+DAILY_LAYOUT: TableLayout = (
+    ("start", "q"),
+    ("gallons", "d"),
+    # days without any readings store NaN
+    ("max_gallons", "d"),
+    ("leak_gallons", "d"),
+    ("null_hours", "q"),
+)
+LAYOUTS = (MONTHLY_LAYOUT, DAILY_LAYOUT)
+
+
+class RetainedHistory:
+    """Daily rollups & monthly totals for history older than the hourly records.
+
+    Monthly totals all start before the first daily rollup. Without a path,
+    rollups are only held in memory.
+    """
+
+    def __init__(
+        self, path: Path | None = None, store: ColumnFile | None = None
+    ) -> None:
+        """Initialize."""
+        self.path = path
+        self._store = store or ColumnFile(LAYOUTS)
+
+    @classmethod
+    def load(cls, path: Path) -> RetainedHistory:
+        """Map the rollups stored at a path. This does blocking I/O.
+
+        Returns:
+            The retained history.
+        """
+
+        return cls(path, ColumnFile.open(path, LAYOUTS))
+
+    @property
+    def monthly(self) -> list[MonthlyTotal]:
+        """All monthly totals."""
+        table = self._store.tables[0]
+        return [_monthly_from_row(row) for row in table.rows(0, len(table))]
+
+    @property
+    def daily(self) -> list[DailyRollup]:
+        """All daily rollups."""
+        table = self._store.tables[1]
+        return [_daily_from_row(row) for row in table.rows(0, len(table))]
+
+    @property
+    def end(self) -> int | None:
+        """Timestamp from which history has not been compacted, if any has."""
+        monthly, daily = self._store.tables
+
+        if len(daily):
+            return int(daily.key[-1]) + DAY_SECONDS
+
+        if len(monthly):
+            return months_before(int(monthly.key[-1]), -1)
+
+        return None
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the stored rollups in bytes."""
+        return self._store.nbytes
+
+    def rollups_between(
+        self, start: int | None, end: int | None, limit: int | None = None
+    ) -> list[DailyRollup | MonthlyTotal]:
+        """Get rollups that start within `start <= start < end`.
+
+        Either bound may be omitted to leave the range open. When a limit is
+        given, only that many rollups from the start of the range are read.
+
+        Returns:
+            The monthly totals followed by the daily rollups.
+        """
+
+        monthly, daily = self._store.tables
+        result: list[DailyRollup | MonthlyTotal] = []
+
+        for table, from_row in (
+            (monthly, _monthly_from_row),
+            (daily, _daily_from_row),
+        ):
+            first = table.index(start, 0)
+            last = table.index(end, len(table))
+
+            if limit is not None:
+                last = max(first, min(last, first + limit - len(result)))
+
+            result.extend(from_row(row) for row in table.rows(first, last))
+
+        return result
+
+    def replace(self, store: ColumnFile) -> None:
+        """Replace the stored rollups with those written by a compaction."""
+
+        previous, self._store = self._store, store
+        previous.close()
+
+    def close(self) -> None:
+        """Unmap the stored rollups."""
+
+        self._store.close()
+
+
+@dataclass
+class Compaction:
+    """Rollups computed by `compact`."""
+
+    daily: list[DailyRollup]
+    monthly: list[MonthlyTotal]
+
+
+def compact(
+    daily: Sequence[DailyRollup], records: Sequence[UsageRecord], daily_cutoff: int
+) -> Compaction:
+    """Roll hourly records up into days & days before a cutoff into months.
+
+    This only reads its arguments, so it can run in the executor while the
+    history continues to be used on the event loop.
+
+    Returns:
+        All daily rollups to keep & the new monthly totals.
+    """
+
+    days = [*daily, *rollup_days(records)]
+    index = bisect_left(days, daily_cutoff, key=_start)
+
+    return Compaction(days[index:], rollup_months(days[:index]))
+
+
+def write_compaction(
+    path: Path | None,
+    monthly: Sequence[MonthlyTotal],
+    daily: Sequence[DailyRollup],
+    records: Sequence[UsageRecord],
+    daily_cutoff: int,
+) -> ColumnFile:
+    """Compact hourly records into the retained rollups & write them out.
+
+    This does blocking I/O & only reads its arguments, so it can run in the
+    executor while the history continues to be used on the event loop.
+
+    Returns:
+        The stored rollups, to replace those of the retained history.
+    """
+
+    compaction = compact(daily, records, daily_cutoff)
+
+    return ColumnFile.write(
+        path,
+        LAYOUTS,
+        [
+            _columns(MONTHLY_LAYOUT, [*monthly, *compaction.monthly]),
+            _columns(DAILY_LAYOUT, compaction.daily),
+        ],
+    )
+
+
+def _columns(
+    layout: TableLayout, rollups: Sequence[DailyRollup | MonthlyTotal]
+) -> dict[str, list[int | float]]:
+    return {
+        name: [
+            value if (value := getattr(rollup, name)) is not None else math.nan
+            for rollup in rollups
+        ]
+        for name, _ in layout
+    }
+
+
+def _monthly_from_row(row: tuple[int | float, ...]) -> MonthlyTotal:
+    start, gallons, leak_gallons, null_hours = row
+
+    return MonthlyTotal(int(start), gallons, leak_gallons, int(null_hours))
+
+
+def _daily_from_row(row: tuple[int | float, ...]) -> DailyRollup:
+    start, gallons, max_gallons, leak_gallons, null_hours = row
+
+    return DailyRollup(
+        int(start),
+        gallons,
+        None if math.isnan(max_gallons) else max_gallons,
+        leak_gallons,
+        int(null_hours),
+    )
+
+
+def rollup_days(records: Sequence[UsageRecord]) -> list[DailyRollup]:
+    """Roll sorted hourly records up into local days.
+
+    Returns:
+        A rollup for each day that has records.
+    """
+
+    rollups: list[DailyRollup] = []
+    day: int | None = None
+    gallons: list[float] = []
+    leak_gallons: float = 0
+    null_hours = 0
+
+    for record in records:
+        if (start := start_of_day(record["read_datetime"])) != day:
+            if day is not None:
+                rollups.append(_daily_rollup(day, gallons, leak_gallons, null_hours))
+
+            day, gallons, leak_gallons, null_hours = start, [], 0, 0
+
+        leak_gallons += record["leak_gallons"] or 0
+
+        if record["gallons"] is None:
+            null_hours += 1
+        else:
+            gallons.append(record["gallons"])
+
+    if day is not None:
+        rollups.append(_daily_rollup(day, gallons, leak_gallons, null_hours))
+
+    return rollups
+
+
+def _daily_rollup(
+    day: int, gallons: list[float], leak_gallons: float, null_hours: int
+) -> DailyRollup:
+    return DailyRollup(
+        day, sum(gallons), max(gallons) if gallons else None, leak_gallons, null_hours
+    )
+
+
+def rollup_months(days: Sequence[DailyRollup]) -> list[MonthlyTotal]:
+    """Roll sorted daily rollups up into local months.
+
+    Returns:
+        A total for each month that has days.
+    """
+
+    totals: list[MonthlyTotal] = []
+
+    for day in days:
+        month = start_of_month(day.start)
+
+        if totals and totals[-1].start == month:
+            total = totals[-1]
+            totals[-1] = MonthlyTotal(
+                month,
+                total.gallons + day.gallons,
+                total.leak_gallons + day.leak_gallons,
+                total.null_hours + day.null_hours,
+            )
+        else:
+            totals.append(
+                MonthlyTotal(month, day.gallons, day.leak_gallons, day.null_hours)
+            )
+
+    return totals
+
+
+def start_of_month(timestamp: int) -> int:
+    """Get the timestamp for the start of the local month.
+
+    Returns:
+        The start of the month.
+    """
+
+    value = dt.datetime.fromtimestamp(timestamp, tz=dt.UTC)
+
+    return int(dt.datetime(value.year, value.month, 1, tzinfo=dt.UTC).timestamp())
+
+
+def months_before(timestamp: int, months: int) -> int:
+    """Get the start of the local month some months before a timestamp's month.
+
+    Returns:
+        The start of the month.
+    """
+
+    value = dt.datetime.fromtimestamp(timestamp, tz=dt.UTC)
+    year, month = divmod(value.year * 12 + value.month - 1 - months, 12)
+
+    return int(dt.datetime(year, month + 1, 1, tzinfo=dt.UTC).timestamp())
@@ -2,12 +2,13 @@
 
 from collections.abc import Callable
 from dataclasses import dataclass
-from typing import Any, cast
+from typing import Any, Self, cast
 
 from homeassistant.components.sensor import (
+    RestoreSensor,
     SensorDeviceClass,
-    SensorEntity,
     SensorEntityDescription,
+    SensorExtraStoredData,
 )
 from homeassistant.const import UnitOfVolume
 from homeassistant.core import HomeAssistant, callback
@@ -26,6 +27,40 @@ class WaterSmartSensorDescription(SensorEntityDescription):
 
     value_fn: Callable[[SensorData], str | int | float | None]
     attr_fn: Callable[[dict[str, Any]], dict[str, Any]] = lambda attrs: attrs
+    exists_fn: Callable[[WaterSmartUpdateCoordinator], bool] = lambda _: True
+
+
+@dataclass
+class WaterSmartSensorExtraStoredData(SensorExtraStoredData):
+    """Sensor data with a compact summary of the attributes to restore."""
+
+    attributes: dict[str, Any]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dict representation of the sensor data.
+
+        Returns:
+            The sensor data.
+        """
+        data: dict[str, Any] = super().as_dict()
+
+        return data | {"attributes": self.attributes}
+
+    @classmethod
+    def from_dict(cls, restored: dict[str, Any]) -> Self | None:
+        """Initialize stored sensor data from a dict.
+
+        Returns:
+            The sensor data, if it could be restored.
+        """
+        extra = SensorExtraStoredData.from_dict(restored)
+
+        if extra is None or not isinstance(restored.get("attributes"), dict):
+            return None
+
+        return cls(
+            extra.native_value, extra.native_unit_of_measurement, restored["attributes"]
+        )
 
 
 SENSOR_TYPES: tuple[WaterSmartSensorDescription, ...] = (
@@ -43,6 +78,56 @@ SENSOR_TYPES: tuple[WaterSmartSensorDescription, ...] = (
         native_unit_of_measurement=UnitOfVolume.GALLONS,
         translation_key="gallons_for_most_recent_full_day",
     ),
+    WaterSmartSensorDescription(
+        key=SensorKey.GALLONS_FOR_LAST_7_DAYS,
+        value_fn=lambda data: cast("float", data),
+        device_class=SensorDeviceClass.WATER,
+        native_unit_of_measurement=UnitOfVolume.GALLONS,
+        translation_key="gallons_for_last_7_days",
+    ),
+    WaterSmartSensorDescription(
+        key=SensorKey.GALLONS_FOR_LAST_30_DAYS,
+        value_fn=lambda data: cast("float", data),
+        device_class=SensorDeviceClass.WATER,
+        native_unit_of_measurement=UnitOfVolume.GALLONS,
+        translation_key="gallons_for_last_30_days",
+    ),
+    WaterSmartSensorDescription(
+        key=SensorKey.GALLONS_MONTH_TO_DATE,
+        value_fn=lambda data: cast("float", data),
+        device_class=SensorDeviceClass.WATER,
+        native_unit_of_measurement=UnitOfVolume.GALLONS,
+        translation_key="gallons_month_to_date",
+    ),
+    WaterSmartSensorDescription(
+        key=SensorKey.GALLONS_BILLING_CYCLE_TO_DATE,
+        value_fn=lambda data: cast("float", data),
+        device_class=SensorDeviceClass.WATER,
+        native_unit_of_measurement=UnitOfVolume.GALLONS,
+        translation_key="gallons_billing_cycle_to_date",
+    ),
+    WaterSmartSensorDescription(
+        key=SensorKey.AVERAGE_GALLONS_PER_HOUR,
+        value_fn=lambda data: cast("float | None", data),
+        native_unit_of_measurement=UnitOfVolume.GALLONS,
+        translation_key="average_gallons_per_hour",
+    ),
+    WaterSmartSensorDescription(
+        key=SensorKey.COST_BILLING_CYCLE_TO_DATE,
+        value_fn=lambda data: cast("float", data),
+        exists_fn=lambda coordinator: coordinator.costs is not None,
+        device_class=SensorDeviceClass.MONETARY,
+        suggested_display_precision=2,
+        translation_key="cost_billing_cycle_to_date",
+    ),
+    WaterSmartSensorDescription(
+        key=SensorKey.COST_FOR_MOST_RECENT_FULL_DAY,
+        value_fn=lambda data: cast("float | None", data),
+        exists_fn=lambda coordinator: coordinator.costs is not None,
+        device_class=SensorDeviceClass.MONETARY,
+        suggested_display_precision=2,
+        translation_key="cost_for_most_recent_full_day",
+    ),
 )
 
 
@@ -56,14 +141,20 @@ async def async_setup_entry(  # noqa: RUF029
     coordinator = data.coordinator
 
     entities: list[WaterSmartSensor] = [
-        WaterSmartSensor(coordinator, description) for description in SENSOR_TYPES
+        WaterSmartSensor(coordinator, description)
+        for description in SENSOR_TYPES
+        if description.exists_fn(coordinator)
     ]
 
     async_add_entities(entities)
 
 
-class WaterSmartSensor(CoordinatorEntity[WaterSmartUpdateCoordinator], SensorEntity):
-    """Abstract class for an OpenWeatherMap sensor."""
+class WaterSmartSensor(CoordinatorEntity[WaterSmartUpdateCoordinator], RestoreSensor):
+    """Abstract class for an OpenWeatherMap sensor.
+
+    The last state is restored at startup so sensors have a value before the
+    first refresh completes. It is replaced once fresh data arrives.
+    """
 
     _attr_attribution = ATTRIBUTION
     _attr_has_entity_name = True
@@ -79,27 +170,78 @@ class WaterSmartSensor(CoordinatorEntity[WaterSmartUpdateCoordinator], SensorEnt
 
         self.entity_description = description
         self._sensor_data = self._get_sensor_data(coordinator.data, description.key)
+        self._restored: WaterSmartSensorExtraStoredData | None = None
         self._attr_unique_id = (
             f"{coordinator.hostname}-{coordinator.username}-{description.key}".lower()
         )
         self._attr_device_info = coordinator.device_info
 
+        if description.device_class == SensorDeviceClass.MONETARY:
+            self._attr_native_unit_of_measurement = coordinator.hass.config.currency
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last state if no data has been fetched yet."""
+        await super().async_added_to_hass()
+
+        if self.entity_description.key in self.coordinator.data:
+            return
+
+        if (extra := await self.async_get_last_extra_data()) is not None:
+            self._restored = WaterSmartSensorExtraStoredData.from_dict(extra.as_dict())
+
     @property
     def native_value(self) -> str | int | float | None:
         """Return the state."""
+        if self._restored is not None:
+            return cast("str | int | float | None", self._restored.native_value)
+
         return self.entity_description.value_fn(self._sensor_data["state"])
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return the state attributes."""
+        if self._restored is not None:
+            return self._restored.attributes
+
         return self.entity_description.attr_fn(self._sensor_data.get("attrs", {}))
 
+    @property
+    def extra_restore_state_data(self) -> WaterSmartSensorExtraStoredData:
+        """Return the data to restore, leaving out lists & mappings to keep it small.
+
+        Returns:
+            The sensor data.
+        """
+        return WaterSmartSensorExtraStoredData(
+            self.native_value,
+            self.native_unit_of_measurement,
+            {
+                key: value
+                for key, value in self.extra_state_attributes.items()
+                if not isinstance(value, (list, dict))
+            },
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return if the entity is available."""
+        if self._restored is not None:
+            return True
+
+        return (
+            super().available and self.entity_description.key in self.coordinator.data
+        )
+
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle data update."""
         self._sensor_data = self._get_sensor_data(
             self.coordinator.data, self.entity_description.key
         )
+
+        # the restored state only stands in until the first update attempt
+        self._restored = None
+
         super()._handle_coordinator_update()
 
     @staticmethod
@@ -112,4 +254,6 @@ class WaterSmartSensor(CoordinatorEntity[WaterSmartUpdateCoordinator], SensorEnt
         Returns:
             The actual sensor data.
         """
-        return cast("dict[str, SensorData]", coordinator_data)[kind]
+        return cast("dict[str, SensorData]", coordinator_data).get(
+            kind, {"state": None, "attrs": {}}
+        )
@@ -1,10 +1,19 @@
 """Support for the WaterSmart integration."""
 
-from datetime import date, datetime
+import asyncio
+import base64
+import binascii
+from collections import defaultdict
+import dataclasses
+from datetime import datetime
 from functools import partial
-from typing import Final, cast
+import heapq
+from itertools import chain
+from operator import itemgetter
+from typing import Any, Final, cast
 
 from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.const import WEEKDAYS
 from homeassistant.core import (
     HomeAssistant,
     ServiceCall,
@@ -13,23 +22,64 @@ from homeassistant.core import (
     callback,
 )
 from homeassistant.exceptions import ServiceValidationError
-from homeassistant.helpers import selector
+from homeassistant.helpers import config_validation as cv, selector
 from homeassistant.util import dt as dt_util
 import voluptuous as vol
 
+from .budget import get_memory_budget
+from .cache import get_response_cache
+from .client import UsageRecord
+from .columns import daily_totals
 from .const import DOMAIN
 from .coordinator import (
+    ATTRIBUTE_ITEM_BYTES,
+    COST_PRECISION,
     WaterSmartUpdateCoordinator,
-    _from_timestamp,
+    _isoformat,
+    _local_times,
+    _record_gallons,
     _serialize_records,
+    _to_timestamp,
 )
+from .filters import RecordFilter
+from .history import GALLONS_PRECISION, start_of_day
+from .retention import DailyRollup, MonthlyTotal
 from .types import WaterSmartData
 
 ATTR_CONFIG_ENTRY: Final = "config_entry"
+ATTR_CONFIG_ENTRIES: Final = "config_entries"
+ATTR_AGGREGATION: Final = "aggregation"
+ATTR_COUNT: Final = "count"
+ATTR_LIMIT: Final = "limit"
+ATTR_CURSOR: Final = "cursor"
+ATTR_FORMAT: Final = "format"
 ATTR_FROM_CACHE: Final = "cached"
 ATTR_START: Final = "start"
 ATTR_END: Final = "end"
+ATTR_TOKEN: Final = "token"  # noqa: S105
+ATTR_MIN_GALLONS: Final = "min_gallons"
+ATTR_MAX_GALLONS: Final = "max_gallons"
+ATTR_LEAK_ONLY: Final = "leak_only"
+ATTR_NULL_ONLY: Final = "null_only"
+ATTR_HOURS: Final = "hours"
+ATTR_WEEKDAYS: Final = "weekdays"
 HOURLY_HISTORY_SERVICE_NAME: Final = "get_hourly_history"
+COST_BREAKDOWN_SERVICE_NAME: Final = "get_cost_breakdown"
+BATCH_HISTORY_SERVICE_NAME: Final = "get_batch_history"
+USAGE_PROFILE_SERVICE_NAME: Final = "get_usage_profile"
+CHANGES_SINCE_SERVICE_NAME: Final = "get_changes_since"
+TOP_USAGE_SERVICE_NAME: Final = "get_top_usage"
+
+DEFAULT_TOP_USAGE_COUNT: Final = 10
+
+AGGREGATION_HOURLY: Final = "hourly"
+AGGREGATION_DAILY: Final = "daily"
+AGGREGATION_TOTAL: Final = "total"
+
+RESOLUTION_HOURLY: Final = "hourly"
+
+FORMAT_RECORDS: Final = "records"
+FORMAT_COLUMNAR: Final = "columnar"
 
 SERVICE_SCHEMA: Final = vol.Schema(
     {
@@ -44,10 +94,70 @@ SERVICE_SCHEMA: Final = vol.Schema(
     }
 )
 
+HOURLY_HISTORY_SERVICE_SCHEMA: Final = SERVICE_SCHEMA.extend(
+    {
+        vol.Optional(ATTR_LIMIT): vol.All(int, vol.Range(min=1)),
+        vol.Optional(ATTR_CURSOR): str,
+        vol.Optional(ATTR_FORMAT, default=FORMAT_RECORDS): vol.In(
+            [FORMAT_RECORDS, FORMAT_COLUMNAR]
+        ),
+        vol.Optional(ATTR_MIN_GALLONS): vol.Coerce(float),
+        vol.Optional(ATTR_MAX_GALLONS): vol.Coerce(float),
+        vol.Optional(ATTR_LEAK_ONLY): bool,
+        vol.Optional(ATTR_NULL_ONLY): bool,
+        vol.Optional(ATTR_HOURS): vol.All(
+            cv.ensure_list, [vol.All(vol.Coerce(int), vol.Range(min=0, max=23))]
+        ),
+        vol.Optional(ATTR_WEEKDAYS): vol.All(cv.ensure_list, [vol.In(WEEKDAYS)]),
+    }
+)
+
+TOP_USAGE_SERVICE_SCHEMA: Final = SERVICE_SCHEMA.extend(
+    {
+        vol.Optional(ATTR_COUNT, default=DEFAULT_TOP_USAGE_COUNT): vol.All(
+            int, vol.Range(min=1)
+        ),
+        vol.Optional(ATTR_AGGREGATION, default=AGGREGATION_HOURLY): vol.In(
+            [AGGREGATION_HOURLY, AGGREGATION_DAILY]
+        ),
+    }
+)
+
+USAGE_PROFILE_SERVICE_SCHEMA: Final = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY): selector.ConfigEntrySelector(
+            {
+                "integration": DOMAIN,
+            }
+        ),
+        vol.Optional(ATTR_FROM_CACHE): bool,
+    }
+)
+
+CHANGES_SINCE_SERVICE_SCHEMA: Final = USAGE_PROFILE_SERVICE_SCHEMA.extend(
+    {
+        vol.Optional(ATTR_TOKEN): str,
+    }
+)
 
-def __get_date(date_input: str | int | None) -> date | datetime | None:
+BATCH_SERVICE_SCHEMA: Final = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRIES): vol.All(cv.ensure_list, [str]),
+        vol.Optional(ATTR_FROM_CACHE): bool,
+        vol.Optional(ATTR_START): vol.Any(str, int),
+        vol.Optional(ATTR_END): vol.Any(str, int),
+        vol.Optional(ATTR_AGGREGATION, default=AGGREGATION_HOURLY): vol.In(
+            [AGGREGATION_HOURLY, AGGREGATION_DAILY, AGGREGATION_TOTAL]
+        ),
+    }
+)
+
+
+def __get_date(date_input: str | int | None) -> datetime | None:
     """Get date.
 
+    Both timestamps & strings are read as a date & time, never a plain date.
+
     Returns:
         The date from the input.
 
@@ -80,6 +190,18 @@ def __get_coordinator(
 ) -> WaterSmartUpdateCoordinator:
     """Get the coordinator from the entry.
 
+    Returns:
+        The update coordinator.
+    """
+
+    return __get_entry_coordinator(hass, call.data[ATTR_CONFIG_ENTRY])
+
+
+def __get_entry_coordinator(
+    hass: HomeAssistant, entry_id: str
+) -> WaterSmartUpdateCoordinator:
+    """Get the coordinator for an entry id.
+
     Returns:
         The update coordinator.
 
@@ -87,10 +209,9 @@ def __get_coordinator(
         ServiceValidationError: When the entry is not valid.
     """
 
-    entry_id: str = call.data[ATTR_CONFIG_ENTRY]
     entry: ConfigEntry | None = hass.config_entries.async_get_entry(entry_id)
 
-    if not entry:
+    if not entry or entry.domain != DOMAIN:
         raise ServiceValidationError(
             translation_domain=DOMAIN,
             translation_key="invalid_config_entry",
@@ -113,33 +234,533 @@ def __get_coordinator(
     return runtime_data.coordinator
 
 
+def __get_range(call: ServiceCall) -> tuple[int | None, int | None]:
+    """Get the requested range as record timestamps.
+
+    Returns:
+        The inclusive start & exclusive end of the range.
+    """
+
+    start = __get_date(call.data.get(ATTR_START))
+    end = __get_date(call.data.get(ATTR_END))
+
+    return (
+        _to_timestamp(start) if start else None,
+        _to_timestamp(end) + 1 if end else None,
+    )
+
+
 async def __get_hourly_history(
     call: ServiceCall,
     *,
     hass: HomeAssistant,
 ) -> ServiceResponse:
     coordinator = __get_coordinator(hass, call)
+    start, end = __get_range(call)
+    limit: int | None = call.data.get(ATTR_LIMIT)
+
+    if cursor := call.data.get(ATTR_CURSOR):
+        start = __decode_cursor(cursor) + 1
+
+    if call.data.get(ATTR_FROM_CACHE) is False:
+        await coordinator.async_background_refresh()
+
+    where = __get_record_filter(call)
+    # the cursor is folded into the start
+    query = (
+        HOURLY_HISTORY_SERVICE_NAME,
+        start,
+        end,
+        limit,
+        call.data[ATTR_FORMAT],
+        where,
+    )
+    entry_id: str = call.data[ATTR_CONFIG_ENTRY]
+    responses = get_response_cache(hass)
+
+    if (cached := responses.get(entry_id, coordinator.generation, query)) is not None:
+        get_memory_budget(hass).touch(coordinator)
+        return cached
+
+    await coordinator.async_load_history(start)
+
+    # one extra item is requested to know if another page follows. Compacted
+    # history comes first, at the finest resolution still kept for it. Filters
+    # apply to hours, so they only match hourly records.
+    page_size = limit + 1 if limit is not None else None
+    rollups = (
+        coordinator.retained.rollups_between(start, end, page_size) if not where else []
+    )
+    records = coordinator.history.records_between(
+        start,
+        end,
+        page_size - len(rollups) if page_size is not None else None,
+        where or None,
+    )
+    next_cursor: str | None = None
+
+    if limit is not None and len(rollups) + len(records) > limit:
+        rollups = rollups[:limit]
+        records = records[: limit - len(rollups)]
+        next_cursor = __encode_cursor(
+            records[-1]["read_datetime"] if records else rollups[-1].start
+        )
+
+    response: dict[str, Any] = {
+        "history": (
+            __serialize_columns(rollups, records)
+            if call.data[ATTR_FORMAT] == FORMAT_COLUMNAR
+            else [*__serialize_rollups(rollups), *_serialize_records(records)]
+        ),
+    }
+
+    if next_cursor:
+        response["next_cursor"] = next_cursor
+
+    responses.put(
+        entry_id,
+        coordinator.generation,
+        query,
+        response,
+        ATTRIBUTE_ITEM_BYTES * (len(rollups) + len(records)),
+    )
+
+    return response
+
+
+def __get_record_filter(call: ServiceCall) -> RecordFilter:
+    """Get the conditions hourly records must meet.
+
+    Returns:
+        The filter, which is empty when no conditions are given.
+    """
+
+    hours: list[int] | None = call.data.get(ATTR_HOURS)
+    weekdays: list[str] | None = call.data.get(ATTR_WEEKDAYS)
+
+    return RecordFilter(
+        min_gallons=call.data.get(ATTR_MIN_GALLONS),
+        max_gallons=call.data.get(ATTR_MAX_GALLONS),
+        leak_only=call.data.get(ATTR_LEAK_ONLY, False),
+        null_only=call.data.get(ATTR_NULL_ONLY, False),
+        hours=frozenset(hours) if hours is not None else None,
+        weekdays=(
+            frozenset(WEEKDAYS.index(day) for day in weekdays)
+            if weekdays is not None
+            else None
+        ),
+    )
+
+
+def __encode_cursor(timestamp: int) -> str:
+    """Encode the position after a record as an opaque cursor.
+
+    Returns:
+        The cursor.
+    """
+
+    return base64.urlsafe_b64encode(str(timestamp).encode()).decode()
 
-    start = __get_date(call.data.get(ATTR_START))
-    end = __get_date(call.data.get(ATTR_END))
+
+def __decode_cursor(cursor: str) -> int:
+    """Decode a cursor created by `__encode_cursor`.
+
+    Returns:
+        The timestamp of the last record returned before the cursor.
+
+    Raises:
+        ServiceValidationError: When the cursor is not valid.
+    """
+
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError) as error:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="invalid_cursor",
+            translation_placeholders={
+                "cursor": cursor,
+            },
+        ) from error
+
+
+async def __get_changes_since(
+    call: ServiceCall,
+    *,
+    hass: HomeAssistant,
+) -> ServiceResponse:
+    coordinator = __get_coordinator(hass, call)
 
     if call.data.get(ATTR_FROM_CACHE) is False:
-        await coordinator.async_refresh()
+        await coordinator.async_background_refresh()
+
+    changes = coordinator.changes
+    records: list[UsageRecord] | None = None
+
+    # tokens from another log, such as before a restart, need a resync
+    if token := call.data.get(ATTR_TOKEN):
+        log_id, version = __decode_token(token)
 
-    records = []
+        if log_id == changes.id:
+            records = changes.changes_since(version)
+
+    return {
+        "token": __encode_token(changes.id, changes.version),
+        "resync_required": records is None,
+        "changes": _serialize_records(records or []),
+    }
 
-    for record in coordinator.data["hourly"]:
-        record_date = _from_timestamp(record["read_datetime"])
 
-        if start and dt_util.as_local(record_date) < dt_util.as_local(start):
-            continue
+def __encode_token(log_id: str, version: int) -> str:
+    """Encode a version of a change log as an opaque token.
 
-        if end and dt_util.as_local(record_date) > dt_util.as_local(end):
-            continue
+    Returns:
+        The token.
+    """
 
-        records.append(record)
+    return base64.urlsafe_b64encode(f"{log_id}:{version}".encode()).decode()
 
-    return {"history": _serialize_records(records)}
+
+def __decode_token(token: str) -> tuple[str, int]:
+    """Decode a token created by `__encode_token`.
+
+    Returns:
+        The id of the change log & the version.
+
+    Raises:
+        ServiceValidationError: When the token is not valid.
+    """
+
+    try:
+        log_id, version = base64.urlsafe_b64decode(token.encode()).decode().split(":")
+        return log_id, int(version)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as error:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="invalid_token",
+            translation_placeholders={
+                "token": token,
+            },
+        ) from error
+
+
+def __serialize_rollups(
+    rollups: list[DailyRollup | MonthlyTotal],
+) -> list[dict[str, Any]]:
+    """Convert rollups of compacted history like records, with their statistics.
+
+    Returns:
+        The serialized rollups.
+    """
+
+    local_times = _local_times()
+
+    return [
+        dataclasses.asdict(rollup)
+        | {
+            "start": local_times.isoformat(rollup.start),
+            "gallons": round(rollup.gallons, GALLONS_PRECISION),
+            "resolution": rollup.resolution,
+        }
+        for rollup in rollups
+    ]
+
+
+def __serialize_columns(
+    rollups: list[DailyRollup | MonthlyTotal], records: list[UsageRecord]
+) -> dict[str, list[Any]]:
+    """Convert rollups & records to parallel columns of timestamps & gallons.
+
+    A column of resolutions is added when there are rollups.
+
+    Returns:
+        The serialized columns.
+    """
+
+    local_times = _local_times()
+    columns: dict[str, list[Any]] = {
+        "timestamps": [
+            *(local_times.to_epoch(rollup.start) for rollup in rollups),
+            *(local_times.to_epoch(record["read_datetime"]) for record in records),
+        ],
+        "gallons": [
+            *(round(rollup.gallons, GALLONS_PRECISION) for rollup in rollups),
+            *(_record_gallons(record) for record in records),
+        ],
+    }
+
+    if rollups:
+        columns["resolutions"] = [
+            *(rollup.resolution for rollup in rollups),
+            *(RESOLUTION_HOURLY for _ in records),
+        ]
+
+    return columns
+
+
+async def __get_cost_breakdown(
+    call: ServiceCall,
+    *,
+    hass: HomeAssistant,
+) -> ServiceResponse:
+    coordinator = __get_coordinator(hass, call)
+    start, end = __get_range(call)
+
+    if call.data.get(ATTR_FROM_CACHE) is False:
+        await coordinator.async_background_refresh()
+
+    costs = coordinator.costs
+
+    if not costs:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="no_rate_schedule",
+            translation_placeholders={
+                "config_entry": call.data[ATTR_CONFIG_ENTRY],
+            },
+        )
+
+    days = costs.days_between(start_of_day(start) if start is not None else None, end)
+    cycle_count = sum(
+        1
+        for cycle in costs.cycles
+        if (start is None or cycle.start >= start)
+        and (end is None or cycle.start < end)
+    )
+
+    gallons = sum(day.gallons for day in days)
+    usage_cost = sum(day.cost for day in days)
+    fixed_charges = cycle_count * costs.schedule.fixed_charge
+
+    return {
+        "days": [
+            {
+                "start": _isoformat(day.start),
+                "gallons": round(day.gallons, GALLONS_PRECISION),
+                "cost": round(day.cost, COST_PRECISION),
+            }
+            for day in days
+        ],
+        "gallons": round(gallons, GALLONS_PRECISION),
+        "usage_cost": round(usage_cost, COST_PRECISION),
+        "fixed_charges": round(fixed_charges, COST_PRECISION),
+        "cost": round(usage_cost + fixed_charges, COST_PRECISION),
+    }
+
+
+async def __get_top_usage(
+    call: ServiceCall,
+    *,
+    hass: HomeAssistant,
+) -> ServiceResponse:
+    coordinator = __get_coordinator(hass, call)
+    start, end = __get_range(call)
+    count: int = call.data[ATTR_COUNT]
+
+    if call.data.get(ATTR_FROM_CACHE) is False:
+        await coordinator.async_background_refresh()
+
+    await coordinator.async_load_history(start)
+    history = coordinator.history
+
+    # only the selected items are kept while scanning the range, so this takes
+    # O(n log count) & only they are serialized
+    if call.data[ATTR_AGGREGATION] == AGGREGATION_DAILY:
+        top = heapq.nlargest(
+            count,
+            chain(
+                (
+                    (rollup.start, rollup.gallons)
+                    for rollup in coordinator.retained.rollups_between(start, end)
+                    if isinstance(rollup, DailyRollup)
+                ),
+                daily_totals(*history.columns_between(start, end)),
+            ),
+            key=itemgetter(1),
+        )
+    else:
+        top = heapq.nlargest(
+            count,
+            (
+                (record["read_datetime"], record["gallons"])
+                for record in history.records_between(start, end)
+                if record["gallons"] is not None
+            ),
+            key=itemgetter(1),
+        )
+
+    local_times = _local_times()
+
+    return {
+        "top": [
+            {
+                "start": local_times.isoformat(timestamp),
+                "gallons": round(gallons, GALLONS_PRECISION),
+            }
+            for timestamp, gallons in top
+        ]
+    }
+
+
+async def __get_usage_profile(
+    call: ServiceCall,
+    *,
+    hass: HomeAssistant,
+) -> ServiceResponse:
+    coordinator = __get_coordinator(hass, call)
+
+    if call.data.get(ATTR_FROM_CACHE) is False:
+        await coordinator.async_background_refresh()
+
+    profile: list[dict[str, Any]] = []
+
+    for weekday, cells in enumerate(coordinator.profile.cells):
+        for hour, cell in enumerate(cells):
+            stddev = cell.stddev
+            profile.append(
+                {
+                    "weekday": weekday,
+                    "hour": hour,
+                    "samples": cell.count,
+                    "mean_gallons": (
+                        round(cell.mean, GALLONS_PRECISION) if cell.count else None
+                    ),
+                    "stddev_gallons": (
+                        round(stddev, GALLONS_PRECISION) if stddev is not None else None
+                    ),
+                }
+            )
+
+    return {"profile": profile}
+
+
+async def __get_batch_history(
+    call: ServiceCall,
+    *,
+    hass: HomeAssistant,
+) -> ServiceResponse:
+    entry_ids: list[str] = call.data.get(ATTR_CONFIG_ENTRIES) or [
+        entry.entry_id for entry in hass.config_entries.async_loaded_entries(DOMAIN)
+    ]
+    coordinators = {
+        entry_id: __get_entry_coordinator(hass, entry_id) for entry_id in entry_ids
+    }
+    start, end = __get_range(call)
+    aggregation: str = call.data[ATTR_AGGREGATION]
+
+    if call.data.get(ATTR_FROM_CACHE) is False:
+        await asyncio.gather(
+            *(
+                coordinator.async_background_refresh()
+                for coordinator in coordinators.values()
+            )
+        )
+
+    await asyncio.gather(
+        *(
+            coordinator.async_load_history(start)
+            for coordinator in coordinators.values()
+        )
+    )
+
+    # slicing is cheap & happens on the event loop where history is merged &
+    # compacted; the rollups only read the sliced records, so they run
+    # concurrently in the executor. Only hourly history needs the records.
+    rollups = await asyncio.gather(
+        *(
+            hass.async_add_executor_job(
+                __rollup_records,
+                coordinator.retained.rollups_between(start, end),
+                coordinator.history.records_between(start, end)
+                if aggregation == AGGREGATION_HOURLY
+                else [],
+                coordinator.history.columns_between(start, end),
+                aggregation,
+            )
+            for coordinator in coordinators.values()
+        )
+    )
+
+    entries = dict(zip(coordinators, rollups, strict=True))
+    total: dict[str, Any] = {
+        "gallons": round(
+            sum(rollup["gallons"] for rollup in rollups), GALLONS_PRECISION
+        ),
+    }
+
+    if aggregation != AGGREGATION_TOTAL:
+        # entries may have compacted different spans, so only items of the same
+        # resolution are combined
+        combined: defaultdict[tuple[str, str | None], float] = defaultdict(float)
+
+        for rollup in rollups:
+            for item in rollup["history"]:
+                combined[item["start"], item.get("resolution")] += item["gallons"]
+
+        total["history"] = [
+            {"start": start, "gallons": round(gallons, GALLONS_PRECISION)}
+            | ({"resolution": resolution} if resolution else {})
+            for (start, resolution), gallons in sorted(
+                combined.items(), key=lambda item: item[0][0]
+            )
+        ]
+
+    return {"entries": entries, "total": total}
+
+
+def __rollup_records(
+    compacted: list[DailyRollup | MonthlyTotal],
+    records: list[UsageRecord],
+    columns: tuple[list[int], list[float]],
+    aggregation: str,
+) -> dict[str, Any]:
+    """Roll up records for a batch response.
+
+    Totals come from the history's running totals rather than the records.
+    Compacted history comes first, at the finest resolution still kept for it.
+    Items coarser than the aggregation have a resolution.
+
+    Returns:
+        The total gallons & history at the requested aggregation.
+    """
+
+    timestamps, cumulative = columns
+    result: dict[str, Any] = {
+        "gallons": round(
+            cumulative[-1] - cumulative[0] + sum(item.gallons for item in compacted),
+            GALLONS_PRECISION,
+        ),
+    }
+
+    if aggregation == AGGREGATION_HOURLY:
+        result["history"] = [
+            *__serialize_rollups(compacted),
+            *_serialize_records(records),
+        ]
+    elif aggregation == AGGREGATION_DAILY:
+        result["history"] = [
+            *(
+                {
+                    "start": _isoformat(item.start),
+                    "gallons": round(item.gallons, GALLONS_PRECISION),
+                }
+                | (
+                    {"resolution": item.resolution}
+                    if isinstance(item, MonthlyTotal)
+                    else {}
+                )
+                for item in compacted
+            ),
+            *(
+                {
+                    "start": _isoformat(day),
+                    "gallons": round(gallons, GALLONS_PRECISION),
+                }
+                for day, gallons in daily_totals(timestamps, cumulative)
+            ),
+        ]
+
+    return result
 
 
 @callback
@@ -150,6 +771,46 @@ def async_setup_services(hass: HomeAssistant) -> None:
         DOMAIN,
         HOURLY_HISTORY_SERVICE_NAME,
         partial(__get_hourly_history, hass=hass),
+        schema=HOURLY_HISTORY_SERVICE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        BATCH_HISTORY_SERVICE_NAME,
+        partial(__get_batch_history, hass=hass),
+        schema=BATCH_SERVICE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        COST_BREAKDOWN_SERVICE_NAME,
+        partial(__get_cost_breakdown, hass=hass),
         schema=SERVICE_SCHEMA,
         supports_response=SupportsResponse.ONLY,
     )
+
+    hass.services.async_register(
+        DOMAIN,
+        USAGE_PROFILE_SERVICE_NAME,
+        partial(__get_usage_profile, hass=hass),
+        schema=USAGE_PROFILE_SERVICE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        TOP_USAGE_SERVICE_NAME,
+        partial(__get_top_usage, hass=hass),
+        schema=TOP_USAGE_SERVICE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        CHANGES_SINCE_SERVICE_NAME,
+        partial(__get_changes_since, hass=hass),
+        schema=CHANGES_SINCE_SERVICE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -17,6 +17,8 @@ class WaterSmartData:
     """Runtime data definition."""
 
     coordinator: cdn.WaterSmartUpdateCoordinator
+    # options the entry was set up with
+    options: dict[str, Any]
 
 
 class SensorData(TypedDict):
@@ -0,0 +1,63 @@
+"""Websocket API for the WaterSmart integration."""
+
+from __future__ import annotations
+
+from typing import Any, Final
+
+from homeassistant.components import websocket_api
+from homeassistant.core import Event, HomeAssistant, callback
+import voluptuous as vol
+
+from .const import DOMAIN, EVENT_NEW_READINGS
+
+ATTR_CONFIG_ENTRY: Final = "config_entry"
+
+SUBSCRIBE_READINGS_COMMAND: Final = f"{DOMAIN}/subscribe_readings"
+
+
+@callback
+def async_setup_websocket(hass: HomeAssistant) -> None:
+    """Set up WaterSmart websocket commands."""
+
+    websocket_api.async_register_command(hass, _ws_subscribe_readings)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): SUBSCRIBE_READINGS_COMMAND,
+        vol.Required(ATTR_CONFIG_ENTRY): str,
+    }
+)
+@callback
+def _ws_subscribe_readings(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Send the hours each refresh adds to an entry's history."""
+
+    entry_id: str = msg[ATTR_CONFIG_ENTRY]
+    entry = hass.config_entries.async_get_entry(entry_id)
+
+    if entry is None or entry.domain != DOMAIN:
+        connection.send_error(
+            msg["id"],
+            websocket_api.ERR_NOT_FOUND,
+            f"Invalid config entry provided. Got {entry_id}",
+        )
+        return
+
+    @callback
+    def _is_entry(event_data: dict[str, Any]) -> bool:
+        return bool(event_data[ATTR_CONFIG_ENTRY] == entry_id)
+
+    @callback
+    def _forward(event: Event[dict[str, Any]]) -> None:
+        connection.send_message(
+            websocket_api.event_message(msg["id"], {"readings": event.data["readings"]})
+        )
+
+    connection.subscriptions[msg["id"]] = hass.bus.async_listen(
+        EVENT_NEW_READINGS, _forward, event_filter=_is_entry
+    )
+    connection.send_result(msg["id"])
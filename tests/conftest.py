@@ -1,17 +1,20 @@
 """Fixtures for testing."""
 
+import asyncio
 from collections.abc import Generator
 import json
 from pathlib import Path
 from typing import Any
 from unittest.mock import AsyncMock, PropertyMock, patch
 
+import aiohttp
 from homeassistant.core import HomeAssistant
 import pytest
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
-from custom_components.watersmart.client import AuthenticationError
+from custom_components.watersmart.client import AuthenticationError, UsageRecord
 from custom_components.watersmart.const import DOMAIN
+from custom_components.watersmart.resilience import CircuitOpenError
 
 FIXTURES_DIR = Path(__file__).parent.joinpath("fixtures")
 
@@ -46,6 +49,18 @@ class FixtureLoader:
         return data
 
 
+def usage_record(
+    read_datetime: int, gallons: float | None = 1.0, leak_gallons: int | None = 0
+) -> UsageRecord:
+    """Build an hourly record."""
+    return {
+        "read_datetime": read_datetime,
+        "gallons": gallons,
+        "leak_gallons": leak_gallons,
+        "flags": None,
+    }
+
+
 @pytest.fixture
 def fixture_loader():
     return FixtureLoader()
@@ -57,19 +72,35 @@ def auto_enable_custom_integrations(enable_custom_integrations):
     return
 
 
+@pytest.fixture(autouse=True)
+def config_dir(hass: HomeAssistant, tmp_path: Path) -> Path:
+    """Keep files written by the integration out of the shared test config."""
+    hass.config.config_dir = str(tmp_path)
+    return tmp_path
+
+
 class MockAiohttpResponse:
     def __init__(
         self,
         text: str = "",  # noqa: ARG002
         json: dict[str, Any] | None = None,
-        status: int = 200,  # noqa: ARG002
+        status: int = 200,
     ):
         if json is None:
             json = {}
+        self.status = status
+        self.headers: dict[str, str] = {}
         self.text = AsyncMock(return_value="", spec="aiohttp.ClientResponse.text")
 
-    async def json(self):
-        return json.loads(await self.text())
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(None, (), status=self.status)
+
+    async def read(self):
+        return (await self.text()).encode()
+
+    async def json(self, loads=json.loads):
+        return loads(await self.text())
 
 
 @pytest.fixture
@@ -135,6 +166,21 @@ def client_authentication_error(mock_watersmart_client):
     )
 
 
+@pytest.fixture
+def client_held_failure(mock_watersmart_client) -> asyncio.Event:
+    """Hold hourly data requests until the event is set, then fail them."""
+
+    release = asyncio.Event()
+
+    async def _get_hourly_data(*_args: object, **_kwargs: object) -> None:
+        await release.wait()
+        raise CircuitOpenError
+
+    mock_watersmart_client.async_get_hourly_data.side_effect = _get_hourly_data
+
+    return release
+
+
 @pytest.fixture
 def mock_sensor_name() -> Generator[PropertyMock]:
     """Mock sensor names.
@@ -144,10 +190,16 @@ def mock_sensor_name() -> Generator[PropertyMock]:
     get entity ids that are closer to what they will really be.
     """
 
-    with patch(
-        "homeassistant.components.sensor.SensorEntity.name",
-        new_callable=AdvacnedPropertyMock,
-    ) as mock_name:
+    with (
+        patch(
+            "homeassistant.components.sensor.SensorEntity.name",
+            new_callable=AdvacnedPropertyMock,
+        ) as mock_name,
+        patch(
+            "homeassistant.components.binary_sensor.BinarySensorEntity.name",
+            new=mock_name,
+        ),
+    ):
 
         def name_from_entity_description(sensor):
             return sensor.entity_description.translation_key.replace(
@@ -162,7 +214,13 @@ def mock_sensor_name() -> Generator[PropertyMock]:
 
 
 @pytest.fixture
-def mock_config_entry() -> MockConfigEntry:
+def mock_config_entry_options() -> dict[str, Any]:
+    """Return the options for the mocked config entry."""
+    return {}
+
+
+@pytest.fixture
+def mock_config_entry(mock_config_entry_options: dict[str, Any]) -> MockConfigEntry:
     """Return the default mocked config entry."""
     return MockConfigEntry(
         domain=DOMAIN,
@@ -171,6 +229,7 @@ def mock_config_entry() -> MockConfigEntry:
             "username": "test@home-assistant.io",
             "password": "Passw0rd",
         },
+        options=mock_config_entry_options,
     )
 
 
@@ -0,0 +1,178 @@
+"""Local stand-in for the WaterSmart web app.
+
+Serves the login pages from the test fixtures & synthetic hourly usage from
+the realtime chart endpoint so the real client can be exercised end to end
+without reaching a utility's site. Response size, latency & failure rate are
+configurable for load & soak testing.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import datetime as dt
+import hashlib
+import json
+from pathlib import Path
+import random
+import secrets
+
+from aiohttp import web
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+LOGIN_PATH = "/index.php/welcome/login"
+REALTIME_CHART_PATH = "/index.php/rest/v1/Chart/RealTimeChart"
+SESSION_COOKIE = "PHPSESSID"
+
+HOUR_SECONDS = 3600
+
+
+@dataclass
+class FakeServerConfig:
+    """Behavior of the fake server."""
+
+    username: str = "test@home-assistant.io"
+    password: str = "Passw0rd"  # noqa: S105
+    series_hours: int = 24 * 30
+    latency: float = 0
+    # fraction of usage data requests that respond with a server error
+    failure_rate: float = 0
+    refresh_token_step: bool = False
+    conditional_requests: bool = False
+    seed: int = 0
+
+
+@dataclass
+class FakeServerStats:
+    """Counters for requests handled by the fake server."""
+
+    logins: int = 0
+    failed_logins: int = 0
+    data_requests: int = 0
+    not_modified: int = 0
+    unauthenticated_requests: int = 0
+    injected_failures: int = 0
+
+
+@dataclass
+class FakeWaterSmartServer:
+    """Fake WaterSmart server."""
+
+    config: FakeServerConfig = field(default_factory=FakeServerConfig)
+    stats: FakeServerStats = field(default_factory=FakeServerStats)
+    sessions: set[str] = field(default_factory=set)
+
+    def __post_init__(self) -> None:
+        """Initialize."""
+        self._random = random.Random(self.config.seed)  # noqa: S311
+        self._pages = {
+            name: (FIXTURES_DIR / f"{name}.html").read_text()
+            for name in ("login_success", "login_error", "login_refreshtoken")
+        }
+
+    def create_app(self) -> web.Application:
+        """Create the web application.
+
+        Returns:
+            The application.
+        """
+
+        app = web.Application()
+        app.router.add_get(LOGIN_PATH, self._handle_login_page)
+        app.router.add_post(LOGIN_PATH, self._handle_login)
+        app.router.add_get(REALTIME_CHART_PATH, self._handle_realtime_chart)
+
+        return app
+
+    def series(self, end: int | None = None) -> list[dict]:
+        """Generate synthetic hourly usage ending at the given timestamp.
+
+        Timestamps follow the WaterSmart convention of local wall-clock time
+        encoded as if it were UTC.
+
+        Returns:
+            The usage records.
+        """
+
+        if end is None:
+            now = dt.datetime.now().replace(tzinfo=dt.UTC)  # noqa: DTZ005
+            end = int(now.timestamp()) // HOUR_SECONDS * HOUR_SECONDS
+        hours = self.config.series_hours
+        start = end - (hours - 1) * HOUR_SECONDS
+        rng = random.Random(self.config.seed)  # noqa: S311
+
+        return [
+            {
+                "read_datetime": start + index * HOUR_SECONDS,
+                "gallons": round(rng.uniform(0, 12), 2),
+                "leak_gallons": 0,
+                "flags": None,
+            }
+            for index in range(hours)
+        ]
+
+    async def _delay(self) -> None:
+        if self.config.latency:
+            await asyncio.sleep(self.config.latency)
+
+    def _should_fail(self) -> bool:
+        return self._random.random() < self.config.failure_rate
+
+    async def _handle_login_page(self, _request: web.Request) -> web.Response:
+        return web.Response(
+            text=self._pages["login_refreshtoken"], content_type="text/html"
+        )
+
+    async def _handle_login(self, request: web.Request) -> web.Response:
+        await self._delay()
+        form = await request.post()
+        config = self.config
+
+        if form.get("email") != config.username or form.get("password") != (
+            config.password
+        ):
+            self.stats.failed_logins += 1
+            return web.Response(
+                text=self._pages["login_error"], content_type="text/html"
+            )
+
+        if config.refresh_token_step and not form.get("loginRefreshToken"):
+            return web.Response(
+                text=self._pages["login_refreshtoken"], content_type="text/html"
+            )
+
+        self.stats.logins += 1
+        token = secrets.token_hex(16)
+        self.sessions.add(token)
+        response = web.Response(
+            text=self._pages["login_success"], content_type="text/html"
+        )
+        response.set_cookie(SESSION_COOKIE, token)
+
+        return response
+
+    async def _handle_realtime_chart(self, request: web.Request) -> web.Response:
+        await self._delay()
+
+        if request.cookies.get(SESSION_COOKIE) not in self.sessions:
+            self.stats.unauthenticated_requests += 1
+            raise web.HTTPFound(LOGIN_PATH)
+
+        if self._should_fail():
+            self.stats.injected_failures += 1
+            raise web.HTTPServiceUnavailable
+
+        self.stats.data_requests += 1
+        body = json.dumps({"data": {"series": self.series()}})
+
+        if not self.config.conditional_requests:
+            return web.json_response(text=body)
+
+        etag = f'"{hashlib.blake2b(body.encode(), digest_size=8).hexdigest()}"'
+
+        if request.headers.get("If-None-Match") == etag:
+            self.stats.not_modified += 1
+            return web.Response(status=304, headers={"ETag": etag})
+
+        return web.json_response(text=body, headers={"ETag": etag})
@@ -0,0 +1,189 @@
+"""Test binary sensor for WaterSmart integration."""
+
+import datetime as dt
+
+from homeassistant.const import STATE_OFF, STATE_ON, STATE_UNAVAILABLE
+from homeassistant.core import CoreState, HomeAssistant, State
+from homeassistant.util.dt import utcnow
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+    async_mock_restore_state_shutdown_restart,
+    mock_restore_cache_with_extra_data,
+)
+from syrupy.assertion import SnapshotAssertion
+
+from custom_components.watersmart.binary_sensor import (
+    WaterSmartBinarySensorExtraStoredData,
+)
+
+CONTINUOUS_FLOW_ENTITY_ID = "binary_sensor.watersmart_test_continuous_flow"
+UNUSUAL_USAGE_ENTITY_ID = "binary_sensor.watersmart_test_unusual_usage"
+
+
+def _append_hours(hourly, gallons_list):
+    for gallons in gallons_list:
+        hourly.append(
+            dict(
+                hourly[-1],
+                read_datetime=hourly[-1]["read_datetime"] + 3600,
+                gallons=gallons,
+            )
+        )
+
+
+@pytest.fixture
+def client_hourly_data_continuous_flow(mock_watersmart_client):
+    hourly = mock_watersmart_client.async_get_hourly_data.return_value
+
+    _append_hours(hourly, [0.5] * 24)
+
+
+@pytest.fixture
+def client_hourly_data_leak_reported(mock_watersmart_client):
+    mock_watersmart_client.async_get_hourly_data.return_value[-1]["leak_gallons"] = 3
+
+
+@pytest.mark.usefixtures("init_integration")
+def test_continuous_flow_sensor(hass: HomeAssistant, snapshot: SnapshotAssertion):
+    """Test binary sensor."""
+    assert snapshot == hass.states.get(CONTINUOUS_FLOW_ENTITY_ID)
+
+
+@pytest.mark.usefixtures("client_hourly_data_continuous_flow", "init_integration")
+def test_continuous_flow_sensor_on(hass: HomeAssistant, snapshot: SnapshotAssertion):
+    """Test binary sensor."""
+    assert snapshot == hass.states.get(CONTINUOUS_FLOW_ENTITY_ID)
+
+
+@pytest.mark.usefixtures("client_hourly_data_leak_reported", "init_integration")
+def test_continuous_flow_sensor_leak_reported(hass: HomeAssistant):
+    """Test binary sensor."""
+    state = hass.states.get(CONTINUOUS_FLOW_ENTITY_ID)
+
+    assert state.state == STATE_ON
+    assert state.attributes["leak_gallons"] == 3
+
+
+@pytest.mark.usefixtures("init_integration")
+async def test_continuous_flow_sensor_update(
+    hass: HomeAssistant, mock_watersmart_client
+):
+    """Test binary sensor is only fed newly merged hours."""
+    assert hass.states.get(CONTINUOUS_FLOW_ENTITY_ID).state == STATE_OFF
+
+    hourly = [
+        dict(record)
+        for record in mock_watersmart_client.async_get_hourly_data.return_value
+    ]
+    _append_hours(hourly, [1.0] * 30)
+    mock_watersmart_client.async_get_hourly_data.return_value = hourly
+
+    async_fire_time_changed(hass, utcnow() + dt.timedelta(hours=1))
+    await hass.async_block_till_done()
+
+    state = hass.states.get(CONTINUOUS_FLOW_ENTITY_ID)
+
+    assert state.state == STATE_ON
+    assert state.attributes["consecutive_flow_hours"] == 30
+
+
+@pytest.fixture
+def client_hourly_data_unusual_usage(mock_watersmart_client):
+    hourly = mock_watersmart_client.async_get_hourly_data.return_value
+
+    _append_hours(hourly, [1.0, 2.0] * 24 * 7 * 2 + [30.0])
+
+
+@pytest.mark.usefixtures("init_integration")
+def test_unusual_usage_sensor(hass: HomeAssistant, snapshot: SnapshotAssertion):
+    """Test binary sensor."""
+    assert snapshot == hass.states.get(UNUSUAL_USAGE_ENTITY_ID)
+
+
+@pytest.mark.usefixtures("client_hourly_data_unusual_usage", "init_integration")
+def test_unusual_usage_sensor_on(hass: HomeAssistant, snapshot: SnapshotAssertion):
+    """Test binary sensor."""
+    assert snapshot == hass.states.get(UNUSUAL_USAGE_ENTITY_ID)
+
+
+@pytest.fixture
+async def restored_integration(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    mock_sensor_name,
+    client_held_failure,
+) -> MockConfigEntry:
+    """Set up the integration during startup with a restored state."""
+
+    hass.set_state(CoreState.starting)
+    mock_restore_cache_with_extra_data(
+        hass,
+        [
+            (
+                State(CONTINUOUS_FLOW_ENTITY_ID, STATE_ON),
+                {"is_on": True, "attributes": {"consecutive_flow_hours": 30}},
+            ),
+        ],
+    )
+    mock_config_entry.add_to_hass(hass)
+
+    await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    return mock_config_entry
+
+
+@pytest.mark.usefixtures("restored_integration")
+async def test_binary_sensor_restored(
+    hass: HomeAssistant, mock_watersmart_client, client_held_failure
+):
+    """Test the last state is restored until the first update attempt finishes."""
+    state = hass.states.get(CONTINUOUS_FLOW_ENTITY_ID)
+
+    assert state.state == STATE_ON
+    assert state.attributes["consecutive_flow_hours"] == 30
+    assert hass.states.get(UNUSUAL_USAGE_ENTITY_ID).state == STATE_UNAVAILABLE
+
+    client_held_failure.set()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert hass.states.get(CONTINUOUS_FLOW_ENTITY_ID).state == STATE_UNAVAILABLE
+
+    mock_watersmart_client.async_get_hourly_data.side_effect = None
+    async_fire_time_changed(hass, utcnow() + dt.timedelta(hours=1))
+    await hass.async_block_till_done()
+
+    state = hass.states.get(CONTINUOUS_FLOW_ENTITY_ID)
+
+    assert state.state == STATE_OFF
+    assert state.attributes["consecutive_flow_hours"] != 30
+
+
+@pytest.mark.usefixtures("client_hourly_data_leak_reported", "init_integration")
+async def test_binary_sensor_restore_data(hass: HomeAssistant):
+    """Test only a compact summary of the attributes is stored."""
+    data = await async_mock_restore_state_shutdown_restart(hass)
+    state = hass.states.get(CONTINUOUS_FLOW_ENTITY_ID)
+
+    assert data.last_states[CONTINUOUS_FLOW_ENTITY_ID].extra_data.as_dict() == {
+        "is_on": True,
+        "attributes": {
+            key: value
+            for key, value in state.attributes.items()
+            if key not in {"attribution", "device_class", "friendly_name"}
+        },
+    }
+
+
+@pytest.mark.parametrize(
+    "restored",
+    [
+        {"is_on": "on", "attributes": {}},
+        {"is_on": True},
+    ],
+)
+def test_binary_sensor_restore_data_invalid(restored):
+    """Test incomplete stored data is ignored."""
+    assert WaterSmartBinarySensorExtraStoredData.from_dict(restored) is None
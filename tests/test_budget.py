@@ -0,0 +1,313 @@
+"""Test the memory budget & spilled hourly history."""
+
+import asyncio
+import datetime as dt
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock, patch
+
+from homeassistant.core import HomeAssistant
+import pytest
+
+from custom_components.watersmart.budget import (
+    MemoryBudget,
+    get_memory_budget,
+    read_hours,
+    write_hours,
+)
+from custom_components.watersmart.cache import get_response_cache
+from custom_components.watersmart.const import DOMAIN
+from custom_components.watersmart.history import (
+    DAY_SECONDS,
+    RECORD_BYTES,
+    HourlyHistory,
+)
+from custom_components.watersmart.retention import RetentionPolicy
+
+from .conftest import MockConfigEntry, usage_record
+
+JAN_1 = int(dt.datetime(2024, 1, 1, tzinfo=dt.UTC).timestamp())
+# hours before the 35 days ending with the last fetched day
+SPILLED_BEFORE = JAN_1 + 25 * DAY_SECONDS
+
+
+def _coordinator(usage: int, freed: int = 0) -> Mock:
+    async def _spill() -> int:
+        # spilling writes in the executor
+        await asyncio.sleep(0)
+        return freed
+
+    coordinator = Mock()
+    coordinator.memory_usage.return_value = {"hourly_history": usage}
+    coordinator.async_spill_history = AsyncMock(side_effect=_spill)
+    return coordinator
+
+
+async def test_budget_spills_least_recently_queried(hass: HomeAssistant):
+    budget = MemoryBudget(hass, limit=250)
+    first, second, third = _coordinator(100, 100), _coordinator(100), _coordinator(100)
+
+    for coordinator in (first, second, third):
+        budget.register(coordinator)
+
+    budget.touch(first)
+    budget.touch(Mock())
+    budget.unregister(Mock())
+
+    assert budget.total() == 300
+
+    budget.async_schedule_enforce()
+    # enforcement is already scheduled
+    budget.async_schedule_enforce()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    second.async_spill_history.assert_awaited_once()
+    third.async_spill_history.assert_awaited_once()
+    first.async_spill_history.assert_awaited_once()
+
+    budget.unregister(first)
+    budget.async_schedule_enforce()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert second.async_spill_history.await_count == 1
+
+
+async def test_budget_stops_under_limit(hass: HomeAssistant):
+    budget = MemoryBudget(hass, limit=150)
+    first, second = _coordinator(100, 100), _coordinator(100)
+    budget.register(first)
+    budget.register(second)
+
+    budget.async_schedule_enforce()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    first.async_spill_history.assert_awaited_once()
+    second.async_spill_history.assert_not_awaited()
+
+
+async def test_budget_drops_responses_first(hass: HomeAssistant):
+    budget = MemoryBudget(hass, limit=150)
+    coordinator = _coordinator(200)
+    budget.register(coordinator)
+    get_response_cache(hass).put("entry", 1, "query", {}, 100)
+
+    budget.async_schedule_enforce()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert len(get_response_cache(hass)) == 0
+    coordinator.async_spill_history.assert_not_awaited()
+
+
+def test_get_memory_budget(hass: HomeAssistant):
+    assert get_memory_budget(hass) is get_memory_budget(hass)
+
+
+def test_spilled_hours_round_trip(tmp_path: Path):
+    path = tmp_path / "entry.hours"
+    records = [usage_record(JAN_1, 1.5, 1), usage_record(JAN_1 + 3600, None, None)]
+
+    write_hours(path, records, [0, 1.5])
+
+    assert read_hours(path) == (records, [0, 1.5])
+    assert read_hours(tmp_path / "missing.hours") == ([], [])
+
+
+def test_history_detach_and_attach():
+    history = HourlyHistory()
+    history.merge(
+        [usage_record(0, 1.0), usage_record(3600, 2.0), usage_record(7200, 4.0)]
+    )
+
+    records, cumulative = history.detach_before(7200)
+
+    assert records == [usage_record(0, 1.0), usage_record(3600, 2.0)]
+    assert cumulative == [0, 1.0]
+    assert (history.spilled_from, history.spilled_before) == (0, 7200)
+    assert history.first_timestamp == 0
+    assert history.nbytes == 288
+
+    merge = history.merge([usage_record(3600, 8.0), usage_record(7200, 4.0)])
+
+    assert not merge.changed
+    assert history.gallons_between(0, 10800) == 4.0
+
+    history.attach(records, cumulative)
+
+    assert history.spilled_before is None
+    assert history.timestamps == [0, 3600, 7200]
+    assert history.gallons_between(0, 10800) == 7.0
+    assert history.detach_before(0) == ([], [])
+    assert history.first_timestamp == 0
+
+
+@pytest.fixture
+def client_hourly_data_60_days(mock_watersmart_client):
+    hourly = mock_watersmart_client.async_get_hourly_data.return_value
+
+    mock_watersmart_client.async_get_hourly_data.return_value = [
+        dict(hourly[0], read_datetime=JAN_1 + hour * 3600, gallons=1.0)
+        for hour in range(60 * 24)
+    ]
+
+
+@pytest.fixture
+async def spilled_integration(
+    hass: HomeAssistant, init_integration: MockConfigEntry
+) -> MockConfigEntry:
+    coordinator = init_integration.runtime_data.coordinator
+    budget = get_memory_budget(hass)
+    budget.limit = 0
+    budget.async_schedule_enforce()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert coordinator.history.spilled_before is not None
+
+    return init_integration
+
+
+@pytest.mark.usefixtures("client_hourly_data_60_days")
+async def test_coordinator_spills_history(
+    hass: HomeAssistant, spilled_integration: MockConfigEntry
+):
+    coordinator = spilled_integration.runtime_data.coordinator
+    path = Path(
+        hass.config.path(".storage", DOMAIN, f"{spilled_integration.entry_id}.hours")
+    )
+
+    assert path.exists()
+    assert coordinator.history.spilled_before == SPILLED_BEFORE
+    assert len(coordinator.history.records) == 35 * 24
+    assert coordinator.history.gallons_between(JAN_1, JAN_1 + 60 * DAY_SECONDS) == (
+        35 * 24
+    )
+    assert coordinator.data["gallons_for_last_30_days"]["state"] == 30 * 24
+
+    # already spilled
+    assert await coordinator.async_spill_history() == 0
+
+    # queries after the spilled hours leave them on disk
+    await coordinator.async_load_history(SPILLED_BEFORE)
+
+    assert coordinator.history.spilled_before == SPILLED_BEFORE
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "get_hourly_history",
+        {"config_entry": spilled_integration.entry_id},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert len(response["history"]) == 60 * 24
+    assert coordinator.history.spilled_before is None
+    assert coordinator.history.gallons_between(JAN_1, JAN_1 + 60 * DAY_SECONDS) == (
+        60 * 24
+    )
+
+    # restoring again does nothing
+    await coordinator.async_restore_history()
+
+    assert len(coordinator.history.records) == 60 * 24
+
+    await hass.config_entries.async_remove(spilled_integration.entry_id)
+
+    assert not path.exists()
+
+
+@pytest.mark.usefixtures("client_hourly_data_60_days")
+async def test_refresh_restores_revised_spilled_hours(
+    hass: HomeAssistant,
+    spilled_integration: MockConfigEntry,
+    mock_watersmart_client,
+):
+    coordinator = spilled_integration.runtime_data.coordinator
+    hourly = mock_watersmart_client.async_get_hourly_data.return_value
+
+    # fetched hours that match the spilled hours are not loaded
+    mock_watersmart_client.async_get_hourly_data.return_value = [
+        *(dict(record) for record in hourly[:-1]),
+        dict(hourly[-1], gallons=2.0),
+    ]
+    await coordinator.async_refresh()
+
+    assert coordinator.history.spilled_before == SPILLED_BEFORE
+    assert coordinator.data["gallons_for_last_30_days"]["state"] == 30 * 24 + 1
+
+    # fetched hours that are all after the spilled hours are not compared
+    mock_watersmart_client.async_get_hourly_data.return_value = [
+        dict(record) for record in hourly[-24:]
+    ]
+    await coordinator.async_refresh()
+
+    assert coordinator.history.spilled_before == SPILLED_BEFORE
+
+    mock_watersmart_client.async_get_hourly_data.return_value = [
+        dict(hourly[0], gallons=2.0),
+        *hourly[1:],
+    ]
+    get_memory_budget(hass).limit = 1 << 30
+    await coordinator.async_refresh()
+
+    assert coordinator.history.spilled_before is None
+    assert coordinator.history.gallons_between(JAN_1, JAN_1 + 60 * DAY_SECONDS) == (
+        60 * 24 + 1
+    )
+
+
+@pytest.mark.usefixtures("client_hourly_data_60_days")
+@pytest.mark.parametrize(
+    "mock_config_entry_options",
+    [{"hourly_retention_days": 40, "daily_retention_months": 1}],
+)
+async def test_compaction_restores_spilled_hours(
+    hass: HomeAssistant, init_integration: MockConfigEntry
+):
+    coordinator = init_integration.runtime_data.coordinator
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    coordinator._compacting = True
+
+    assert await coordinator.async_spill_history() == 0
+
+    coordinator._compacting = False
+
+    assert await coordinator.async_spill_history() == 5 * 24 * RECORD_BYTES
+
+    coordinator.retention = RetentionPolicy(35, 1)
+    coordinator._async_schedule_compaction(coordinator.history.timestamps[-1])
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert coordinator.history.spilled_before is None
+    assert len(coordinator.retained.daily) == 25
+    assert coordinator.history.timestamps[0] == SPILLED_BEFORE
+
+
+async def test_spill_without_old_hours(
+    hass: HomeAssistant, init_integration: MockConfigEntry
+):
+    coordinator = init_integration.runtime_data.coordinator
+
+    assert await coordinator.async_spill_history() == 0
+
+    coordinator.spill_path = None
+
+    assert await coordinator.async_spill_history() == 0
+
+
+@pytest.mark.usefixtures("client_hourly_data_60_days")
+async def test_spill_discarded_when_history_changes(
+    hass: HomeAssistant, init_integration: MockConfigEntry
+):
+    coordinator = init_integration.runtime_data.coordinator
+    history = coordinator.history
+
+    def _write_hours(*_args: object) -> None:
+        history.merge([usage_record(JAN_1, 3.0)])
+
+    with patch(
+        "custom_components.watersmart.coordinator.write_hours",
+        side_effect=_write_hours,
+    ):
+        assert await coordinator.async_spill_history() == 0
+
+    assert history.spilled_before is None
+    assert len(history.records) == 60 * 24
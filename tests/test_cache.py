@@ -0,0 +1,39 @@
+"""Test the service response cache."""
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.watersmart.cache import ResponseCache, get_response_cache
+
+
+def test_response_cache():
+    cache = ResponseCache(maxsize=2)
+
+    assert cache.get("a", 1, "query") is None
+
+    cache.put("a", 1, "query", {"history": []}, 10)
+    cache.put("b", 1, "query", {"history": [1]}, 20)
+
+    assert cache.get("a", 1, "query") == {"history": []}
+    assert cache.get("a", 2, "query") is None
+
+    # the least recently used response is evicted
+    cache.put("c", 1, "query", {"history": [2]}, 30)
+
+    assert cache.get("b", 1, "query") is None
+    assert cache.nbytes("a") == 10
+
+    # a newer generation replaces the responses of older ones
+    cache.put("a", 2, "other", {"history": [3]}, 40)
+
+    assert cache.get("a", 1, "query") is None
+    assert cache.nbytes("a") == 40
+
+    cache.discard("a")
+
+    assert len(cache) == 1
+    assert cache.clear() == 30
+    assert len(cache) == 0
+
+
+def test_get_response_cache(hass: HomeAssistant):
+    assert get_response_cache(hass) is get_response_cache(hass)
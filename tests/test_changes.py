@@ -0,0 +1,43 @@
+"""Test the log of changed hours."""
+
+from custom_components.watersmart.changes import ChangeLog
+from custom_components.watersmart.history import HistoryMerge
+
+from .conftest import usage_record
+
+
+def test_changes_since():
+    log = ChangeLog()
+    log.append(HistoryMerge(new=[usage_record(0), usage_record(3600)]))
+    log.append(HistoryMerge())
+
+    assert log.version == 1
+
+    log.append(
+        HistoryMerge(
+            new=[usage_record(7200)],
+            revised=[usage_record(0, 2.0)],
+            replaced=[usage_record(0)],
+        )
+    )
+
+    assert log.changes_since(0) == [
+        usage_record(0, 2.0),
+        usage_record(3600),
+        usage_record(7200),
+    ]
+    assert log.changes_since(1) == [usage_record(0, 2.0), usage_record(7200)]
+    assert log.changes_since(2) == []
+    assert log.changes_since(3) is None
+    assert log.changes_since(-1) is None
+
+
+def test_changes_since_dropped_versions():
+    log = ChangeLog(maxlen=3)
+    log.append(HistoryMerge(new=[usage_record(0), usage_record(3600)]))
+    log.append(HistoryMerge(new=[usage_record(7200), usage_record(10800)]))
+
+    # the first version was partly dropped
+    assert log.oldest_version == 1
+    assert log.changes_since(0) is None
+    assert log.changes_since(1) == [usage_record(7200), usage_record(10800)]
@@ -1,7 +1,8 @@
 """Test client."""
 
-from unittest.mock import AsyncMock, call
+from unittest.mock import ANY, AsyncMock, call
 
+import aiohttp
 from homeassistant.core import HomeAssistant
 import pytest
 
@@ -11,6 +12,9 @@ from custom_components.watersmart.client import (
     ScrapeError,
     WaterSmartClient,
 )
+from custom_components.watersmart.ratelimit import HostRateLimiter, TokenBucket
+
+from .conftest import MockAiohttpResponse
 
 
 async def test_login_success(hass: HomeAssistant, mock_aiohttp_session, fixture_loader):
@@ -35,6 +39,7 @@ async def test_login_success(hass: HomeAssistant, mock_aiohttp_session, fixture_
                     "email": "test@home-assistant.io",
                     "password": "Passw0rd",
                 },
+                timeout=ANY,
             ),
         ]
     )
@@ -68,6 +73,7 @@ async def test_login_success_with_refreshtoken(
                     "email": "test@home-assistant.io",
                     "password": "Passw0rd",
                 },
+                timeout=ANY,
             ),
         ]
     )
@@ -81,6 +87,7 @@ async def test_login_success_with_refreshtoken(
                     "email": "test@home-assistant.io",
                     "password": "Passw0rd",
                 },
+                timeout=ANY,
             ),
         ]
     )
@@ -188,7 +195,11 @@ async def test_async_get_async_get_hourly_data(
 
     mock_aiohttp_session.get.assert_has_calls(
         [
-            call("https://.watersmart.com/index.php/rest/v1/Chart/RealTimeChart"),
+            call(
+                "https://.watersmart.com/index.php/rest/v1/Chart/RealTimeChart",
+                headers={},
+                timeout=ANY,
+            ),
         ]
     )
 
@@ -209,3 +220,104 @@ async def test_async_get_async_get_hourly_data(
         },
         {"read_datetime": 1718834400, "gallons": 0, "flags": None, "leak_gallons": 0},
     ]
+
+
+async def test_async_get_hourly_data_not_modified(
+    hass: HomeAssistant,
+    mock_aiohttp_session,
+    fixture_loader,
+):
+    mock_aiohttp_session.post.return_value.text.return_value = (
+        fixture_loader.login_success_html
+    )
+    response = mock_aiohttp_session.get.return_value
+    response.text.return_value = fixture_loader.realtime_api_response_json
+    response.headers = {
+        "ETag": '"abc"',
+        "Last-Modified": "Wed, 19 Jun 2024 22:00:00 GMT",
+    }
+
+    client = WaterSmartClient(hostname="", username="", password="")
+    hourly = await client.async_get_hourly_data()
+
+    not_modified = MockAiohttpResponse(status=304)
+    mock_aiohttp_session.get.return_value = not_modified
+
+    assert await client.async_get_hourly_data() is hourly
+
+    mock_aiohttp_session.get.assert_called_with(
+        "https://.watersmart.com/index.php/rest/v1/Chart/RealTimeChart",
+        headers={
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Wed, 19 Jun 2024 22:00:00 GMT",
+        },
+        timeout=ANY,
+    )
+    not_modified.text.assert_not_called()
+
+
+async def test_async_get_hourly_data_unchanged_body(
+    hass: HomeAssistant,
+    mock_aiohttp_session,
+    fixture_loader,
+):
+    mock_aiohttp_session.post.return_value.text.return_value = (
+        fixture_loader.login_success_html
+    )
+    mock_aiohttp_session.get.return_value.text.return_value = (
+        fixture_loader.realtime_api_response_json
+    )
+
+    client = WaterSmartClient(hostname="", username="", password="")
+    hourly = await client.async_get_hourly_data()
+
+    assert await client.async_get_hourly_data() is hourly
+
+    mock_aiohttp_session.get.return_value.text.return_value = (
+        fixture_loader.realtime_api_response_json.replace("7.48", "8.5", 1)
+    )
+    changed = await client.async_get_hourly_data()
+
+    assert changed is not hourly
+    assert changed[0]["gallons"] == 8.5
+
+
+async def test_async_get_hourly_data_throttled(
+    hass: HomeAssistant, mock_aiohttp_session, fixture_loader, monkeypatch
+):
+    monkeypatch.setattr("custom_components.watersmart.resilience.RETRY_BASE_DELAY", 0)
+    mock_aiohttp_session.post.return_value.text.return_value = (
+        fixture_loader.login_success_html
+    )
+    throttled = MockAiohttpResponse(status=429)
+    throttled.headers = {"Retry-After": "0"}
+    response = MockAiohttpResponse()
+    response.text.return_value = fixture_loader.realtime_api_response_json
+    mock_aiohttp_session.get.side_effect = [throttled, response]
+
+    rate_limiter = HostRateLimiter()
+    rate_limiter.data = TokenBucket(rate=100, burst=1)
+    client = WaterSmartClient(
+        hostname="", username="", password="", rate_limiter=rate_limiter
+    )
+
+    assert len(await client.async_get_hourly_data()) == 4
+    assert mock_aiohttp_session.get.call_count == 2
+    assert rate_limiter.data.stats.throttled == 1
+    assert rate_limiter.data.rate == 60
+
+
+async def test_login_throttled(
+    hass: HomeAssistant, mock_aiohttp_session, fixture_loader
+):
+    mock_aiohttp_session.post.return_value = MockAiohttpResponse(status=429)
+
+    rate_limiter = HostRateLimiter()
+    client = WaterSmartClient(
+        hostname="", username="", password="", rate_limiter=rate_limiter
+    )
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        await client.async_get_account_number()
+
+    assert rate_limiter.login.stats.throttled == 1
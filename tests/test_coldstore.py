@@ -0,0 +1,108 @@
+"""Test memory mapped column files."""
+
+from concurrent.futures import ThreadPoolExecutor
+import math
+from pathlib import Path
+from threading import Barrier
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.watersmart.coldstore import (
+    MAGIC,
+    ColumnFile,
+    TableLayout,
+    encode,
+)
+
+LAYOUTS: tuple[TableLayout, ...] = (
+    (("start", "q"), ("gallons", "d")),
+    (("start", "q"), ("hours", "q")),
+)
+TABLES: list[dict[str, list[int | float]]] = [
+    {"start": [0, 3600, 7200], "gallons": [1.5, math.nan, 2.0]},
+    {"start": [86400], "hours": [24]},
+]
+
+
+def test_write_and_open(tmp_path: Path):
+    path = tmp_path / "history" / "entry.cold"
+    written = ColumnFile.write(path, LAYOUTS, TABLES)
+    opened = ColumnFile.open(path, LAYOUTS)
+
+    for store in (written, opened):
+        hourly, daily = store.tables
+
+        assert len(hourly) == 3
+        assert hourly.index(3600, 0) == 1
+        assert hourly.index(None, 0) == 0
+        assert hourly.rows(1, 3)[1] == (7200, 2.0)
+        assert daily.rows(0, 1) == [(86400, 24)]
+        assert store.nbytes == path.stat().st_size
+
+        store.close()
+
+    assert list(path.parent.iterdir()) == [path]
+
+
+def test_write_files_for_entry_at_once(tmp_path: Path):
+    paths = [tmp_path / "entry.cold", tmp_path / "entry.hours"]
+    barrier = Barrier(len(paths))
+    write_bytes = Path.write_bytes
+
+    def _write_bytes(self: Path, data: bytes) -> int:
+        written = write_bytes(self, data)
+        # both temporary files are written before either replaces its file
+        barrier.wait(timeout=5)
+        return written
+
+    with (
+        patch.object(Path, "write_bytes", _write_bytes),
+        ThreadPoolExecutor(len(paths)) as executor,
+    ):
+        stores = list(
+            executor.map(lambda path: ColumnFile.write(path, LAYOUTS, TABLES), paths)
+        )
+
+    for path, store in zip(paths, stores, strict=True):
+        opened = ColumnFile.open(path, LAYOUTS)
+
+        assert opened.tables[0].rows(0, 3)[0] == (0, 1.5)
+        assert opened.nbytes == store.nbytes
+
+        opened.close()
+        store.close()
+
+    assert sorted(tmp_path.iterdir()) == sorted(paths)
+
+
+def test_in_memory():
+    store = ColumnFile.write(None, LAYOUTS, TABLES)
+
+    assert store.tables[1].rows(0, 1) == [(86400, 24)]
+    assert store.nbytes == len(encode(LAYOUTS, TABLES))
+
+    store.close()
+
+
+@pytest.mark.parametrize(
+    "contents",
+    [
+        None,
+        b"",
+        b"short",
+        encode(LAYOUTS, TABLES)[:-1],
+        encode(LAYOUTS, TABLES).replace(MAGIC, b"OTHERMAG"),
+    ],
+)
+def test_open_missing_or_invalid(tmp_path: Path, contents: bytes | None):
+    path = tmp_path / "entry.cold"
+
+    if contents is not None:
+        path.write_bytes(contents)
+
+    store = ColumnFile.open(path, LAYOUTS)
+
+    assert [len(table) for table in store.tables] == [0, 0]
+
+    store.close()
@@ -0,0 +1,89 @@
+"""Test bulk history computations."""
+
+import random
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.watersmart import columns
+from custom_components.watersmart.columns import (
+    VECTORIZE_MIN_LENGTH,
+    daily_totals,
+    prefix_sums,
+)
+
+np = pytest.importorskip("numpy")
+
+
+def _gallons(count, seed=0):
+    rng = random.Random(seed)  # noqa: S311
+
+    return [
+        None if rng.random() < 0.1 else round(rng.uniform(0, 20), 4)
+        for _ in range(count)
+    ]
+
+
+def _timestamps(count, seed=0):
+    rng = random.Random(seed)  # noqa: S311
+    timestamp = 1718830800
+    result = []
+
+    for _ in range(count):
+        result.append(timestamp)
+        # occasional gaps, including whole missing days
+        timestamp += 3600 * (rng.choice([1] * 20 + [2, 30]))
+
+    return result
+
+
+@pytest.mark.parametrize("count", [1, 2, 24, 1000])
+@pytest.mark.parametrize("initial", [0, 12.5])
+def test_prefix_sums_parity(count, initial):
+    gallons = _gallons(count)
+
+    expected = columns._prefix_sums_python(gallons, initial)
+
+    assert columns._prefix_sums_numpy(np, gallons, initial) == expected
+    assert prefix_sums(gallons, initial) == expected
+    assert expected[-1] == pytest.approx(initial + sum(g or 0 for g in gallons))
+
+
+@pytest.mark.parametrize("count", [1, 2, 24, 25, 1000])
+def test_daily_totals_parity(count):
+    timestamps = _timestamps(count)
+    cumulative = columns._prefix_sums_python(_gallons(count), 0)
+    cumulative.insert(0, 0)
+
+    expected = columns._daily_totals_python(timestamps, cumulative)
+
+    assert columns._daily_totals_numpy(np, timestamps, cumulative) == expected
+    assert daily_totals(timestamps, cumulative) == expected
+
+
+def test_daily_totals():
+    timestamps = [82800, 86400, 90000, 3 * 86400]
+    cumulative = [10, 11, 13, 16, 20]
+
+    assert daily_totals(timestamps, cumulative) == [
+        (0, 1),
+        (86400, 5),
+        (3 * 86400, 4),
+    ]
+
+
+def test_daily_totals_empty():
+    assert daily_totals([], [0]) == []
+
+
+@pytest.mark.parametrize(
+    ("count", "vectorized"),
+    [(VECTORIZE_MIN_LENGTH - 1, False), (VECTORIZE_MIN_LENGTH, True)],
+)
+def test_vectorized_by_length(count, vectorized):
+    with patch.object(
+        columns, "_prefix_sums_numpy", wraps=columns._prefix_sums_numpy
+    ) as mock_numpy:
+        prefix_sums(_gallons(count), 0)
+
+    assert mock_numpy.called is vectorized
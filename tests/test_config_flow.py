@@ -1,13 +1,17 @@
 """Test the Simple Integration config flow."""
 
-from unittest.mock import patch
+from typing import cast
+from unittest.mock import MagicMock, patch
 
 from homeassistant import config_entries, setup
+from homeassistant.config_entries import ConfigEntryState
 from homeassistant.core import HomeAssistant
 import pytest
 
+import custom_components.watersmart
 from custom_components.watersmart.client import AuthenticationError
 from custom_components.watersmart.const import DOMAIN
+from custom_components.watersmart.handoff import DATA_HANDOFF
 
 
 async def test_successful_flow(hass: HomeAssistant, mock_watersmart_client):
@@ -102,3 +106,192 @@ async def test_error(
     assert configured_result["errors"] == expected_errors
     await hass.async_block_till_done()
     assert len(mock_setup_entry.mock_calls) == 0
+
+
+@pytest.mark.usefixtures("init_integration")
+async def test_options_flow(
+    hass: HomeAssistant, mock_config_entry, mock_watersmart_client
+):
+    """Test options update & reload the entry."""
+
+    result = await hass.config_entries.options.async_init(mock_config_entry.entry_id)
+    assert result["type"] == "form"
+    assert result["step_id"] == "init"
+
+    configured_result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {"billing_day": 15}
+    )
+    await hass.async_block_till_done()
+
+    assert configured_result["type"] == "create_entry"
+    assert mock_config_entry.options == {
+        "billing_day": 15,
+        "fixed_charge": 0.0,
+        "hourly_retention_days": 90,
+        "daily_retention_months": 24,
+    }
+    assert mock_config_entry.runtime_data.coordinator.billing_day == 15
+    assert mock_watersmart_client.async_get_hourly_data.call_count == 2
+
+
+@pytest.mark.usefixtures("init_integration")
+async def test_options_flow_invalid_rate_tiers(hass: HomeAssistant, mock_config_entry):
+    """Test options validate rate tiers."""
+
+    result = await hass.config_entries.options.async_init(mock_config_entry.entry_id)
+
+    configured_result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {"billing_day": 15, "rate_tiers": "1:0.01"}
+    )
+
+    assert configured_result["type"] == "form"
+    assert configured_result["errors"] == {"rate_tiers": "invalid_rate_tiers"}
+
+    configured_result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {"billing_day": 15, "rate_tiers": "0.01, 100:0.02", "fixed_charge": 5},
+    )
+    await hass.async_block_till_done()
+
+    assert configured_result["type"] == "create_entry"
+    assert mock_config_entry.runtime_data.coordinator.costs is not None
+
+
+async def test_flow_hands_client_to_entry(
+    hass: HomeAssistant, mock_watersmart_client, mock_sensor_name
+):
+    """Test the entry reuses the client that logged in during the flow."""
+
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    configured_result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        {
+            "host": "test",
+            "username": "test@home-assistant.io",
+            "password": "Passw0rd",
+        },
+    )
+    await hass.async_block_till_done()
+
+    entry = configured_result["result"]
+    client_class = cast("MagicMock", custom_components.watersmart.WaterSmartClient)
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert entry.runtime_data.coordinator.watersmart is mock_watersmart_client
+    assert client_class.call_count == 1
+    assert hass.data[DATA_HANDOFF] == {}
+
+
+@pytest.mark.usefixtures("init_integration")
+async def test_options_flow_unchanged(
+    hass: HomeAssistant, mock_config_entry, mock_watersmart_client
+):
+    """Test an update that keeps the options does not reload the entry."""
+
+    hass.config_entries.async_update_entry(mock_config_entry, title="renamed")
+    await hass.async_block_till_done()
+
+    assert mock_watersmart_client.async_get_hourly_data.call_count == 1
+
+
+@pytest.mark.usefixtures("init_integration")
+async def test_reauth_flow(
+    hass: HomeAssistant, mock_config_entry, mock_watersmart_client
+):
+    """Test re-authenticating updates the password & reloads the entry."""
+
+    result = await mock_config_entry.start_reauth_flow(hass)
+    assert result["type"] == "form"
+    assert result["step_id"] == "reauth_confirm"
+
+    mock_watersmart_client.async_get_account_number.side_effect = AuthenticationError(
+        ["invalid credentials"]
+    )
+    configured_result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"password": "wrong"}
+    )
+
+    assert configured_result["type"] == "form"
+    assert configured_result["errors"] == {"base": "invalid_auth"}
+
+    mock_watersmart_client.async_get_account_number.side_effect = None
+    configured_result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"password": "N3wPassw0rd"}
+    )
+    await hass.async_block_till_done()
+
+    assert configured_result["type"] == "abort"
+    assert configured_result["reason"] == "reauth_successful"
+    assert mock_config_entry.data["password"] == "N3wPassw0rd"  # noqa: S105
+    assert mock_config_entry.state is ConfigEntryState.LOADED
+
+
+@pytest.mark.usefixtures("init_integration")
+@pytest.mark.parametrize(
+    ("source", "user_input"),
+    [
+        ("reauth", {"password": "N3wPassw0rd"}),
+        (
+            "reconfigure",
+            {"host": "other", "username": "test@home-assistant.io", "password": "x"},
+        ),
+    ],
+)
+async def test_flow_reloads_entry_once(
+    hass: HomeAssistant, mock_config_entry, source: str, user_input: dict[str, str]
+):
+    """Test an entry updated by a flow is set up once with the flow's client."""
+
+    client_class = cast("MagicMock", custom_components.watersmart.WaterSmartClient)
+    client_class.reset_mock()
+
+    if source == "reauth":
+        result = await mock_config_entry.start_reauth_flow(hass)
+    else:
+        result = await mock_config_entry.start_reconfigure_flow(hass)
+
+    with patch(
+        "custom_components.watersmart.async_setup_entry",
+        wraps=custom_components.watersmart.async_setup_entry,
+    ) as mock_setup_entry:
+        await hass.config_entries.flow.async_configure(result["flow_id"], user_input)
+        await hass.async_block_till_done()
+
+    assert mock_config_entry.state is ConfigEntryState.LOADED
+    assert mock_setup_entry.call_count == 1
+    # only the flow logged in
+    assert client_class.call_count == 1
+
+
+@pytest.mark.usefixtures("init_integration")
+async def test_reconfigure_flow(
+    hass: HomeAssistant, mock_config_entry, mock_watersmart_client
+):
+    """Test reconfiguring updates the entry & reloads it."""
+
+    result = await mock_config_entry.start_reconfigure_flow(hass)
+    assert result["type"] == "form"
+    assert result["step_id"] == "reconfigure"
+
+    mock_watersmart_client.async_get_account_number.side_effect = TimeoutError
+    configured_result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        {"host": "other", "username": "test@home-assistant.io", "password": "x"},
+    )
+
+    assert configured_result["errors"] == {"base": "cannot_connect"}
+
+    mock_watersmart_client.async_get_account_number.side_effect = None
+    configured_result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        {"host": "other", "username": "test@home-assistant.io", "password": "x"},
+    )
+    await hass.async_block_till_done()
+
+    assert configured_result["type"] == "abort"
+    assert configured_result["reason"] == "reconfigure_successful"
+    assert mock_config_entry.title == "other (test@home-assistant.io)"
+    assert mock_config_entry.data["host"] == "other"
+    assert mock_config_entry.state is ConfigEntryState.LOADED
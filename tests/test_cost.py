@@ -0,0 +1,120 @@
+"""Test cost estimation."""
+
+import pytest
+
+from custom_components.watersmart.cost import (
+    CostTracker,
+    CycleTotal,
+    InvalidRateScheduleError,
+    RateSchedule,
+    RateTier,
+    parse_rate_tiers,
+)
+from custom_components.watersmart.history import DAY_SECONDS, HourlyHistory
+
+from .conftest import usage_record
+
+# 2024-06-01T00:00:00 as a WaterSmart timestamp
+JUNE_1 = 1717200000
+
+
+def test_parse_rate_tiers():
+    assert parse_rate_tiers("0.01") == (RateTier(0, 0.01),)
+    assert parse_rate_tiers("0.01, 100:0.02,250.5:0.03") == (
+        RateTier(0, 0.01),
+        RateTier(100, 0.02),
+        RateTier(250.5, 0.03),
+    )
+
+
+@pytest.mark.parametrize(
+    "value",
+    ["", "abc", "10:0.01", "0.01, 0.02", "0.01, 100:0.02, 50:0.03", "0.01, 100:x"],
+)
+def test_parse_rate_tiers_invalid(value):
+    with pytest.raises(InvalidRateScheduleError):
+        parse_rate_tiers(value)
+
+
+def test_add_usage_across_tiers():
+    schedule = RateSchedule(parse_rate_tiers("1, 10:2, 20:3"))
+    cycle = CycleTotal(0)
+
+    assert schedule.add_usage(cycle, 5) == 5
+    assert schedule.add_usage(cycle, 10) == 5 + 10
+    assert cycle.tier_index == 1
+    assert schedule.add_usage(cycle, 20) == 10 + 45
+    assert cycle.tier_index == 2
+    assert cycle.gallons == 35
+    assert cycle.cost == 75
+    assert schedule.add_usage(cycle, 0) == 0
+
+
+def test_tracker_days_and_cycles():
+    history = HourlyHistory()
+    tracker = CostTracker(RateSchedule(parse_rate_tiers("1, 30:2"), 5), 2)
+    records = [
+        usage_record(JUNE_1 + hour * 3600, gallons)
+        for hour, gallons in ((22, 10), (23, None), (24, 15), (25, 10), (48, 5))
+    ]
+
+    tracker.update(history, history.merge(records))
+
+    assert [cycle.start for cycle in tracker.cycles] == [
+        JUNE_1 - 30 * DAY_SECONDS,
+        JUNE_1 + DAY_SECONDS,
+    ]
+    assert [(day.gallons, day.cost, day.hours) for day in tracker.days] == [
+        (10, 10, 2),
+        (25, 25, 2),
+        (5, 5, 1),
+    ]
+    assert [day.start for day in tracker.days_between(JUNE_1 + 1, None)] == [
+        JUNE_1 + DAY_SECONDS,
+        JUNE_1 + 2 * DAY_SECONDS,
+    ]
+    assert tracker.days_between(None, JUNE_1 + 1) == tracker.days[:1]
+
+
+def test_tracker_replays_revised_cycle():
+    history = HourlyHistory()
+    tracker = CostTracker(RateSchedule(parse_rate_tiers("1, 30:2")), 1)
+    records = [usage_record(JUNE_1 + hour * 3600, 10) for hour in range(4)]
+
+    tracker.update(history, history.merge(records[:3]))
+
+    assert tracker.cycles[-1].cost == 30
+
+    tracker.update(history, history.merge(records))
+
+    assert tracker.cycles[-1].cost == 50
+
+    records[0] = usage_record(JUNE_1, 20)
+    tracker.update(history, history.merge(records))
+
+    assert len(tracker.cycles) == 1
+    assert len(tracker.days) == 1
+    assert tracker.cycles[-1].gallons == 50
+    assert tracker.cycles[-1].cost == 30 + 40
+
+
+def test_tracker_replays_cycle_from_spilled_days():
+    history = HourlyHistory()
+    tracker = CostTracker(RateSchedule(parse_rate_tiers("1, 30:2")), 1)
+    records = [usage_record(JUNE_1 + hour * 3600, 1) for hour in range(3 * 24)]
+
+    tracker.update(history, history.merge(records))
+    history.detach_before(JUNE_1 + DAY_SECONDS)
+
+    records[-1] = usage_record(records[-1]["read_datetime"], 2)
+    tracker.update(history, history.merge(records))
+
+    assert [(day.start, day.gallons, day.cost) for day in tracker.days] == [
+        (JUNE_1, 24, 24),
+        (JUNE_1 + DAY_SECONDS, 24, 6 + 36),
+        (JUNE_1 + 2 * DAY_SECONDS, 25, 50),
+    ]
+    assert len(tracker.cycles) == 1
+    assert tracker.cycles[-1].gallons == 73
+    assert tracker.cycles[-1].cost == 24 + 42 + 50
+    assert tracker.cycles[-1].tier_index == 1
@@ -0,0 +1,118 @@
+"""Test client against the fake WaterSmart server."""
+
+from collections.abc import AsyncGenerator
+
+import aiohttp
+from aiohttp.test_utils import TestServer
+import pytest
+
+from custom_components.watersmart.client import AuthenticationError, WaterSmartClient
+from custom_components.watersmart.resilience import RETRY_ATTEMPTS, CircuitBreaker
+
+from .fake_server import FakeServerConfig, FakeWaterSmartServer
+
+
+@pytest.fixture
+def fake_server_config() -> FakeServerConfig:
+    return FakeServerConfig(series_hours=48)
+
+
+@pytest.fixture
+def fake_server(fake_server_config) -> FakeWaterSmartServer:
+    return FakeWaterSmartServer(fake_server_config)
+
+
+@pytest.fixture
+async def fake_server_url(fake_server, socket_enabled) -> AsyncGenerator[str]:
+    async with TestServer(fake_server.create_app()) as server:
+        yield str(server.make_url("")).rstrip("/")
+
+
+@pytest.fixture
+async def session() -> AsyncGenerator[aiohttp.ClientSession]:
+    # cookies for IP address hosts are only stored by an unsafe jar
+    async with aiohttp.ClientSession(
+        cookie_jar=aiohttp.CookieJar(unsafe=True)
+    ) as session:
+        yield session
+
+
+def _client(session, fake_server_url, password="Passw0rd"):  # noqa: S107
+    return WaterSmartClient(
+        hostname="test",
+        username="test@home-assistant.io",
+        password=password,
+        session=session,
+        base_url=fake_server_url,
+        circuit_breaker=CircuitBreaker(),
+    )
+
+
+async def test_get_hourly_data(fake_server, fake_server_url, session):
+    client = _client(session, fake_server_url)
+
+    assert await client.async_get_account_number() == "1234567-8900"
+
+    hourly = await client.async_get_hourly_data()
+
+    assert len(hourly) == 48
+    assert hourly[1]["read_datetime"] - hourly[0]["read_datetime"] == 3600
+    assert fake_server.stats.logins == 1
+    assert fake_server.stats.data_requests == 1
+
+
+@pytest.mark.parametrize(
+    "fake_server_config", [FakeServerConfig(refresh_token_step=True)]
+)
+async def test_login_refresh_token_step(fake_server, fake_server_url, session):
+    client = _client(session, fake_server_url)
+
+    assert await client.async_get_account_number() == "1234567-8900"
+    assert fake_server.stats.logins == 1
+
+
+async def test_login_error(fake_server, fake_server_url, session):
+    client = _client(session, fake_server_url, password="wrong")  # noqa: S106
+
+    with pytest.raises(AuthenticationError):
+        await client.async_get_account_number()
+
+    assert fake_server.stats.failed_logins == 1
+
+
+@pytest.mark.parametrize(
+    "fake_server_config",
+    [
+        FakeServerConfig(series_hours=48),
+        FakeServerConfig(series_hours=48, conditional_requests=True),
+    ],
+)
+async def test_get_hourly_data_unchanged(fake_server, fake_server_url, session):
+    client = _client(session, fake_server_url)
+    hourly = await client.async_get_hourly_data()
+
+    assert await client.async_get_hourly_data() is hourly
+    assert fake_server.stats.not_modified == (
+        1 if fake_server.config.conditional_requests else 0
+    )
+
+
+@pytest.mark.parametrize("fake_server_config", [FakeServerConfig(failure_rate=1)])
+async def test_injected_failure(fake_server, fake_server_url, session, monkeypatch):
+    monkeypatch.setattr("custom_components.watersmart.resilience.RETRY_BASE_DELAY", 0)
+    client = _client(session, fake_server_url)
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        await client.async_get_hourly_data()
+
+    assert fake_server.stats.injected_failures == RETRY_ATTEMPTS
+    assert client._circuit_breaker.failures == 1
+
+
+async def test_unauthenticated_request(fake_server, fake_server_url, session):
+    response = await session.get(
+        f"{fake_server_url}/index.php/rest/v1/Chart/RealTimeChart"
+    )
+
+    assert "loginForm" in await response.text()
+    assert fake_server.stats.unauthenticated_requests == 1
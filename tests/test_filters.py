@@ -0,0 +1,43 @@
+"""Test filters for hourly history queries."""
+
+import datetime as dt
+
+import pytest
+
+from custom_components.watersmart.filters import RecordFilter
+
+from .conftest import usage_record
+
+# a Wednesday
+JUN_19 = int(dt.datetime(2024, 6, 19, tzinfo=dt.UTC).timestamp())
+
+
+@pytest.mark.parametrize(
+    ("where", "record", "expected"),
+    [
+        (RecordFilter(min_gallons=1.0), usage_record(JUN_19), True),
+        (RecordFilter(min_gallons=1.5), usage_record(JUN_19), False),
+        (RecordFilter(max_gallons=1.0), usage_record(JUN_19), True),
+        (RecordFilter(max_gallons=0.5), usage_record(JUN_19), False),
+        (RecordFilter(min_gallons=0), usage_record(JUN_19, gallons=None), False),
+        (RecordFilter(leak_only=True), usage_record(JUN_19, leak_gallons=2), True),
+        (RecordFilter(leak_only=True), usage_record(JUN_19, leak_gallons=None), False),
+        (RecordFilter(null_only=True), usage_record(JUN_19, gallons=None), True),
+        (RecordFilter(null_only=True), usage_record(JUN_19), False),
+        (RecordFilter(hours=frozenset({0, 1})), usage_record(JUN_19 + 3600), True),
+        (RecordFilter(hours=frozenset({0})), usage_record(JUN_19 + 3600), False),
+        (RecordFilter(weekdays=frozenset({2})), usage_record(JUN_19), True),
+        (RecordFilter(weekdays=frozenset({3})), usage_record(JUN_19), False),
+        (RecordFilter(), usage_record(JUN_19, gallons=None), True),
+    ],
+)
+def test_record_filter(where: RecordFilter, record, expected: bool):
+    assert where(record) is expected
+
+
+def test_record_filter_is_empty():
+    assert not RecordFilter()
+    assert RecordFilter(leak_only=True)
+    assert hash(RecordFilter(hours=frozenset({1}))) == hash(
+        RecordFilter(hours=frozenset({1}))
+    )
@@ -0,0 +1,49 @@
+"""Test handing clients from config flows to entry setup."""
+
+from unittest.mock import Mock, patch
+
+from homeassistant.core import HomeAssistant
+import pytest
+
+from custom_components.watersmart.handoff import (
+    DATA_HANDOFF,
+    HANDOFF_TIMEOUT,
+    async_offer_client,
+    async_take_client,
+)
+
+
+@pytest.fixture
+def mock_hass() -> HomeAssistant:
+    # handoffs only need the shared data, not a running instance
+    return Mock(spec=HomeAssistant, data={})
+
+
+def test_take_client(mock_hass: HomeAssistant):
+    client = Mock()
+    async_offer_client(mock_hass, client, "test", "user", "Passw0rd")
+
+    assert async_take_client(mock_hass, "test", "other", "Passw0rd") is None
+    assert async_take_client(mock_hass, "test", "user", "Passw0rd") is client
+    assert async_take_client(mock_hass, "test", "user", "Passw0rd") is None
+
+
+def test_take_client_with_other_password(mock_hass: HomeAssistant):
+    async_offer_client(mock_hass, Mock(), "test", "user", "Passw0rd")
+
+    assert async_take_client(mock_hass, "test", "user", "N3wPassw0rd") is None
+
+
+def test_take_client_expired(mock_hass: HomeAssistant):
+    with patch("custom_components.watersmart.handoff.time.monotonic") as monotonic:
+        monotonic.return_value = 0
+        async_offer_client(mock_hass, Mock(), "test", "user", "Passw0rd")
+        async_offer_client(mock_hass, Mock(), "test", "other", "Passw0rd")
+        monotonic.return_value = HANDOFF_TIMEOUT
+
+        assert async_take_client(mock_hass, "test", "user", "Passw0rd") is None
+
+        # expired clients are dropped when another is offered
+        async_offer_client(mock_hass, Mock(), "other", "user", "Passw0rd")
+
+    assert list(mock_hass.data[DATA_HANDOFF]) == [("other", "user")]
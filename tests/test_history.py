@@ -0,0 +1,95 @@
+"""Test hourly history merging."""
+
+import pytest
+
+from custom_components.watersmart.history import HourlyHistory, weekday
+
+from .conftest import usage_record
+
+
+def test_merge_appends_new_records():
+    history = HourlyHistory()
+
+    merge = history.merge([usage_record(0), usage_record(3600)])
+
+    assert merge.new == [usage_record(0), usage_record(3600)]
+    assert merge.revised == []
+    assert merge.changed
+
+    merge = history.merge([usage_record(3600), usage_record(7200)])
+
+    assert merge.new == [usage_record(7200)]
+    assert merge.revised == []
+    assert history.timestamps == [0, 3600, 7200]
+
+
+def test_merge_revises_existing_records():
+    history = HourlyHistory()
+    history.merge(
+        [usage_record(0), usage_record(3600, gallons=None), usage_record(10800)]
+    )
+
+    merge = history.merge([usage_record(3600, gallons=2.0), usage_record(7200)])
+
+    assert merge.new == []
+    assert merge.revised == [usage_record(3600, gallons=2.0), usage_record(7200)]
+    assert merge.replaced == [usage_record(3600, gallons=None)]
+    assert history.timestamps == [0, 3600, 7200, 10800]
+    assert history.records[1]["gallons"] == 2.0
+
+
+def test_merge_unchanged():
+    history = HourlyHistory()
+    history.merge([usage_record(0), usage_record(3600)])
+
+    merge = history.merge([usage_record(0), usage_record(3600)])
+
+    assert not merge.changed
+
+
+def test_gallons_between():
+    history = HourlyHistory()
+    history.merge(
+        [usage_record(0, 1.5), usage_record(3600, None), usage_record(7200, 2.25)]
+    )
+
+    assert history.cumulative == [0, 1.5, 1.5, 3.75]
+    assert history.gallons_between(0, 10800) == 3.75
+    assert history.gallons_between(3600, 7200) == 0
+    assert history.gallons_between(3600, 7201) == 2.25
+    assert history.count_between(3600, 10800) == 2
+
+    history.merge([usage_record(3600, 0.1), usage_record(10800, 0.2)])
+
+    assert history.cumulative == [0, 1.5, 1.6, 3.85, 4.05]
+    assert history.gallons_between(3600, 10801) == 2.55
+
+
+def test_hour_of_day_totals():
+    history = HourlyHistory()
+    history.merge(
+        [usage_record(0, 1.0), usage_record(3600, None), usage_record(86400, 3.0)]
+    )
+
+    assert history.hour_of_day_gallons[0] == 4.0
+    assert history.hour_of_day_counts[0] == 2
+    assert history.hour_of_day_counts[1] == 0
+
+    history.merge([usage_record(3600, 2.0), usage_record(86400, 1.0)])
+
+    assert history.hour_of_day_gallons[:2] == [2.0, 2.0]
+    assert history.hour_of_day_counts[:2] == [2, 1]
+
+
+@pytest.mark.parametrize(
+    ("timestamp", "expected"),
+    [
+        (0, 3),
+        (86399, 3),
+        (4 * 86400, 0),
+        # 2024-06-19T21:00 wall-clock, a Wednesday
+        (1718830800, 2),
+    ],
+)
+def test_weekday(timestamp, expected):
+    assert weekday(timestamp) == expected
@@ -0,0 +1,48 @@
+"""Test integration imports."""
+
+import json
+from pathlib import Path
+import subprocess  # noqa: S404
+import sys
+
+# Modules Home Assistant has already loaded by the time it imports the
+# integration.
+PRELOADED = (
+    "aiohttp",
+    "homeassistant.config_entries",
+    "homeassistant.core",
+    "homeassistant.helpers.aiohttp_client",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.entity_platform",
+    "homeassistant.helpers.update_coordinator",
+)
+
+# Modules that should only be loaded on first use.
+LAZY = (
+    "bs4",
+    "numpy",
+    "custom_components.watersmart.cost",
+)
+
+SCRIPT = f"""
+import json, sys
+import {", ".join(PRELOADED)}
+import custom_components.watersmart
+# loaded with the integration to set up entries & download diagnostics
+import custom_components.watersmart.config_flow
+import custom_components.watersmart.diagnostics
+print(json.dumps([name for name in {LAZY!r} if name in sys.modules]))
+"""
+
+
+def test_lazy_imports():
+    # a fresh interpreter, as the test session has loaded everything already
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", SCRIPT],
+        capture_output=True,
+        check=True,
+        cwd=Path(__file__).parent.parent,
+        text=True,
+    )
+
+    assert json.loads(result.stdout) == []
@@ -1,11 +1,236 @@
 """Test component setup."""
 
-from homeassistant.core import HomeAssistant
+import asyncio
+import logging
+from typing import cast
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.core import CoreState, HomeAssistant
+from homeassistant.helpers import issue_registry as ir
 from homeassistant.setup import async_setup_component
+from homeassistant.util.dt import utcnow
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+import custom_components.watersmart
+from custom_components.watersmart.client import AuthenticationError
+from custom_components.watersmart.const import (
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    STARTUP_REFRESH_STAGGER,
+)
+from custom_components.watersmart.ratelimit import get_rate_limiter
+from custom_components.watersmart.resilience import get_circuit_breaker
 
-from custom_components.watersmart.const import DOMAIN
+TEST_ENTITY_ID = "sensor.watersmart_test_gallons_for_most_recent_hour"
+OTHER_ENTITY_ID = "sensor.watersmart_other_gallons_for_most_recent_hour"
 
 
 async def test_async_setup(hass: HomeAssistant):
     """Test the component gets setup."""
     assert await async_setup_component(hass, DOMAIN, {}) is True
+
+
+@pytest.mark.usefixtures("init_integration")
+def test_client_shares_host_limits(hass: HomeAssistant):
+    """Test the client gets the rate limiter & breaker shared by its host."""
+    client_class = cast("MagicMock", custom_components.watersmart.WaterSmartClient)
+
+    assert client_class.call_args.kwargs["circuit_breaker"] is get_circuit_breaker(
+        hass, "test"
+    )
+    assert client_class.call_args.kwargs["rate_limiter"] is get_rate_limiter(
+        hass, "test"
+    )
+
+
+@pytest.fixture
+async def deferred_config_entries(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    mock_sensor_name,
+    mock_watersmart_client,
+) -> list[MockConfigEntry]:
+    """Set up two entries while Home Assistant is starting."""
+
+    hass.set_state(CoreState.starting)
+    other_config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "host": "other",
+            "username": "test@home-assistant.io",
+            "password": "Passw0rd",
+        },
+    )
+    entries = [mock_config_entry, other_config_entry]
+
+    for entry in entries:
+        entry.add_to_hass(hass)
+        await hass.config_entries.async_setup(entry.entry_id)
+
+    await hass.async_block_till_done()
+
+    return entries
+
+
+async def test_deferred_first_refresh(
+    hass: HomeAssistant,
+    deferred_config_entries: list[MockConfigEntry],
+    mock_watersmart_client,
+):
+    """Test entries set up during startup refresh in the background."""
+    assert all(
+        entry.state is ConfigEntryState.LOADED for entry in deferred_config_entries
+    )
+    assert hass.states.get(TEST_ENTITY_ID).state != STATE_UNAVAILABLE
+    assert hass.states.get(OTHER_ENTITY_ID).state == STATE_UNAVAILABLE
+    assert mock_watersmart_client.async_get_hourly_data.call_count == 1
+
+    async_fire_time_changed(hass, utcnow() + STARTUP_REFRESH_STAGGER)
+    await hass.async_block_till_done()
+
+    assert hass.states.get(OTHER_ENTITY_ID).state != STATE_UNAVAILABLE
+    assert mock_watersmart_client.async_get_hourly_data.call_count == 2
+
+
+@pytest.mark.usefixtures("client_authentication_error")
+async def test_deferred_first_refresh_invalid_auth(
+    hass: HomeAssistant,
+    issue_registry: ir.IssueRegistry,
+    deferred_config_entries: list[MockConfigEntry],
+    mock_watersmart_client,
+):
+    """Test invalid credentials are reported once the first refresh runs."""
+    issue = issue_registry.async_get_issue(
+        DOMAIN, "invalid_auth_test_test@home-assistant.io"
+    )
+
+    assert issue.translation_key == "invalid_auth"
+    assert hass.states.get(TEST_ENTITY_ID).state == STATE_UNAVAILABLE
+    assert [
+        flow["context"]["source"]
+        for flow in hass.config_entries.flow.async_progress_by_handler(DOMAIN)
+    ] == ["reauth"]
+
+    mock_watersmart_client.async_get_hourly_data.side_effect = None
+    async_fire_time_changed(hass, utcnow() + DEFAULT_SCAN_INTERVAL)
+    await hass.async_block_till_done()
+
+    assert not issue_registry.async_get_issue(
+        DOMAIN, "invalid_auth_test_test@home-assistant.io"
+    )
+
+
+async def test_deferred_first_refresh_cancelled_on_unload(
+    hass: HomeAssistant,
+    deferred_config_entries: list[MockConfigEntry],
+    mock_watersmart_client,
+):
+    """Test a staggered first refresh does not run after the entry is unloaded."""
+    for entry in deferred_config_entries:
+        await hass.config_entries.async_unload(entry.entry_id)
+
+    async_fire_time_changed(hass, utcnow() + STARTUP_REFRESH_STAGGER)
+    await hass.async_block_till_done()
+
+    assert mock_watersmart_client.async_get_hourly_data.call_count == 1
+
+
+async def test_import_accounts(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    mock_watersmart_client,
+    caplog: pytest.LogCaptureFixture,
+):
+    """Test accounts listed in YAML are imported through the config flow."""
+    rejected_client = AsyncMock()
+    rejected_client.async_get_account_number.side_effect = AuthenticationError(
+        ["invalid credentials"]
+    )
+
+    def _client(host, username, password, **_kwargs: object):
+        return rejected_client if username == "b@home" else mock_watersmart_client
+
+    mock_config_entry.add_to_hass(hass)
+
+    with (
+        caplog.at_level(logging.WARNING),
+        patch(
+            "custom_components.watersmart.config_flow.WaterSmartClient",
+            side_effect=_client,
+        ),
+    ):
+        assert await async_setup_component(
+            hass,
+            DOMAIN,
+            {
+                DOMAIN: {
+                    "accounts": [
+                        dict(mock_config_entry.data),
+                        {"host": "other", "username": "a@home", "password": "x"},
+                        {"host": "other", "username": "a@home", "password": "x"},
+                        {"host": "other", "username": "b@home", "password": "wrong"},
+                    ]
+                }
+            },
+        )
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    entries = hass.config_entries.async_entries(DOMAIN)
+    created = next(entry for entry in entries if entry.data["username"] == "a@home")
+
+    assert len(entries) == 2
+    assert created.title == "other (a@home)"
+    assert created.state is ConfigEntryState.LOADED
+    assert created.runtime_data.coordinator.watersmart is mock_watersmart_client
+    assert "Skipping duplicate account a@home on other" in caplog.text
+    assert "Could not import account b@home on other: invalid_auth" in caplog.text
+    assert "test@home-assistant.io" not in caplog.text
+    assert "wrong" not in caplog.text
+
+
+async def test_import_accounts_concurrency(hass: HomeAssistant, mock_watersmart_client):
+    """Test only a few accounts are imported at the same time."""
+    active = 0
+    most_active = 0
+
+    async def _get_account_number():
+        nonlocal active, most_active
+        active += 1
+        most_active = max(most_active, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+        return "1234567-8900"
+
+    mock_watersmart_client.async_get_account_number.side_effect = _get_account_number
+
+    with patch("custom_components.watersmart.IMPORT_CONCURRENCY", 2):
+        assert await async_setup_component(
+            hass,
+            DOMAIN,
+            {
+                DOMAIN: {
+                    "accounts": [
+                        {"host": "other", "username": f"{index}@home", "password": "x"}
+                        for index in range(5)
+                    ]
+                }
+            },
+        )
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert most_active == 2
+    assert len(hass.config_entries.async_entries(DOMAIN)) == 5
+
+
+async def test_import_accounts_invalid(hass: HomeAssistant):
+    """Test accounts without a password are rejected."""
+    assert not await async_setup_component(
+        hass, DOMAIN, {DOMAIN: {"accounts": [{"host": "other", "username": "a"}]}}
+    )
@@ -0,0 +1,111 @@
+"""Test continuous flow detection."""
+
+from custom_components.watersmart.leak import (
+    CONTINUOUS_FLOW_HOURS,
+    ContinuousFlowDetector,
+)
+
+from .conftest import usage_record
+
+
+def _feed(detector, values, start=0):
+    for index, gallons in enumerate(values):
+        hour = start + index
+        detector.update(usage_record(hour * 3600, gallons), hour % 24)
+
+
+def test_continuous_flow():
+    detector = ContinuousFlowDetector()
+
+    # starting after the night, so flow through it is not enough on its own
+    _feed(detector, [1.0] * (CONTINUOUS_FLOW_HOURS - 1), start=5)
+    is_on = detector.is_on
+
+    assert not is_on
+
+    _feed(detector, [1.0], start=CONTINUOUS_FLOW_HOURS + 4)
+    is_on = detector.is_on
+
+    assert is_on
+    assert detector.consecutive_flow_hours == CONTINUOUS_FLOW_HOURS
+
+    _feed(detector, [0], start=CONTINUOUS_FLOW_HOURS + 5)
+    is_on = detector.is_on
+
+    assert not is_on
+    assert detector.consecutive_flow_hours == 0
+
+
+def test_overnight_flow_relative_to_baseline():
+    detector = ContinuousFlowDetector()
+
+    # a day of usage that stops overnight & again in the evening
+    _feed(detector, [4.0, 0, 0, 0, 0, *[4.0] * 18, 0])
+    is_on = detector.is_on
+
+    assert detector.min_overnight_gallons == 0
+    assert not is_on
+
+    # flow that stays at half the usual rate through the night
+    _feed(detector, [4.0, 2.0, 2.0, 2.0, 2.0, 4.0], start=24)
+    is_on = detector.is_on
+
+    assert is_on
+    assert detector.consecutive_flow_hours == 6
+
+    _feed(detector, [0], start=30)
+    is_on = detector.is_on
+
+    assert not is_on
+
+
+def test_low_overnight_flow_waits_for_a_full_day():
+    detector = ContinuousFlowDetector()
+
+    _feed(detector, [4.0, 0.5, 0.5, 0.5, 0.5, 4.0])
+    is_on = detector.is_on
+
+    assert detector.min_overnight_gallons == 0.5
+    assert detector.consecutive_flow_hours == 6
+    assert not is_on
+
+
+def test_gap_and_missing_gallons_reset_flow():
+    detector = ContinuousFlowDetector()
+
+    _feed(detector, [1.0, 1.0])
+    _feed(detector, [1.0], start=5)
+
+    assert detector.consecutive_flow_hours == 1
+
+    _feed(detector, [None], start=6)
+
+    assert detector.consecutive_flow_hours == 0
+    assert detector.last_read_datetime == 6 * 3600
+
+
+def test_min_overnight_gallons():
+    detector = ContinuousFlowDetector()
+
+    _feed(detector, [0.5, 2.0, 0.25, 3.0, 1.0])
+
+    assert detector.min_overnight_gallons is None
+
+    _feed(detector, [4.0], start=5)
+
+    assert detector.min_overnight_gallons == 0.25
+
+
+def test_baseline_and_reported_leak():
+    detector = ContinuousFlowDetector()
+
+    detector.update(usage_record(0, 2.0), 0)
+
+    assert detector.baseline_gallons == 2.0
+
+    detector.update(usage_record(3600, 0, leak_gallons=5), 1)
+    is_on = detector.is_on
+
+    assert 0 < detector.baseline_gallons < 2.0
+    assert detector.leak_gallons == 5
+    assert is_on
@@ -0,0 +1,107 @@
+"""Test UTC offset transition tables."""
+
+from concurrent.futures import ThreadPoolExecutor
+import datetime as dt
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.watersmart.localtime import (
+    SPAN_SECONDS,
+    TransitionTable,
+    get_transition_table,
+)
+
+LOS_ANGELES = ZoneInfo("America/Los_Angeles")
+
+
+def _wall_clock(year: int, month: int, day: int, hour: int = 0, minute: int = 0):
+    return int(dt.datetime(year, month, day, hour, minute, tzinfo=dt.UTC).timestamp())
+
+
+def _expected(timestamp, zone):
+    epoch = int(
+        dt.datetime.fromtimestamp(timestamp, dt.UTC).replace(tzinfo=zone).timestamp()
+    )
+
+    return epoch, dt.datetime.fromtimestamp(epoch, zone).isoformat()
+
+
+@pytest.mark.parametrize(
+    "zone",
+    [
+        "America/Los_Angeles",
+        "Australia/Lord_Howe",
+        "Europe/London",
+        "Asia/Kolkata",
+        "Pacific/Apia",
+        "UTC",
+    ],
+)
+def test_matches_zoneinfo(zone):
+    zone = ZoneInfo(zone)
+    table = TransitionTable(zone)
+    start = _wall_clock(2011, 1, 1)
+
+    for timestamp in range(start, start + 2 * 366 * 86400, 1800):
+        assert (table.to_epoch(timestamp), table.isoformat(timestamp)) == _expected(
+            timestamp, zone
+        )
+
+
+@pytest.mark.parametrize(
+    ("wall_clock", "offset", "label"),
+    [
+        ((2024, 3, 10, 1, 0), -8 * 3600, "2024-03-10T01:00:00-08:00"),
+        # skipped when clocks sprang forward, so labeled as the moment it
+        # would have been
+        ((2024, 3, 10, 2, 30), -8 * 3600, "2024-03-10T03:30:00-07:00"),
+        ((2024, 3, 10, 3, 0), -7 * 3600, "2024-03-10T03:00:00-07:00"),
+        # repeated when clocks fell back, so the first occurrence
+        ((2024, 11, 3, 1, 30), -7 * 3600, "2024-11-03T01:30:00-07:00"),
+        ((2024, 11, 3, 2, 0), -8 * 3600, "2024-11-03T02:00:00-08:00"),
+    ],
+)
+def test_transitions(wall_clock, offset, label):
+    table = TransitionTable(LOS_ANGELES)
+    timestamp = _wall_clock(*wall_clock)
+
+    assert table.utc_offset(timestamp) == offset
+    assert table.isoformat(timestamp) == label
+
+
+def test_extends_coverage():
+    table = TransitionTable(LOS_ANGELES)
+    timestamps = [
+        _wall_clock(2024, 6, 1),
+        _wall_clock(2024, 6, 1) + 3 * SPAN_SECONDS,
+        _wall_clock(2024, 6, 1) - 3 * SPAN_SECONDS,
+        # local mean time had an offset with seconds
+        _wall_clock(1880, 6, 1),
+    ]
+
+    for timestamp in timestamps:
+        assert table.isoformat(timestamp) == _expected(timestamp, LOS_ANGELES)[1]
+
+    assert table.isoformat(timestamps[-1]).endswith("-07:52:58")
+
+
+def test_extends_coverage_from_threads():
+    table = TransitionTable(LOS_ANGELES)
+    timestamps = [
+        _wall_clock(2024, 6, 1) + offset * SPAN_SECONDS + hour * 3600
+        for offset in range(-8, 8)
+        for hour in range(0, 24 * 366, 7)
+    ]
+
+    with ThreadPoolExecutor(8) as executor:
+        labels = list(executor.map(table.isoformat, timestamps, chunksize=64))
+
+    assert labels == [_expected(timestamp, LOS_ANGELES)[1] for timestamp in timestamps]
+
+
+def test_table_shared_by_zone():
+    table = get_transition_table(LOS_ANGELES)
+
+    assert get_transition_table(LOS_ANGELES) is table
+    assert get_transition_table(dt.UTC) is not table
@@ -0,0 +1,103 @@
+"""Test weekday & hour of day usage profile."""
+
+import statistics
+
+import pytest
+
+from custom_components.watersmart.history import DAY_SECONDS, HourlyHistory
+from custom_components.watersmart.profile import MIN_SAMPLES, ProfileCell, UsageProfile
+
+from .conftest import usage_record
+
+WEEK_SECONDS = 7 * DAY_SECONDS
+
+
+def test_cell_statistics():
+    values = [2.0, 4.5, 3.25, 10.0, 0.0]
+    cell = ProfileCell()
+
+    for value in values:
+        cell.add(value)
+
+    assert cell.count == 5
+    assert cell.mean == pytest.approx(statistics.mean(values))
+    assert cell.variance == pytest.approx(statistics.variance(values))
+    assert cell.stddev == pytest.approx(statistics.stdev(values))
+
+    cell.remove(10.0)
+
+    assert cell.mean == pytest.approx(statistics.mean(values[:3] + values[4:]))
+    assert cell.variance == pytest.approx(statistics.variance(values[:3] + values[4:]))
+
+
+def test_cell_remove_last_value():
+    cell = ProfileCell()
+    cell.add(2.0)
+
+    assert cell.stddev is None
+
+    cell.remove(2.0)
+
+    assert cell == ProfileCell()
+
+
+def test_profile_update():
+    history = HourlyHistory()
+    profile = UsageProfile()
+    profile.update(
+        history.merge(
+            [usage_record(0, 1.0), usage_record(WEEK_SECONDS, 3.0), usage_record(3600)]
+        )
+    )
+
+    # the epoch fell on a Thursday
+    assert profile.cells[3][0].count == 2
+    assert profile.cells[3][0].mean == 2.0
+    assert profile.cells[3][1].count == 1
+
+    profile.update(
+        history.merge([usage_record(0, None), usage_record(WEEK_SECONDS, 5.0)])
+    )
+
+    assert profile.cells[3][0].count == 1
+    assert profile.cells[3][0].mean == 5.0
+
+    profile.update(history.merge([usage_record(0, 3.0)]))
+
+    assert profile.cells[3][0].count == 2
+    assert profile.cells[3][0].mean == 4.0
+
+
+@pytest.mark.parametrize(
+    ("gallons", "expected"),
+    [
+        (None, None),
+        (2.0, False),
+        # more than three standard deviations above, but only just
+        (5.5, False),
+        (20.0, True),
+    ],
+)
+def test_is_unusual(gallons, expected):
+    profile = UsageProfile()
+    records = [
+        usage_record(week * WEEK_SECONDS, value)
+        for week, value in enumerate([1.0, 2.0, 1.5, 2.5])
+    ]
+    record = usage_record(len(records) * WEEK_SECONDS, gallons)
+
+    for item in (*records, record):
+        profile.add(item)
+
+    assert profile.is_unusual(record) is expected
+
+
+def test_is_unusual_too_few_samples():
+    profile = UsageProfile()
+    records = [usage_record(week * WEEK_SECONDS, 1.0) for week in range(MIN_SAMPLES)]
+
+    for record in records:
+        profile.add(record)
+
+    assert profile.baseline(records[-1]).count == MIN_SAMPLES - 1
+    assert profile.is_unusual(records[-1]) is None
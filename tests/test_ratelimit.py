@@ -0,0 +1,140 @@
+"""Test rate limiting."""
+
+import asyncio
+import datetime as dt
+from email.utils import format_datetime
+from unittest.mock import ANY
+
+from homeassistant.core import HomeAssistant
+import pytest
+
+from custom_components.watersmart.ratelimit import (
+    DATA_RATE_LIMITERS,
+    HostRateLimiter,
+    Priority,
+    TokenBucket,
+    get_rate_limiter,
+    parse_retry_after,
+)
+
+
+async def test_burst_is_not_delayed():
+    bucket = TokenBucket(rate=1, burst=3)
+
+    waits = [await bucket.acquire() for _ in range(3)]
+
+    assert waits == [0, 0, 0]
+    assert bucket.stats.acquired == 3
+    assert bucket.stats.delayed == 0
+
+
+async def test_waits_for_tokens():
+    bucket = TokenBucket(rate=50, burst=1)
+
+    await bucket.acquire()
+    waited = await bucket.acquire()
+
+    assert waited == pytest.approx(0.02, abs=0.015)
+    assert bucket.stats.delayed == 1
+    assert bucket.stats.max_wait == waited
+
+
+async def test_priority_order():
+    bucket = TokenBucket(rate=100, burst=1)
+    order = []
+
+    await bucket.acquire()
+
+    async def acquire(name, priority):
+        await bucket.acquire(priority)
+        order.append(name)
+
+    await asyncio.gather(
+        acquire("background 1", Priority.BACKGROUND),
+        acquire("background 2", Priority.BACKGROUND),
+        acquire("scheduled", Priority.SCHEDULED),
+    )
+
+    assert order == ["scheduled", "background 1", "background 2"]
+    assert bucket.stats.max_queue_length == 3
+    assert bucket.stats.queue_length == 0
+
+
+async def test_cancelled_waiter_leaves_queue():
+    bucket = TokenBucket(rate=10, burst=1)
+
+    await bucket.acquire()
+    task = asyncio.create_task(bucket.acquire())
+    await asyncio.sleep(0)
+
+    assert bucket.stats.queue_length == 1
+
+    task.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert bucket.stats.queue_length == 0
+
+
+async def test_throttle_pauses_and_recovers():
+    bucket = TokenBucket(rate=100, burst=5)
+
+    bucket.throttle(0.02)
+
+    assert bucket.rate == 50
+    assert bucket.stats.throttled == 1
+
+    waited = await bucket.acquire()
+
+    # pause, then one token at the reduced rate
+    assert waited == pytest.approx(0.04, abs=0.02)
+
+    bucket.record_success()
+
+    assert bucket.rate == 60
+
+    for _ in range(10):
+        bucket.record_success()
+
+    assert bucket.rate == 100
+
+
+def test_throttle_rate_floor():
+    bucket = TokenBucket(rate=16, burst=1)
+
+    for _ in range(10):
+        bucket.throttle(0)
+
+    assert bucket.rate == 1
+
+
+def test_limiter_shared_by_host(hass: HomeAssistant):
+    limiter = get_rate_limiter(hass, "shared")
+
+    assert isinstance(limiter, HostRateLimiter)
+    assert get_rate_limiter(hass, "shared") is limiter
+    assert get_rate_limiter(hass, "other") is not limiter
+    assert hass.data[DATA_RATE_LIMITERS] == {"shared": limiter, "other": ANY}
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (None, None),
+        ("12", 12),
+        ("-3", 0),
+        ("soon", None),
+        (format_datetime(dt.datetime(2000, 1, 1, tzinfo=dt.UTC), usegmt=True), 0),
+    ],
+)
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_date():
+    retry_at = dt.datetime.now(tz=dt.UTC) + dt.timedelta(seconds=120)
+
+    assert parse_retry_after(format_datetime(retry_at, usegmt=True)) == (
+        pytest.approx(120, abs=2)
+    )
@@ -0,0 +1,186 @@
+"""Test retry & circuit breaking."""
+
+import asyncio
+from unittest.mock import ANY, AsyncMock, patch
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+import pytest
+
+from custom_components.watersmart.resilience import (
+    DATA_CIRCUIT_BREAKERS,
+    CircuitBreaker,
+    CircuitOpenError,
+    async_call_with_breaker,
+    get_circuit_breaker,
+    is_transient_error,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(failure_threshold=2, reset_timeout=60, clock=clock)
+
+
+@pytest.fixture(autouse=True)
+def mock_sleep():
+    with patch(
+        "custom_components.watersmart.resilience.asyncio.sleep", new=AsyncMock()
+    ) as mock_sleep:
+        yield mock_sleep
+
+
+def _server_error(status=503):
+    return aiohttp.ClientResponseError(None, (), status=status)
+
+
+def test_breaker_opens_after_threshold(breaker):
+    breaker.record_failure()
+
+    assert not breaker.is_open
+
+    breaker.record_failure()
+
+    assert breaker.is_open
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+
+def test_breaker_allows_single_trial(breaker, clock):
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now = 60
+
+    breaker.before_request()
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    breaker.record_failure()
+
+    assert breaker.is_open
+    assert breaker.opened_at == 60
+
+    clock.now = 120
+    breaker.before_request()
+    breaker.record_success()
+
+    assert not breaker.is_open
+    assert breaker.failures == 0
+
+
+def test_breaker_shared_by_host(hass: HomeAssistant):
+    breaker = get_circuit_breaker(hass, "shared")
+
+    assert get_circuit_breaker(hass, "shared") is breaker
+    assert get_circuit_breaker(hass, "other") is not breaker
+    assert hass.data[DATA_CIRCUIT_BREAKERS] == {"shared": breaker, "other": ANY}
+
+
+@pytest.mark.parametrize(
+    ("error", "expected"),
+    [
+        (TimeoutError(), True),
+        (aiohttp.ServerDisconnectedError(), True),
+        (_server_error(), True),
+        (_server_error(404), False),
+        (ValueError(), False),
+    ],
+)
+def test_is_transient_error(error, expected):
+    assert is_transient_error(error) is expected
+
+
+async def test_call_retries_transient_errors(breaker, mock_sleep):
+    func = AsyncMock(side_effect=[TimeoutError(), _server_error(), "ok"])
+
+    assert await async_call_with_breaker(breaker, func, attempts=3) == "ok"
+    assert func.call_count == 3
+    assert mock_sleep.call_count == 2
+    assert all(0 <= call.args[0] <= 1 for call in mock_sleep.call_args_list)
+    assert breaker.failures == 0
+
+
+async def test_call_records_one_failure_when_exhausted(breaker):
+    func = AsyncMock(side_effect=TimeoutError())
+
+    with pytest.raises(TimeoutError):
+        await async_call_with_breaker(breaker, func, attempts=3)
+
+    assert func.call_count == 3
+    assert breaker.failures == 1
+
+
+async def test_call_does_not_retry_other_errors(breaker):
+    breaker.record_failure()
+    func = AsyncMock(side_effect=ValueError())
+
+    with pytest.raises(ValueError):  # noqa: PT011
+        await async_call_with_breaker(breaker, func, attempts=3)
+
+    assert func.call_count == 1
+    assert breaker.failures == 0
+
+
+async def test_call_stops_retrying_when_breaker_opens(breaker):
+    breaker.record_failure()
+
+    async def func():  # noqa: RUF029
+        # another client trips the breaker while this one is retrying
+        breaker.record_failure()
+        raise TimeoutError
+
+    with pytest.raises(TimeoutError):
+        await async_call_with_breaker(breaker, func, attempts=3)
+
+    assert breaker.is_open
+
+
+async def test_call_rejected_when_open(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    func = AsyncMock()
+
+    with pytest.raises(CircuitOpenError):
+        await async_call_with_breaker(breaker, func)
+
+    func.assert_not_called()
+
+
+async def test_call_releases_cancelled_trial(breaker, clock):
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now = 60
+    started = asyncio.Event()
+
+    async def func():
+        started.set()
+        await asyncio.Event().wait()
+
+    task = asyncio.create_task(async_call_with_breaker(breaker, func))
+    await started.wait()
+
+    assert breaker.is_open
+
+    task.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert not breaker.is_open
+    assert await async_call_with_breaker(breaker, AsyncMock(return_value="ok")) == "ok"
+    assert breaker.opened_at is None
@@ -0,0 +1,232 @@
+"""Test tiered retention of usage history."""
+
+import datetime as dt
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant
+import pytest
+
+from custom_components.watersmart.history import DAY_SECONDS, HourlyHistory
+from custom_components.watersmart.retention import (
+    DailyRollup,
+    MonthlyTotal,
+    RetainedHistory,
+    RetentionPolicy,
+    compact,
+    months_before,
+    rollup_days,
+    rollup_months,
+    start_of_month,
+    write_compaction,
+)
+
+from .conftest import MockConfigEntry, usage_record
+
+JAN_1 = int(dt.datetime(2024, 1, 1, tzinfo=dt.UTC).timestamp())
+FEB_1 = int(dt.datetime(2024, 2, 1, tzinfo=dt.UTC).timestamp())
+MAR_6 = int(dt.datetime(2024, 3, 6, tzinfo=dt.UTC).timestamp())
+
+
+def test_rollup_days():
+    records = [
+        usage_record(JAN_1, 1.5),
+        usage_record(JAN_1 + 3600, None),
+        usage_record(JAN_1 + 7200, 4.0, leak_gallons=2),
+        usage_record(JAN_1 + DAY_SECONDS + 3600, None),
+    ]
+
+    assert rollup_days(records) == [
+        DailyRollup(JAN_1, 5.5, 4.0, 2, 1),
+        DailyRollup(JAN_1 + DAY_SECONDS, 0, None, 0, 1),
+    ]
+    assert rollup_days([]) == []
+
+
+def test_rollup_months():
+    days = [
+        DailyRollup(JAN_1, 5.5, 4.0, 2, 1),
+        DailyRollup(FEB_1 - DAY_SECONDS, 1.0, 1.0, 0, 0),
+        DailyRollup(FEB_1, 3.0, 2.0, 1, 2),
+    ]
+
+    assert rollup_months(days) == [
+        MonthlyTotal(JAN_1, 6.5, 2, 1),
+        MonthlyTotal(FEB_1, 3.0, 1, 2),
+    ]
+
+
+def test_compact():
+    daily = [DailyRollup(JAN_1, 5.5, 4.0, 2, 1)]
+    records = [usage_record(FEB_1), usage_record(FEB_1 + 3600)]
+
+    compaction = compact(daily, records, FEB_1)
+
+    assert compaction.daily == [DailyRollup(FEB_1, 2.0, 1.0, 0, 0)]
+    assert compaction.monthly == [MonthlyTotal(JAN_1, 5.5, 2, 1)]
+
+
+def test_rollups_between():
+    retained = RetainedHistory(
+        store=write_compaction(
+            None,
+            [MonthlyTotal(JAN_1, 6.5, 2, 1)],
+            [
+                DailyRollup(FEB_1, 3.0, 2.0, 1, 2),
+                DailyRollup(FEB_1 + DAY_SECONDS, 1.0, None, 0, 0),
+            ],
+            [],
+            FEB_1,
+        )
+    )
+
+    assert retained.rollups_between(None, None) == [
+        *retained.monthly,
+        *retained.daily,
+    ]
+    assert retained.rollups_between(JAN_1 + 1, FEB_1 + 1) == retained.daily[:1]
+    assert retained.rollups_between(None, None, 2) == [
+        *retained.monthly,
+        *retained.daily[:1],
+    ]
+    assert retained.rollups_between(None, None, 1) == retained.monthly
+    assert retained.daily[1].max_gallons is None
+    assert retained.end == FEB_1 + 2 * DAY_SECONDS
+
+
+def test_retained_history_end():
+    assert RetainedHistory().end is None
+
+    retained = RetainedHistory(
+        store=write_compaction(None, [MonthlyTotal(JAN_1, 6.5, 2, 1)], [], [], 0)
+    )
+
+    assert retained.end == FEB_1
+
+
+@pytest.mark.parametrize(
+    ("months", "expected"),
+    [
+        (0, dt.datetime(2024, 3, 1, tzinfo=dt.UTC)),
+        (2, dt.datetime(2024, 1, 1, tzinfo=dt.UTC)),
+        (3, dt.datetime(2023, 12, 1, tzinfo=dt.UTC)),
+    ],
+)
+def test_months_before(months, expected):
+    assert months_before(MAR_6 + 3600, months) == int(expected.timestamp())
+
+
+def test_start_of_month():
+    assert start_of_month(MAR_6 + 3600) == months_before(MAR_6, 0)
+
+
+def test_retention_policy():
+    policy = RetentionPolicy(35, 1)
+    last_read = MAR_6 + 34 * DAY_SECONDS + 23 * 3600
+
+    assert policy.hourly_cutoff(last_read) == MAR_6
+    assert policy.daily_cutoff(MAR_6) == FEB_1
+
+
+def test_history_retire_and_drop():
+    history = HourlyHistory()
+    history.merge(
+        [usage_record(0, 1.0), usage_record(3600, 2.0), usage_record(7200, 4.0)]
+    )
+
+    assert history.retire_before(3600) == [usage_record(0, 1.0)]
+    assert history.retire_before(0) == [usage_record(0, 1.0)]
+
+    history.drop_before(3600)
+    merge = history.merge([usage_record(0, 8.0), usage_record(3600, 2.0)])
+
+    assert not merge.changed
+    assert history.timestamps == [3600, 7200]
+    assert history.cumulative == [1.0, 3.0, 7.0]
+    assert history.gallons_between(0, 10800) == 6.0
+
+
+@pytest.fixture
+def client_hourly_data_100_days(mock_watersmart_client):
+    hourly = mock_watersmart_client.async_get_hourly_data.return_value
+
+    mock_watersmart_client.async_get_hourly_data.return_value = [
+        dict(hourly[0], read_datetime=JAN_1 + hour * 3600, gallons=1.0)
+        for hour in range(100 * 24)
+    ]
+
+
+@pytest.mark.usefixtures("client_hourly_data_100_days")
+@pytest.mark.parametrize(
+    "mock_config_entry_options",
+    [{"hourly_retention_days": 35, "daily_retention_months": 1}],
+)
+async def test_coordinator_compaction(
+    hass: HomeAssistant, init_integration: MockConfigEntry, mock_watersmart_client
+):
+    coordinator = init_integration.runtime_data.coordinator
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert coordinator.history.start == MAR_6
+    assert coordinator.history.timestamps[0] == MAR_6
+    assert len(coordinator.history.records) == 35 * 24
+    assert coordinator.retained.monthly == [MonthlyTotal(JAN_1, 31 * 24, 0, 0)]
+    assert len(coordinator.retained.daily) == (MAR_6 - FEB_1) // DAY_SECONDS
+    assert coordinator.retained.daily[0] == DailyRollup(FEB_1, 24, 1.0, 0, 0)
+
+    # the compacted hours are fetched again but not merged back
+    hourly = mock_watersmart_client.async_get_hourly_data.return_value
+    mock_watersmart_client.async_get_hourly_data.return_value = [
+        dict(record, gallons=2.0) for record in hourly
+    ]
+    await coordinator.async_refresh()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert len(coordinator.history.records) == 35 * 24
+    assert len(coordinator.retained.daily) == (MAR_6 - FEB_1) // DAY_SECONDS
+    assert sum(coordinator.history.hour_of_day_counts) == 100 * 24
+    assert coordinator.history.gallons_between(MAR_6, MAR_6 + DAY_SECONDS) == 48
+
+
+@pytest.mark.usefixtures("client_hourly_data_100_days")
+async def test_coordinator_compacts_once(
+    hass: HomeAssistant, init_integration: MockConfigEntry
+):
+    coordinator = init_integration.runtime_data.coordinator
+    last_read = coordinator.history.timestamps[-1]
+
+    # the compaction scheduled by the first refresh has not run yet
+    coordinator._async_schedule_compaction(last_read)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert len(coordinator.retained.daily) == 10
+    assert coordinator.retained.monthly == []
+
+
+@pytest.mark.usefixtures("client_hourly_data_100_days")
+@pytest.mark.parametrize(
+    "mock_config_entry_options",
+    [{"hourly_retention_days": 35, "daily_retention_months": 1}],
+)
+async def test_compacted_history_persists(
+    hass: HomeAssistant, init_integration: MockConfigEntry
+):
+    await hass.async_block_till_done(wait_background_tasks=True)
+    path = Path(
+        hass.config.path(".storage", "watersmart", f"{init_integration.entry_id}.cold")
+    )
+
+    assert path.exists()
+
+    await hass.config_entries.async_reload(init_integration.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    coordinator = init_integration.runtime_data.coordinator
+
+    assert coordinator.retained.path == path
+    assert coordinator.retained.nbytes == path.stat().st_size
+    assert coordinator.retained.monthly == [MonthlyTotal(JAN_1, 31 * 24, 0, 0)]
+    assert len(coordinator.retained.daily) == (MAR_6 - FEB_1) // DAY_SECONDS
+    assert coordinator.history.timestamps[0] == MAR_6
+
+    await hass.config_entries.async_remove(init_integration.entry_id)
+
+    assert not path.exists()
@@ -1,13 +1,23 @@
 """Test sensor for simple integration."""
 
 import datetime as dt
+from unittest.mock import patch
 
-from homeassistant.core import HomeAssistant
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.core import CoreState, HomeAssistant, State
 from homeassistant.util.dt import utcnow
 import pytest
-from pytest_homeassistant_custom_component.common import async_fire_time_changed
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+    async_mock_restore_state_shutdown_restart,
+    mock_restore_cache_with_extra_data,
+)
 from syrupy.assertion import SnapshotAssertion
 
+from custom_components.watersmart.resilience import CircuitOpenError
+from custom_components.watersmart.sensor import WaterSmartSensorExtraStoredData
+
 
 @pytest.fixture
 def client_hourly_data_full_day(mock_watersmart_client):
@@ -27,6 +37,30 @@ def client_hourly_data_full_day(mock_watersmart_client):
     mock_watersmart_client.async_get_hourly_data.return_value = hourly
 
 
+@pytest.fixture
+def client_hourly_data_spring_forward(mock_watersmart_client):
+    hourly = mock_watersmart_client.async_get_hourly_data.return_value
+    start = int(dt.datetime(2024, 3, 9, tzinfo=dt.UTC).timestamp())
+
+    # the hour skipped when clocks sprang forward has no record
+    mock_watersmart_client.async_get_hourly_data.return_value = [
+        dict(hourly[0], read_datetime=start + hour * 3600, gallons=1.0)
+        for hour in range(48 + 6)
+        if hour != 24 + 2
+    ]
+
+
+@pytest.mark.usefixtures("client_hourly_data_spring_forward", "init_integration")
+def test_most_recent_day_sensor_spring_forward(hass: HomeAssistant):
+    """Test the day on which clocks changed is a full day."""
+    state = hass.states.get("sensor.watersmart_test_gallons_for_most_recent_full_day")
+    related = state.attributes["related"]
+
+    assert related[0]["start"] == "2024-03-10T00:00:00-08:00"
+    assert related[-1]["start"] == "2024-03-10T23:00:00-07:00"
+    assert len(related) == 23
+
+
 @pytest.mark.usefixtures("client_hourly_data_full_day", "init_integration")
 def test_most_recent_day_sensor(
     hass: HomeAssistant, mock_watersmart_client, snapshot: SnapshotAssertion
@@ -130,3 +164,197 @@ def test_sensor_update_failure(hass: HomeAssistant, mock_watersmart_client):
     assert recent_hour_sensor_state is None
 
     assert mock_watersmart_client.async_get_hourly_data.call_count == 1
+
+
+@pytest.mark.usefixtures("client_hourly_data_full_day", "init_integration")
+@pytest.mark.parametrize(
+    "entity_id",
+    [
+        "sensor.watersmart_test_gallons_for_last_7_days",
+        "sensor.watersmart_test_gallons_for_last_30_days",
+        "sensor.watersmart_test_gallons_month_to_date",
+        "sensor.watersmart_test_gallons_billing_cycle_to_date",
+        "sensor.watersmart_test_average_gallons_per_hour",
+    ],
+)
+def test_rolling_window_sensors(
+    hass: HomeAssistant, snapshot: SnapshotAssertion, entity_id: str
+):
+    """Test sensor."""
+    assert snapshot == hass.states.get(entity_id)
+
+
+@pytest.mark.usefixtures("client_hourly_data_full_day", "init_integration")
+@pytest.mark.parametrize(
+    ("mock_config_entry_options", "hours", "start"),
+    [
+        ({"billing_day": 20}, 24, "2024-06-20T00:00:00-07:00"),
+        ({"billing_day": 21}, 29, "2024-05-21T00:00:00-07:00"),
+    ],
+)
+def test_billing_cycle_sensor(hass: HomeAssistant, hours: int, start: str):
+    """Test sensor."""
+    billing_cycle_state = hass.states.get(
+        "sensor.watersmart_test_gallons_billing_cycle_to_date"
+    )
+
+    assert billing_cycle_state.attributes["hours"] == hours
+    assert billing_cycle_state.attributes["start"] == start
+
+
+@pytest.mark.usefixtures("client_hourly_data_full_day", "init_integration")
+@pytest.mark.parametrize(
+    "mock_config_entry_options",
+    [{"rate_tiers": "0.01, 100:0.02", "fixed_charge": 5.0}],
+)
+@pytest.mark.parametrize(
+    "entity_id",
+    [
+        "sensor.watersmart_test_cost_billing_cycle_to_date",
+        "sensor.watersmart_test_cost_for_most_recent_full_day",
+    ],
+)
+def test_cost_sensors(hass: HomeAssistant, snapshot: SnapshotAssertion, entity_id: str):
+    """Test sensor."""
+    assert snapshot == hass.states.get(entity_id)
+
+
+@pytest.mark.usefixtures("init_integration")
+@pytest.mark.parametrize("mock_config_entry_options", [{"rate_tiers": "0.01"}])
+def test_cost_sensor_without_full_day(hass: HomeAssistant):
+    """Test sensor."""
+    state = hass.states.get("sensor.watersmart_test_cost_for_most_recent_full_day")
+
+    assert state.state == "unknown"
+
+
+@pytest.mark.usefixtures("init_integration")
+def test_cost_sensors_without_rates(hass: HomeAssistant):
+    """Test sensor."""
+    assert hass.states.get("sensor.watersmart_test_cost_billing_cycle_to_date") is None
+
+
+@pytest.mark.usefixtures("init_integration")
+async def test_sensor_update_unchanged(hass: HomeAssistant, mock_watersmart_client):
+    """Test unchanged hourly data is not merged again."""
+    with patch(
+        "custom_components.watersmart.coordinator.HourlyHistory.merge"
+    ) as mock_merge:
+        async_fire_time_changed(hass, utcnow() + dt.timedelta(hours=1))
+        await hass.async_block_till_done()
+
+    assert mock_watersmart_client.async_get_hourly_data.call_count == 2
+    mock_merge.assert_not_called()
+
+
+@pytest.mark.usefixtures("init_integration")
+async def test_sensor_update_circuit_open(hass: HomeAssistant, mock_watersmart_client):
+    """Test sensor is unavailable while requests to the host are rejected."""
+    mock_watersmart_client.async_get_hourly_data.side_effect = CircuitOpenError
+
+    async_fire_time_changed(hass, utcnow() + dt.timedelta(hours=1))
+    await hass.async_block_till_done()
+
+    state = hass.states.get("sensor.watersmart_test_gallons_for_most_recent_hour")
+
+    assert state.state == STATE_UNAVAILABLE
+
+
+RESTORED_ENTITY_ID = "sensor.watersmart_test_average_gallons_per_hour"
+
+
+@pytest.fixture
+async def restored_integration(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    mock_sensor_name,
+    client_held_failure,
+) -> MockConfigEntry:
+    """Set up the integration during startup with a restored state."""
+
+    hass.set_state(CoreState.starting)
+    mock_restore_cache_with_extra_data(
+        hass,
+        [
+            (
+                State(RESTORED_ENTITY_ID, "1.5"),
+                {
+                    "native_value": 1.5,
+                    "native_unit_of_measurement": "gal",
+                    "attributes": {"hours": 12},
+                },
+            ),
+        ],
+    )
+    mock_config_entry.add_to_hass(hass)
+
+    await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    return mock_config_entry
+
+
+@pytest.mark.usefixtures("restored_integration")
+async def test_sensor_restored(
+    hass: HomeAssistant, mock_watersmart_client, client_held_failure
+):
+    """Test the last state is restored until the first update attempt finishes."""
+    state = hass.states.get(RESTORED_ENTITY_ID)
+
+    assert state.state == "1.5"
+    assert state.attributes["hours"] == 12
+    assert mock_watersmart_client.async_get_hourly_data.call_count == 1
+
+    client_held_failure.set()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert hass.states.get(RESTORED_ENTITY_ID).state == STATE_UNAVAILABLE
+
+    mock_watersmart_client.async_get_hourly_data.side_effect = None
+    async_fire_time_changed(hass, utcnow() + dt.timedelta(hours=1))
+    await hass.async_block_till_done()
+
+    state = hass.states.get(RESTORED_ENTITY_ID)
+
+    assert state.state != "1.5"
+    assert state.attributes.get("hours") != 12
+
+
+@pytest.mark.usefixtures("restored_integration")
+def test_sensor_not_restored_without_data(hass: HomeAssistant):
+    """Test sensors without a stored state wait for data."""
+    state = hass.states.get("sensor.watersmart_test_gallons_for_most_recent_hour")
+
+    assert state.state == STATE_UNAVAILABLE
+
+
+@pytest.mark.usefixtures("client_hourly_data_full_day", "init_integration")
+async def test_sensor_restore_data(hass: HomeAssistant):
+    """Test only a compact summary of the attributes is stored."""
+    data = await async_mock_restore_state_shutdown_restart(hass)
+    extra = data.last_states[
+        "sensor.watersmart_test_gallons_for_most_recent_full_day"
+    ].extra_data.as_dict()
+    state = hass.states.get("sensor.watersmart_test_gallons_for_most_recent_full_day")
+
+    # stored in native units, before conversion for display
+    assert extra["native_value"] == 300.0
+    assert extra["native_unit_of_measurement"] == "gal"
+    assert "related" in state.attributes
+    assert extra["attributes"] == {
+        key: value
+        for key, value in state.attributes.items()
+        if key in {"start", "hours"}
+    }
+
+
+@pytest.mark.parametrize(
+    "restored",
+    [
+        {"native_value": 1.5, "attributes": {}},
+        {"native_value": 1.5, "native_unit_of_measurement": "gal"},
+    ],
+)
+def test_sensor_restore_data_invalid(restored):
+    """Test incomplete stored data is ignored."""
+    assert WaterSmartSensorExtraStoredData.from_dict(restored) is None
@@ -1,18 +1,33 @@
 """Test services for WaterSmart integration."""
 
+import asyncio
+import base64
+from collections.abc import Callable
+import datetime as dt
 import re
-from typing import cast
+from typing import Any, cast
+from unittest.mock import call, patch
 
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant, ServiceResponse
 from homeassistant.exceptions import ServiceValidationError
 import pytest
 from syrupy.assertion import SnapshotAssertion
 import voluptuous as vol
 
+from custom_components.watersmart.cache import get_response_cache
 from custom_components.watersmart.const import DOMAIN
+from custom_components.watersmart.coordinator import ATTRIBUTE_ITEM_BYTES
+from custom_components.watersmart.ratelimit import Priority
+from custom_components.watersmart.resilience import CircuitOpenError
 from custom_components.watersmart.services import (
     ATTR_CONFIG_ENTRY,
+    BATCH_HISTORY_SERVICE_NAME,
+    CHANGES_SINCE_SERVICE_NAME,
+    COST_BREAKDOWN_SERVICE_NAME,
     HOURLY_HISTORY_SERVICE_NAME,
+    TOP_USAGE_SERVICE_NAME,
+    USAGE_PROFILE_SERVICE_NAME,
 )
 
 from .conftest import MockConfigEntry
@@ -24,6 +39,11 @@ def test_has_services(
 ) -> None:
     """Test the existence of the WaterSmart Service."""
     assert hass.services.has_service(DOMAIN, HOURLY_HISTORY_SERVICE_NAME)
+    assert hass.services.has_service(DOMAIN, COST_BREAKDOWN_SERVICE_NAME)
+    assert hass.services.has_service(DOMAIN, BATCH_HISTORY_SERVICE_NAME)
+    assert hass.services.has_service(DOMAIN, USAGE_PROFILE_SERVICE_NAME)
+    assert hass.services.has_service(DOMAIN, CHANGES_SINCE_SERVICE_NAME)
+    assert hass.services.has_service(DOMAIN, TOP_USAGE_SERVICE_NAME)
 
 
 @pytest.mark.usefixtures("init_integration")
@@ -78,6 +98,91 @@ async def test_service(
     assert mock_watersmart_client.async_get_hourly_data.call_count == update_call_count
 
 
+@pytest.mark.usefixtures("init_integration")
+async def test_service_refresh_priority(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    mock_watersmart_client,
+):
+    await hass.services.async_call(
+        DOMAIN,
+        HOURLY_HISTORY_SERVICE_NAME,
+        {ATTR_CONFIG_ENTRY: mock_config_entry.entry_id, "cached": False},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert mock_watersmart_client.async_get_hourly_data.call_args_list == [
+        call(Priority.SCHEDULED),
+        call(Priority.BACKGROUND),
+    ]
+
+
+@pytest.mark.usefixtures("init_integration")
+async def test_service_refresh_priority_overlapping(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    mock_watersmart_client,
+):
+    coordinator = mock_config_entry.runtime_data.coordinator
+    hourly: list[dict[str, Any]] = (
+        mock_watersmart_client.async_get_hourly_data.return_value
+    )
+    background_fetching = asyncio.Event()
+    release = asyncio.Event()
+
+    async def _get_hourly_data(priority: Priority) -> list[dict[str, Any]]:
+        if priority is Priority.BACKGROUND:
+            background_fetching.set()
+            await release.wait()
+
+        return hourly
+
+    mock_watersmart_client.async_get_hourly_data.side_effect = _get_hourly_data
+    service_call = hass.async_create_task(
+        hass.services.async_call(
+            DOMAIN,
+            HOURLY_HISTORY_SERVICE_NAME,
+            {ATTR_CONFIG_ENTRY: mock_config_entry.entry_id, "cached": False},
+            blocking=True,
+            return_response=True,
+        )
+    )
+    await background_fetching.wait()
+
+    # a scheduled refresh while the on demand one waits keeps its priority
+    await coordinator.async_refresh()
+    release.set()
+    await service_call
+
+    assert mock_watersmart_client.async_get_hourly_data.call_args_list[1:] == [
+        call(Priority.BACKGROUND),
+        call(Priority.SCHEDULED),
+    ]
+    assert coordinator.last_update_success
+
+
+@pytest.mark.usefixtures("init_integration")
+async def test_service_refresh_failure(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    mock_watersmart_client,
+):
+    mock_watersmart_client.async_get_hourly_data.side_effect = CircuitOpenError
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        HOURLY_HISTORY_SERVICE_NAME,
+        {ATTR_CONFIG_ENTRY: mock_config_entry.entry_id, "cached": False},
+        blocking=True,
+        return_response=True,
+    )
+
+    # the history fetched before is still returned
+    assert response["history"]
+    assert not mock_config_entry.runtime_data.coordinator.last_update_success
+
+
 @pytest.fixture
 def config_entry_data(
     mock_config_entry: MockConfigEntry, request: pytest.FixtureRequest
@@ -147,6 +252,259 @@ async def test_service_validation(
     assert re.match(error_message, str(exc.value))
 
 
+@pytest.mark.usefixtures("init_integration")
+@pytest.mark.parametrize(
+    "mock_config_entry_options",
+    [{"rate_tiers": "0.01, 10:0.02", "fixed_charge": 5.0}],
+)
+@pytest.mark.parametrize(
+    "service_data",
+    [
+        {},
+        {"cached": False},
+        {"start": "2024-06-19T21:30:00-07:00"},
+        {"end": "2024-06-19T21:30:00-07:00"},
+        {"start": "2024-06-18T00:00:00-07:00", "end": "2024-06-20T00:00:00-07:00"},
+        {"start": "2024-06-01T00:00:00-07:00"},
+    ],
+)
+async def test_cost_breakdown_service(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    snapshot: SnapshotAssertion,
+    service_data: dict[str, str | bool],
+):
+    assert snapshot == await hass.services.async_call(
+        DOMAIN,
+        COST_BREAKDOWN_SERVICE_NAME,
+        {ATTR_CONFIG_ENTRY: mock_config_entry.entry_id} | service_data,
+        blocking=True,
+        return_response=True,
+    )
+
+
+@pytest.mark.usefixtures("init_integration")
+async def test_cost_breakdown_service_without_rates(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+):
+    with pytest.raises(ServiceValidationError, match="No rate schedule"):
+        await hass.services.async_call(
+            DOMAIN,
+            COST_BREAKDOWN_SERVICE_NAME,
+            {ATTR_CONFIG_ENTRY: mock_config_entry.entry_id},
+            blocking=True,
+            return_response=True,
+        )
+
+
+@pytest.mark.usefixtures("init_integration")
+@pytest.mark.parametrize("limit", [1, 3, 4])
+async def test_service_pagination(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry, limit: int
+):
+    data = {ATTR_CONFIG_ENTRY: mock_config_entry.entry_id, "limit": limit}
+    history = []
+    pages = 0
+
+    while True:
+        response = await hass.services.async_call(
+            DOMAIN,
+            HOURLY_HISTORY_SERVICE_NAME,
+            data,
+            blocking=True,
+            return_response=True,
+        )
+        pages += 1
+        history.extend(response["history"])
+
+        assert len(response["history"]) <= limit
+
+        if "next_cursor" not in response:
+            break
+
+        data["cursor"] = response["next_cursor"]
+
+    assert pages == -(-4 // limit)
+    assert (
+        history
+        == (
+            await hass.services.async_call(
+                DOMAIN,
+                HOURLY_HISTORY_SERVICE_NAME,
+                {ATTR_CONFIG_ENTRY: mock_config_entry.entry_id},
+                blocking=True,
+                return_response=True,
+            )
+        )["history"]
+    )
+
+
+@pytest.mark.usefixtures("init_integration")
+async def test_service_columnar_format(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry, snapshot: SnapshotAssertion
+):
+    assert snapshot == await hass.services.async_call(
+        DOMAIN,
+        HOURLY_HISTORY_SERVICE_NAME,
+        {
+            ATTR_CONFIG_ENTRY: mock_config_entry.entry_id,
+            "format": "columnar",
+            "end": "2024-06-19T21:30:00-07:00",
+            "limit": 2,
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+
+@pytest.mark.usefixtures("init_integration")
+@pytest.mark.parametrize("cursor", ["!!!", "YWJj"])
+async def test_service_invalid_cursor(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry, cursor: str
+):
+    with pytest.raises(ServiceValidationError, match="Invalid cursor"):
+        await hass.services.async_call(
+            DOMAIN,
+            HOURLY_HISTORY_SERVICE_NAME,
+            {ATTR_CONFIG_ENTRY: mock_config_entry.entry_id, "cursor": cursor},
+            blocking=True,
+            return_response=True,
+        )
+
+
+@pytest.fixture
+async def second_config_entry(
+    hass: HomeAssistant, init_integration: MockConfigEntry
+) -> MockConfigEntry:
+    """Set up a second WaterSmart config entry."""
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "host": "other",
+            "username": "test@home-assistant.io",
+            "password": "Passw0rd",
+        },
+    )
+    entry.add_to_hass(hass)
+
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    return entry
+
+
+@pytest.mark.parametrize(
+    ("service_data", "update_call_count"),
+    [({}, 2), ({"cached": False}, 4)],
+)
+async def test_batch_history_service(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    second_config_entry: MockConfigEntry,
+    mock_watersmart_client,
+    snapshot: SnapshotAssertion,
+    service_data: dict[str, bool],
+    update_call_count: int,
+):
+    response = await hass.services.async_call(
+        DOMAIN,
+        BATCH_HISTORY_SERVICE_NAME,
+        {"start": "2024-06-19T20:00:00-07:00"} | service_data,
+        blocking=True,
+        return_response=True,
+    )
+
+    assert set(response["entries"]) == {
+        mock_config_entry.entry_id,
+        second_config_entry.entry_id,
+    }
+    assert response["entries"][mock_config_entry.entry_id] == snapshot
+    assert response["entries"][second_config_entry.entry_id] == snapshot
+    assert response["total"] == snapshot
+    assert mock_watersmart_client.async_get_hourly_data.call_count == update_call_count
+
+
+@pytest.mark.parametrize("aggregation", ["hourly", "daily", "total"])
+async def test_batch_history_service_aggregation(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    second_config_entry: MockConfigEntry,
+    snapshot: SnapshotAssertion,
+    aggregation: str,
+):
+    history = mock_config_entry.runtime_data.coordinator.history
+
+    with patch.object(
+        history, "records_between", wraps=history.records_between
+    ) as records_between:
+        response = await hass.services.async_call(
+            DOMAIN,
+            BATCH_HISTORY_SERVICE_NAME,
+            {
+                "config_entries": [mock_config_entry.entry_id],
+                "aggregation": aggregation,
+            },
+            blocking=True,
+            return_response=True,
+        )
+
+    # only hourly history is built from the records
+    assert records_between.called == (aggregation == "hourly")
+    assert list(response["entries"]) == [mock_config_entry.entry_id]
+    assert response["entries"][mock_config_entry.entry_id] == snapshot
+    assert response["total"] == snapshot
+
+
+@pytest.mark.usefixtures("init_integration")
+async def test_batch_history_service_validation(hass: HomeAssistant):
+    with pytest.raises(ServiceValidationError, match="Invalid config entry"):
+        await hass.services.async_call(
+            DOMAIN,
+            BATCH_HISTORY_SERVICE_NAME,
+            {"config_entries": ["incorrect entry"]},
+            blocking=True,
+            return_response=True,
+        )
+
+    with pytest.raises(vol.er.Error):
+        await hass.services.async_call(
+            DOMAIN,
+            BATCH_HISTORY_SERVICE_NAME,
+            {"aggregation": "weekly"},
+            blocking=True,
+            return_response=True,
+        )
+
+
+@pytest.mark.usefixtures("init_integration")
+@pytest.mark.parametrize(
+    ("service", "service_data"),
+    [
+        (HOURLY_HISTORY_SERVICE_NAME, lambda entry_id: {ATTR_CONFIG_ENTRY: entry_id}),
+        (BATCH_HISTORY_SERVICE_NAME, lambda entry_id: {"config_entries": [entry_id]}),
+    ],
+)
+async def test_service_called_with_other_integration_entry(
+    hass: HomeAssistant,
+    service: str,
+    service_data: Callable[[str], dict[str, Any]],
+) -> None:
+    """Test service calls with a loaded entry of another integration."""
+    other_entry = MockConfigEntry(domain="other", state=ConfigEntryState.LOADED)
+    other_entry.add_to_hass(hass)
+
+    with pytest.raises(ServiceValidationError, match="Invalid config entry"):
+        await hass.services.async_call(
+            DOMAIN,
+            service,
+            service_data(other_entry.entry_id),
+            blocking=True,
+            return_response=True,
+        )
+
+
 @pytest.mark.usefixtures("init_integration")
 @pytest.mark.parametrize("service", [HOURLY_HISTORY_SERVICE_NAME])
 async def test_service_called_with_unloaded_entry(
@@ -167,3 +525,503 @@ async def test_service_called_with_unloaded_entry(
             blocking=True,
             return_response=True,
         )
+
+
+@pytest.mark.usefixtures("init_integration")
+@pytest.mark.parametrize(
+    ("cached", "update_call_count"),
+    [({"cached": False}, 2), ({}, 1)],
+)
+async def test_usage_profile_service(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    mock_watersmart_client,
+    cached: dict[str, bool],
+    update_call_count: int,
+):
+    response = await hass.services.async_call(
+        DOMAIN,
+        USAGE_PROFILE_SERVICE_NAME,
+        {ATTR_CONFIG_ENTRY: mock_config_entry.entry_id} | cached,
+        blocking=True,
+        return_response=True,
+    )
+    profile = cast("list[dict]", response["profile"])
+    records = mock_watersmart_client.async_get_hourly_data.return_value
+
+    assert len(profile) == 7 * 24
+    assert (profile[0]["weekday"], profile[0]["hour"]) == (0, 0)
+    assert (profile[-1]["weekday"], profile[-1]["hour"]) == (6, 23)
+    assert sum(cell["samples"] for cell in profile) == sum(
+        1 for record in records if record["gallons"] is not None
+    )
+    assert all(cell["mean_gallons"] is None for cell in profile if not cell["samples"])
+    assert mock_watersmart_client.async_get_hourly_data.call_count == update_call_count
+
+
+@pytest.fixture
+async def compacted_integration(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry, mock_watersmart_client
+) -> MockConfigEntry:
+    """Set up an entry with hourly data from January through early April 2024."""
+
+    start = int(dt.datetime(2024, 1, 1, tzinfo=dt.UTC).timestamp())
+    hourly = mock_watersmart_client.async_get_hourly_data.return_value
+    mock_watersmart_client.async_get_hourly_data.return_value = [
+        dict(hourly[0], read_datetime=start + hour * 3600, gallons=1.0)
+        for hour in range(100 * 24)
+    ]
+    mock_config_entry.add_to_hass(hass)
+    hass.config_entries.async_update_entry(
+        mock_config_entry,
+        options={"hourly_retention_days": 35, "daily_retention_months": 1},
+    )
+
+    await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    return mock_config_entry
+
+
+@pytest.mark.usefixtures("mock_sensor_name")
+async def test_service_compacted_history(
+    hass: HomeAssistant, compacted_integration: MockConfigEntry
+):
+    service_data = {ATTR_CONFIG_ENTRY: compacted_integration.entry_id, "limit": 2}
+    response = await hass.services.async_call(
+        DOMAIN,
+        HOURLY_HISTORY_SERVICE_NAME,
+        service_data,
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response["history"] == [
+        {
+            "start": "2024-01-01T00:00:00-08:00",
+            "gallons": 744.0,
+            "leak_gallons": 0,
+            "null_hours": 0,
+            "resolution": "monthly",
+        },
+        {
+            "start": "2024-02-01T00:00:00-08:00",
+            "gallons": 24.0,
+            "max_gallons": 1.0,
+            "leak_gallons": 0,
+            "null_hours": 0,
+            "resolution": "daily",
+        },
+    ]
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        HOURLY_HISTORY_SERVICE_NAME,
+        service_data | {"limit": 35, "cursor": response["next_cursor"]},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response["history"][-1] == {
+        "start": "2024-03-06T01:00:00-08:00",
+        "gallons": 1.0,
+    }
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        HOURLY_HISTORY_SERVICE_NAME,
+        service_data
+        | {"limit": 3, "cursor": response["next_cursor"], "format": "columnar"},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response["history"]["gallons"] == [1.0, 1.0, 1.0]
+    assert "resolutions" not in response["history"]
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        HOURLY_HISTORY_SERVICE_NAME,
+        {
+            ATTR_CONFIG_ENTRY: compacted_integration.entry_id,
+            "start": "2024-03-05T00:00:00",
+            "end": "2024-03-06T00:00:00",
+            "format": "columnar",
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response["history"] == {
+        "timestamps": [1709625600, 1709712000],
+        "gallons": [24.0, 1.0],
+        "resolutions": ["daily", "hourly"],
+    }
+
+
+@pytest.mark.usefixtures("mock_sensor_name")
+@pytest.mark.parametrize("aggregation", ["daily", "total"])
+async def test_batch_history_service_compacted_history(
+    hass: HomeAssistant, compacted_integration: MockConfigEntry, aggregation: str
+):
+    response = await hass.services.async_call(
+        DOMAIN,
+        BATCH_HISTORY_SERVICE_NAME,
+        {"start": "2024-01-01T00:00:00", "aggregation": aggregation},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response["total"]["gallons"] == 100 * 24
+
+    if aggregation == "daily":
+        history = response["total"]["history"]
+
+        assert history[:2] == [
+            {
+                "start": "2024-01-01T00:00:00-08:00",
+                "gallons": 744.0,
+                "resolution": "monthly",
+            },
+            {"start": "2024-02-01T00:00:00-08:00", "gallons": 24.0},
+        ]
+        assert len(history) == 1 + 100 - 31
+
+
+@pytest.mark.usefixtures("mock_sensor_name")
+async def test_batch_history_service_combines_same_resolution(
+    hass: HomeAssistant, compacted_integration: MockConfigEntry
+):
+    # the default retention keeps all but the first 10 days at hourly resolution
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "host": "other",
+            "username": "test@home-assistant.io",
+            "password": "Passw0rd",
+        },
+    )
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        BATCH_HISTORY_SERVICE_NAME,
+        {"start": "2024-01-01T00:00:00", "aggregation": "daily"},
+        blocking=True,
+        return_response=True,
+    )
+    history = response["total"]["history"]
+
+    assert response["total"]["gallons"] == 2 * 100 * 24
+    assert history[:3] == [
+        {
+            "start": "2024-01-01T00:00:00-08:00",
+            "gallons": 744.0,
+            "resolution": "monthly",
+        },
+        {"start": "2024-01-01T00:00:00-08:00", "gallons": 24.0},
+        {"start": "2024-01-02T00:00:00-08:00", "gallons": 24.0},
+    ]
+    assert history[32:34] == [
+        {"start": "2024-02-01T00:00:00-08:00", "gallons": 48.0},
+        {"start": "2024-02-02T00:00:00-08:00", "gallons": 48.0},
+    ]
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        BATCH_HISTORY_SERVICE_NAME,
+        {
+            "start": "2024-03-05T00:00:00",
+            "end": "2024-03-05T00:00:00",
+            "aggregation": "hourly",
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response["total"]["history"] == [
+        {"start": "2024-03-05T00:00:00-08:00", "gallons": 24.0, "resolution": "daily"},
+        {"start": "2024-03-05T00:00:00-08:00", "gallons": 1.0},
+    ]
+
+
+@pytest.mark.usefixtures("init_integration")
+async def test_service_response_cache(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry, mock_watersmart_client
+):
+    coordinator = mock_config_entry.runtime_data.coordinator
+    responses = get_response_cache(hass)
+
+    async def _get_hourly_history() -> ServiceResponse:
+        return await hass.services.async_call(
+            DOMAIN,
+            HOURLY_HISTORY_SERVICE_NAME,
+            {ATTR_CONFIG_ENTRY: mock_config_entry.entry_id},
+            blocking=True,
+            return_response=True,
+        )
+
+    response = await _get_hourly_history()
+
+    with patch.object(coordinator.history, "records_between") as records_between:
+        assert await _get_hourly_history() == response
+
+    records_between.assert_not_called()
+    assert len(responses) == 1
+    assert coordinator.memory_usage()["responses"] == 4 * ATTRIBUTE_ITEM_BYTES
+
+    # refreshes that fetch the same readings keep the cached responses
+    hourly = mock_watersmart_client.async_get_hourly_data.return_value
+    mock_watersmart_client.async_get_hourly_data.return_value = [
+        dict(record) for record in hourly
+    ]
+    generation = coordinator.generation
+    await coordinator.async_refresh()
+
+    assert coordinator.generation == generation
+
+    mock_watersmart_client.async_get_hourly_data.return_value = [
+        *hourly,
+        dict(hourly[-1], read_datetime=hourly[-1]["read_datetime"] + 3600),
+    ]
+    await coordinator.async_refresh()
+
+    assert len((await _get_hourly_history())["history"]) == 5
+    assert len(responses) == 1
+
+    await hass.config_entries.async_reload(mock_config_entry.entry_id)
+
+    assert len(responses) == 0
+
+
+@pytest.mark.usefixtures("init_integration")
+async def test_changes_since_service(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry, mock_watersmart_client
+):
+    coordinator = mock_config_entry.runtime_data.coordinator
+
+    async def _get_changes_since(**data: Any) -> ServiceResponse:
+        return await hass.services.async_call(
+            DOMAIN,
+            CHANGES_SINCE_SERVICE_NAME,
+            {ATTR_CONFIG_ENTRY: mock_config_entry.entry_id, **data},
+            blocking=True,
+            return_response=True,
+        )
+
+    response = await _get_changes_since()
+
+    assert response["resync_required"]
+    assert response["changes"] == []
+
+    token = response["token"]
+    response = await _get_changes_since(token=token)
+
+    assert response == {"token": token, "resync_required": False, "changes": []}
+
+    hourly = mock_watersmart_client.async_get_hourly_data.return_value
+    mock_watersmart_client.async_get_hourly_data.return_value = [
+        dict(hourly[0], gallons=9.0),
+        *hourly[1:],
+        dict(hourly[-1], read_datetime=hourly[-1]["read_datetime"] + 3600),
+    ]
+    response = await _get_changes_since(token=token, cached=False)
+
+    assert not response["resync_required"]
+    assert [change["gallons"] for change in response["changes"]] == [
+        9.0,
+        hourly[-1]["gallons"],
+    ]
+    assert response["token"] != token
+
+    # the change log is not kept across reloads
+    await hass.config_entries.async_reload(mock_config_entry.entry_id)
+
+    assert (await _get_changes_since(token=response["token"]))["resync_required"]
+
+    coordinator = mock_config_entry.runtime_data.coordinator
+    old_token = base64.urlsafe_b64encode(f"{coordinator.changes.id}:-1".encode())
+
+    assert (await _get_changes_since(token=old_token.decode()))["resync_required"]
+
+    with pytest.raises(ServiceValidationError, match="Invalid token"):
+        await _get_changes_since(token="!!!")  # noqa: S106
+
+
+@pytest.mark.usefixtures("init_integration")
+@pytest.mark.parametrize(
+    ("filters", "expected"),
+    [
+        ({"min_gallons": 1}, ["19:00", "21:00"]),
+        ({"max_gallons": "0"}, ["20:00", "22:00"]),
+        ({"hours": [20, "21"]}, ["20:00", "21:00"]),
+        ({"weekdays": "wed", "min_gallons": 7.48}, ["19:00", "21:00"]),
+        ({"weekdays": ["mon", "thu"]}, []),
+        ({"leak_only": True}, []),
+        ({"null_only": True}, []),
+        ({"leak_only": False}, ["19:00", "20:00", "21:00", "22:00"]),
+    ],
+)
+async def test_service_filters(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    filters: dict[str, Any],
+    expected: list[str],
+):
+    response = await hass.services.async_call(
+        DOMAIN,
+        HOURLY_HISTORY_SERVICE_NAME,
+        {ATTR_CONFIG_ENTRY: mock_config_entry.entry_id, **filters},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert [item["start"][11:16] for item in response["history"]] == expected
+
+
+@pytest.mark.usefixtures("init_integration")
+async def test_service_filters_pagination(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry
+):
+    data = {
+        ATTR_CONFIG_ENTRY: mock_config_entry.entry_id,
+        "min_gallons": 1,
+        "limit": 1,
+    }
+    response = await hass.services.async_call(
+        DOMAIN, HOURLY_HISTORY_SERVICE_NAME, data, blocking=True, return_response=True
+    )
+    history = response["history"]
+    response = await hass.services.async_call(
+        DOMAIN,
+        HOURLY_HISTORY_SERVICE_NAME,
+        {**data, "cursor": response["next_cursor"]},
+        blocking=True,
+        return_response=True,
+    )
+    history.extend(response["history"])
+
+    assert "next_cursor" not in response
+    assert [item["gallons"] for item in history] == [7.48, 7.48]
+
+
+@pytest.mark.usefixtures("init_integration")
+@pytest.mark.parametrize(
+    "filters", [{"hours": [24]}, {"weekdays": ["monday"]}, {"min_gallons": "a"}]
+)
+async def test_service_filters_validation(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry, filters: dict[str, Any]
+):
+    with pytest.raises(vol.Invalid):
+        await hass.services.async_call(
+            DOMAIN,
+            HOURLY_HISTORY_SERVICE_NAME,
+            {ATTR_CONFIG_ENTRY: mock_config_entry.entry_id, **filters},
+            blocking=True,
+            return_response=True,
+        )
+
+
+@pytest.mark.usefixtures("init_integration")
+@pytest.mark.parametrize(
+    ("data", "expected"),
+    [
+        (
+            {"count": 3},
+            [
+                {"start": "2024-06-19T19:00:00-07:00", "gallons": 7.48},
+                {"start": "2024-06-19T21:00:00-07:00", "gallons": 7.48},
+                {"start": "2024-06-19T20:00:00-07:00", "gallons": 0},
+            ],
+        ),
+        (
+            {"start": "2024-06-19T20:00:00-07:00", "cached": False},
+            [
+                {"start": "2024-06-19T21:00:00-07:00", "gallons": 7.48},
+                {"start": "2024-06-19T20:00:00-07:00", "gallons": 0},
+                {"start": "2024-06-19T22:00:00-07:00", "gallons": 0},
+            ],
+        ),
+        (
+            {"aggregation": "daily"},
+            [{"start": "2024-06-19T00:00:00-07:00", "gallons": 14.96}],
+        ),
+    ],
+)
+async def test_top_usage_service(
+    hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
+    data: dict[str, Any],
+    expected: list[dict[str, Any]],
+):
+    response = await hass.services.async_call(
+        DOMAIN,
+        TOP_USAGE_SERVICE_NAME,
+        {ATTR_CONFIG_ENTRY: mock_config_entry.entry_id, **data},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response == {"top": expected}
+
+
+@pytest.mark.usefixtures("init_integration")
+async def test_top_usage_service_skips_missing_hours(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry, mock_watersmart_client
+):
+    hourly = mock_watersmart_client.async_get_hourly_data.return_value
+    mock_watersmart_client.async_get_hourly_data.return_value = [
+        dict(record, gallons=None) for record in hourly
+    ]
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        TOP_USAGE_SERVICE_NAME,
+        {ATTR_CONFIG_ENTRY: mock_config_entry.entry_id, "cached": False},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response == {"top": []}
+
+
+async def test_top_usage_service_compacted_days(
+    hass: HomeAssistant, compacted_integration: MockConfigEntry
+):
+    response = await hass.services.async_call(
+        DOMAIN,
+        TOP_USAGE_SERVICE_NAME,
+        {
+            ATTR_CONFIG_ENTRY: compacted_integration.entry_id,
+            "aggregation": "daily",
+            "count": 2,
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    # January is only kept as a monthly total
+    assert response == {
+        "top": [
+            {"start": "2024-02-01T00:00:00-08:00", "gallons": 24.0},
+            {"start": "2024-02-02T00:00:00-08:00", "gallons": 24.0},
+        ]
+    }
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        TOP_USAGE_SERVICE_NAME,
+        {
+            ATTR_CONFIG_ENTRY: compacted_integration.entry_id,
+            "aggregation": "daily",
+            "start": "2024-04-09T00:00:00-07:00",
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response == {
+        "top": [{"start": "2024-04-09T00:00:00-07:00", "gallons": 24.0}]
+    }
@@ -0,0 +1,78 @@
+"""Test the WaterSmart websocket API."""
+
+from homeassistant.core import Event, HomeAssistant
+from pytest_homeassistant_custom_component.typing import WebSocketGenerator
+
+from custom_components.watersmart.const import EVENT_NEW_READINGS
+
+from .conftest import MockConfigEntry
+
+
+async def test_subscribe_readings(
+    hass: HomeAssistant,
+    hass_ws_client: WebSocketGenerator,
+    init_integration: MockConfigEntry,
+    mock_watersmart_client,
+):
+    coordinator = init_integration.runtime_data.coordinator
+    events: list[Event] = []
+    hass.bus.async_listen(EVENT_NEW_READINGS, events.append)
+    client = await hass_ws_client(hass)
+
+    await client.send_json_auto_id(
+        {
+            "type": "watersmart/subscribe_readings",
+            "config_entry": init_integration.entry_id,
+        }
+    )
+    msg = await client.receive_json()
+
+    assert msg["success"]
+
+    subscription = msg["id"]
+    hourly = mock_watersmart_client.async_get_hourly_data.return_value
+    reading = dict(hourly[-1], read_datetime=hourly[-1]["read_datetime"] + 3600)
+
+    # revisions are not new readings
+    mock_watersmart_client.async_get_hourly_data.return_value = [
+        dict(hourly[0], gallons=9.0),
+        *hourly[1:],
+    ]
+    await coordinator.async_refresh()
+    hass.bus.async_fire(EVENT_NEW_READINGS, {"config_entry": "other", "readings": []})
+
+    mock_watersmart_client.async_get_hourly_data.return_value = [*hourly, reading]
+    await coordinator.async_refresh()
+    msg = await client.receive_json()
+
+    assert msg["id"] == subscription
+    assert msg["type"] == "event"
+    assert msg["event"] == {
+        "readings": [
+            {
+                "start": "2024-06-19T23:00:00-07:00",
+                "gallons": reading["gallons"],
+            }
+        ]
+    }
+    assert len(events) == 2
+    assert events[-1].data == {
+        "config_entry": init_integration.entry_id,
+        **msg["event"],
+    }
+
+
+async def test_subscribe_readings_invalid_entry(
+    hass: HomeAssistant,
+    hass_ws_client: WebSocketGenerator,
+    init_integration: MockConfigEntry,
+):
+    client = await hass_ws_client(hass)
+
+    await client.send_json_auto_id(
+        {"type": "watersmart/subscribe_readings", "config_entry": "missing"}
+    )
+    msg = await client.receive_json()
+
+    assert not msg["success"]
+    assert msg["error"]["code"] == "not_found"